@@ -0,0 +1,175 @@
+"""
+Asyncio tabanlı tarama hattı: tek havuzlu aiohttp oturumu ile 24s ticker'ı çeker,
+tüm evren için kline isteklerini sınırlı eşzamanlılıkla dağıtır ve biten her
+frame'i beklemeden puanlamaya iletir.
+
+Benchmark (kaydedilmiş yanıtlarla, yerel sahte sunucu):
+    python async_scan.py --record recorded/ --base-url https://fapi.binance.com
+    python async_scan.py --bench recorded/
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import time
+
+from ohlcv_store import OHLCVStore
+from strategy import filter_symbols_by_volume
+
+try:
+    import aiohttp
+except ImportError:  # Opsiyonel bağımlılık: yoksa thread'li tarama kullanılır
+    aiohttp = None
+
+
+class AsyncScanner:
+    """
+    Not: Bu yol RequestScheduler'ı kullanmaz; eşzamanlılık `concurrency` ile sınırlanır
+    ve kullanılan ağırlık yanıt başlığından okunup `last_used_weight`'e yazılır.
+    300 sembol × limit=100 (ağırlık 2) ≈ 640 ağırlık, dakikalık 2400 limitin altında.
+    """
+
+    def __init__(self, base_url, interval='15m', limit=100, concurrency=50,
+                 max_retries=3, timeout=10, log_func=None):
+        if aiohttp is None:
+            raise ImportError("AsyncScanner için aiohttp gerekli (pip install aiohttp)")
+        self.base_url = base_url.rstrip('/')
+        self.interval = interval
+        self.limit = limit
+        self.concurrency = concurrency
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self.log = log_func if log_func else print
+        self.last_used_weight = 0
+
+    async def _get_json(self, session, path, params=None):
+        url = self.base_url + path
+        for attempt in range(self.max_retries + 1):
+            async with session.get(url, params=params) as resp:
+                used = resp.headers.get('X-MBX-USED-WEIGHT-1M')
+                if used is not None:
+                    self.last_used_weight = max(self.last_used_weight, int(used))
+
+                if resp.status in (429, 418) and attempt < self.max_retries:
+                    retry_after = float(resp.headers.get('Retry-After', 0.5 * (2 ** attempt)))
+                    await asyncio.sleep(retry_after + random.uniform(0, retry_after * 0.3))
+                    continue
+                if resp.status >= 500 and attempt < self.max_retries:
+                    await asyncio.sleep(0.5 * (2 ** attempt) + random.uniform(0, 0.2))
+                    continue
+                resp.raise_for_status()
+                return await resp.json(content_type=None)
+
+    async def get_symbols(self, session, min_vol_mn):
+        tickers = await self._get_json(session, '/fapi/v1/ticker/24hr')
+        return filter_symbols_by_volume(tickers, min_vol_mn)
+
+    async def fetch_frame(self, session, symbol):
+        klines = await self._get_json(session, '/fapi/v1/klines', {
+            'symbol': symbol, 'interval': self.interval, 'limit': self.limit
+        })
+        df = OHLCVStore.from_klines(klines).to_frame()
+        if len(df) < 20 or df['Close'].isna().any() or (df['High'] < df['Low']).any():
+            return None
+        return df
+
+    async def scan(self, min_vol_mn, on_frame=None, executor=None, symbols=None):
+        """
+        Evreni tarar. `on_frame(symbol, df)` her frame geldiğinde çağrılır
+        (executor verilirse onun içinde; böylece puanlama fetch'i bloklamaz).
+        Dönüş: (sonuçlar {symbol: on_frame sonucu}, istatistik dict)
+        """
+        sem = asyncio.Semaphore(self.concurrency)
+        loop = asyncio.get_running_loop()
+        results = {}
+        stats = {'symbols': 0, 'frames': 0, 'errors': 0}
+
+        connector = aiohttp.TCPConnector(limit=self.concurrency, ttl_dns_cache=300)
+        timeout = aiohttp.ClientTimeout(total=self.timeout)
+        t0 = time.perf_counter()
+
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+            if symbols is None:
+                symbols = await self.get_symbols(session, min_vol_mn)
+            stats['symbols'] = len(symbols)
+            t_ticker = time.perf_counter()
+
+            async def _one(symbol):
+                async with sem:
+                    try:
+                        df = await self.fetch_frame(session, symbol)
+                    except Exception as e:
+                        stats['errors'] += 1
+                        self.log(f"⚠️ {symbol} async kline hatası: {e}")
+                        return
+                if df is None:
+                    return
+                stats['frames'] += 1
+                if on_frame is None:
+                    results[symbol] = df
+                elif executor is not None:
+                    results[symbol] = await loop.run_in_executor(executor, on_frame, symbol, df)
+                else:
+                    results[symbol] = on_frame(symbol, df)
+
+            await asyncio.gather(*(_one(s) for s in symbols))
+
+        stats['ticker_sec'] = t_ticker - t0
+        stats['total_sec'] = time.perf_counter() - t0
+        return results, stats
+
+    def run(self, min_vol_mn, on_frame=None, executor=None, symbols=None):
+        """Senkron giriş noktası (tarama thread'inden çağrılır)."""
+        return asyncio.run(self.scan(min_vol_mn, on_frame, executor, symbols))
+
+
+# --- Kayıt / Benchmark ---
+
+async def _record(base_url, directory, min_vol_mn, interval, limit):
+    os.makedirs(os.path.join(directory, 'klines'), exist_ok=True)
+    async with aiohttp.ClientSession() as session:
+        async with session.get(f"{base_url}/fapi/v1/ticker/24hr") as resp:
+            tickers = await resp.json()
+        with open(os.path.join(directory, 'ticker_24hr.json'), 'w') as f:
+            json.dump(tickers, f)
+
+        for symbol in filter_symbols_by_volume(tickers, min_vol_mn):
+            params = {'symbol': symbol, 'interval': interval, 'limit': limit}
+            async with session.get(f"{base_url}/fapi/v1/klines", params=params) as resp:
+                klines = await resp.json()
+            with open(os.path.join(directory, 'klines', f"{symbol}.json"), 'w') as f:
+                json.dump(klines, f)
+
+
+def _bench(directory, min_vol_mn, concurrency, rounds):
+    from local_servers import RecordedHTTPServer
+
+    server = RecordedHTTPServer(directory).start()
+    try:
+        scanner = AsyncScanner(server.url, concurrency=concurrency)
+        for i in range(rounds):
+            _, stats = scanner.run(min_vol_mn)
+            print(f"tur {i + 1}: {stats['frames']}/{stats['symbols']} frame | "
+                  f"ticker {stats['ticker_sec'] * 1000:.0f} ms | toplam {stats['total_sec'] * 1000:.0f} ms | "
+                  f"hata {stats['errors']}")
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Async tarama kaydı / benchmark")
+    parser.add_argument('--record', metavar='DIR', help="Gerçek yanıtları DIR içine kaydet")
+    parser.add_argument('--bench', metavar='DIR', help="DIR'deki kayıtlarla yerel sunucuda ölç")
+    parser.add_argument('--base-url', default="https://fapi.binance.com")
+    parser.add_argument('--min-volume', type=float, default=0.0, help="Milyon USDT")
+    parser.add_argument('--interval', default='15m')
+    parser.add_argument('--limit', type=int, default=100)
+    parser.add_argument('--concurrency', type=int, default=50)
+    parser.add_argument('--rounds', type=int, default=3)
+    args = parser.parse_args()
+
+    if args.record:
+        asyncio.run(_record(args.base_url, args.record, args.min_volume, args.interval, args.limit))
+    if args.bench:
+        _bench(args.bench, args.min_volume, args.concurrency, args.rounds)
@@ -0,0 +1,460 @@
+"""
+Walk-forward vektörel backtest.
+
+get_composite_score sadece son mumu puanlar; her mum için büyüyen dilimlerle çağırmak O(n²) olur.
+Burada her modülün "hit" bitleri tüm geçmiş için tek geçişte hesaplanır. Her mum t, canlıdaki gibi
+t'de biten `window` mumluk pencereyi görür (gelecek mum kullanılmaz):
+  - swing/FVG/OB/likidite/hacim profili/PD/OTE: pencere içi kurallar birebir (pencere kenarları dahil)
+  - RSI/Bollinger: akışlı IndicatorBook ile aynı (RSI tüm geçmişten, üstel hafıza)
+  - Kill Zone: mumun kapanış saati (UTC)
+Sebep bitleri ve ağırlıklar batch_score ile ortaktır (decode_reasons aynı metni üretir).
+
+    signals, scores, reasons = engine.backtest(df)                 # df: CandleArchive.read_frame
+    result = run_backtest(engine, df, sl_pct=4.0, tp_pct=1.0)      # + kaldıraç, stop ve ATR trailing
+"""
+import numpy as np
+import pandas as pd
+
+from candle_archive import interval_to_ms
+from strategies.batch_score import (
+    SIGNAL_HOLD, SIGNAL_LONG, SIGNAL_SHORT, MIN_BARS,
+    R_STRUCT_BULL, R_STRUCT_BEAR, R_STRUCT_BOS, R_FVG_BULL, R_FVG_BEAR, R_RSI_LOW, R_RSI_HIGH,
+    R_LIQ_LOWER_WICK, R_LIQ_UPPER_WICK, R_LIQ_EQUAL_LOWS, R_LIQ_EQUAL_HIGHS, R_VP_BELOW, R_VP_ABOVE,
+    R_OB_BULL, R_OB_BEAR, R_PD_DISCOUNT, R_PD_PREMIUM, R_OTE_FVG, R_KILLZONE,
+    _apply_weights, _bits,
+)
+from strategies.order_blocks import order_block_masks_from_arrays, MIN_AGE
+from strategies.volume_profile import batch_poc
+from strategies.kernels import latest_block, first_overlap, swing_flags
+
+WINDOW = 100          # Canlı taramadaki get_candlesticks(limit=100)
+VP_CHUNK = 256        # Hacim profili pencereleri bu kadarlık parçalarla (geçici diziler önbellekte kalsın)
+
+# Çıkış sebepleri
+EXIT_STOP = 0
+EXIT_OPPOSITE = 1
+EXIT_END = 2
+EXIT_TRAIL = 3        # ATR trailing (kâr ≥ tp_pct iken zirve/dip - ATR × çarpan)
+EXIT_CHANDELIER = 4   # exit_sim: calc_chandelier_exit
+EXIT_SWING = 5        # exit_sim: calc_swing_exit
+EXIT_MSB = 6          # exit_sim: calc_msb_exit
+
+EXIT_NAMES = {
+    EXIT_STOP: "Stop", EXIT_OPPOSITE: "Ters Sinyal", EXIT_END: "Veri Sonu", EXIT_TRAIL: "ATR Trailing",
+    EXIT_CHANDELIER: "Chandelier", EXIT_SWING: "Swing", EXIT_MSB: "MSB",
+}
+
+TRAIL_MULT = 1.8      # update_trailing_stop'taki varsayılan çarpan
+ATR_FLOOR_PCT = 0.5   # Girişte ATR en az fiyatın %0.5'i (calculate_atr)
+
+TRADE_DTYPE = np.dtype([
+    ('entry_idx', '<i8'),
+    ('exit_idx', '<i8'),
+    ('side', 'i1'),          # SIGNAL_LONG / SIGNAL_SHORT
+    ('leverage', 'i1'),
+    ('entry', '<f8'),
+    ('exit', '<f8'),
+    ('pnl_pct', '<f8'),      # Marjine göre, kaldıraç ve komisyon dahil
+    ('reason', 'i1'),        # EXIT_*
+])
+
+
+# --- Yardımcılar ---
+
+def _rolling(values, window, how):
+    """NaN atlayan kayan max/min/mean/sum (min_periods=1, nanmax gibi)."""
+    return getattr(pd.Series(values).rolling(window, min_periods=1), how)().to_numpy()
+
+
+def _last_indices(idx, t, k):
+    """
+    Sıralı olay indeksleri idx için her t'de t'ye kadar olan son k olay: (k × n) dizi, yoksa -1.
+    Satır 0 en yeni olay.
+    """
+    pos = np.searchsorted(idx, t, side='right')
+    out = np.full((k, len(t)), -1, dtype=np.int64)
+    for back in range(k):
+        p = pos - 1 - back
+        ok = p >= 0
+        out[back, ok] = idx[p[ok]]
+    return out
+
+
+# --- Modül kernelleri (tüm seri, mum başına hit bitleri) ---
+
+def structure_series(high, low, close, window=WINDOW, lookback=5):
+    n = len(close)
+    t = np.arange(n)
+    swing_high, swing_low = swing_flags(high, low, lookback)
+    # Pencere içinde geçerli swing'ler: [t - window + 1 + lookback, t - lookback]
+    first = t - window + 1 + lookback
+    last = t - lookback
+
+    any_swing = np.concatenate(([0], np.cumsum(swing_high | swing_low)))
+    count = any_swing[np.clip(last + 1, 0, n)] - any_swing[np.clip(first, 0, n)]
+    enough = count >= 4
+
+    h = _last_indices(np.flatnonzero(swing_high), last, 2)
+    lo = _last_indices(np.flatnonzero(swing_low), last, 2)
+    valid = (h[1] >= first) & (lo[1] >= first) & (h[1] >= 0) & (lo[1] >= 0)
+    h1, h2 = high[np.maximum(h[0], 0)], high[np.maximum(h[1], 0)]
+    l1, l2 = low[np.maximum(lo[0], 0)], low[np.maximum(lo[1], 0)]
+
+    bull = enough & valid & (h1 > h2) & (l1 > l2)
+    bear = enough & valid & (h1 < h2) & (l1 < l2)
+    bos = (bull & (close > h1)) | (bear & (close < l1))
+    return _bits(bull, R_STRUCT_BULL) | _bits(bear, R_STRUCT_BEAR) | _bits(bos, R_STRUCT_BOS)
+
+
+def _fvg_events(high, low):
+    """Tüm geçmişteki FVG'ler: (bull_idx, bull_top, bull_bottom, bear_idx, bear_top, bear_bottom)."""
+    n = len(high)
+    top_bull = np.full(n, np.nan)
+    bottom_bull = np.full(n, np.nan)
+    top_bear = np.full(n, np.nan)
+    bottom_bear = np.full(n, np.nan)
+    bull = np.zeros(n, dtype=bool)
+    bear = np.zeros(n, dtype=bool)
+    if n >= 3:
+        bull[2:] = high[:-2] < low[2:]
+        bear[2:] = low[:-2] > high[2:]
+        top_bull[2:], bottom_bull[2:] = low[2:], high[:-2]
+        top_bear[2:], bottom_bear[2:] = low[:-2], high[2:]
+    return bull, top_bull, bottom_bull, bear, top_bear, bottom_bear
+
+
+def fvg_series(high, low, close, fvgs, window=WINDOW):
+    bull, top_bull, bottom_bull, bear, top_bear, bottom_bear = fvgs
+    t = np.arange(len(close))
+    first = t - window + 3   # Pencerede formasyonu tamamlanabilen ilk mum
+
+    raw = np.zeros(len(close), dtype=np.int64)
+    for mask, top, bottom, sign in ((bull, top_bull, bottom_bull, 2), (bear, top_bear, bottom_bear, -2)):
+        for j in _last_indices(np.flatnonzero(mask), t, 5):
+            ok = (j >= first) & (j >= 0)
+            jj = np.maximum(j, 0)
+            raw += sign * (ok & (bottom[jj] <= close) & (close <= top[jj]))
+    return _bits(raw > 0, R_FVG_BULL) | _bits(raw < 0, R_FVG_BEAR)
+
+
+def rsi_series(close, window=14):
+    """ta.momentum.rsi / WilderRSI ile aynı (tüm geçmiş; ilk fark 0)."""
+    diff = np.diff(close, prepend=close[:1])
+    up = pd.Series(np.maximum(diff, 0.0)).ewm(alpha=1.0 / window, adjust=False).mean().to_numpy()
+    down = pd.Series(np.maximum(-diff, 0.0)).ewm(alpha=1.0 / window, adjust=False).mean().to_numpy()
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rsi = np.where(down == 0, 100.0, 100.0 - 100.0 / (1.0 + up / down))
+    rsi[:window - 1] = np.nan
+    return rsi
+
+
+def rsi_bollinger_series(close, window=20, window_dev=2):
+    rsi = rsi_series(close)
+    roll = pd.Series(close).rolling(window)
+    mavg = roll.mean().to_numpy()
+    std = roll.std(ddof=0).to_numpy()
+    upper, lower = mavg + window_dev * std, mavg - window_dev * std
+    long_ = (rsi < 35) & (close < lower)
+    short = ~long_ & (rsi > 70) & (close > upper)
+    return _bits(long_, R_RSI_LOW) | _bits(short, R_RSI_HIGH)
+
+
+def liquidity_series(open_, high, low, volume, n_equal=50):
+    rng = high - low + 1e-8
+    lower_wick, upper_wick = (open_ - low) / rng, (high - open_) / rng
+    spike = volume > _rolling(volume, 5, 'mean') * 1.8
+    hits = _bits((lower_wick > 0.6) & spike, R_LIQ_LOWER_WICK)
+    hits |= _bits((upper_wick > 0.6) & spike, R_LIQ_UPPER_WICK)
+
+    def _equal(x):
+        # Son n_equal mumluk dilimin ilk mumu karşılaştırılmaz → eşitlik penceresi n_equal - 1
+        eq = np.zeros(len(x), dtype=bool)
+        eq[1:] = np.abs(x[1:] - x[:-1]) < x[1:] * 0.001
+        return eq, _rolling(eq.astype(np.float64), n_equal - 1, 'sum')
+
+    eq_l, count_l = _equal(low)
+    has_lows = count_l >= 2
+    eq_h, count_h = _equal(high)
+    has_highs = ~has_lows & (count_h >= 2)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        zone = _rolling(np.where(eq_l, low, np.inf), n_equal - 1, 'min')
+        near_lows = has_lows & (np.abs(low - zone) / zone < 0.002)
+        zone = _rolling(np.where(eq_h, high, -np.inf), n_equal - 1, 'max')
+        near_highs = has_highs & (np.abs(high - zone) / zone < 0.002)
+    return hits | _bits(near_lows, R_LIQ_EQUAL_LOWS) | _bits(near_highs, R_LIQ_EQUAL_HIGHS)
+
+
+def volume_profile_series(high, low, close, volume, period=50, bins=20):
+    n = len(close)
+    poc = np.full(n, np.nan)
+    if n >= period:
+        view = np.lib.stride_tricks.sliding_window_view
+        wh, wl, wv = view(high, period), view(low, period), view(volume, period)
+        for s in range(0, len(wh), VP_CHUNK):
+            e = s + VP_CHUNK
+            poc[period - 1 + s:period - 1 + min(e, len(wh))] = batch_poc(wh[s:e], wl[s:e], wv[s:e], bins=bins)
+    below = close < poc * 0.99
+    above = ~below & (close > poc * 1.01)
+    return _bits(below, R_VP_BELOW) | _bits(above, R_VP_ABOVE)
+
+
+def order_block_series(open_, high, low, close, lookback=50):
+    bull, bear = order_block_masks_from_arrays(open_, close)
+    bull_hit = latest_block(bull, low, high, close, lookback, MIN_AGE, 1.0, 1.01) >= 0
+    bear_hit = latest_block(bear, low, high, close, lookback, MIN_AGE, 0.99, 1.0) >= 0
+    return _bits(bull_hit, R_OB_BULL) | _bits(bear_hit, R_OB_BEAR)
+
+
+def pd_array_series(high, low, close, window=WINDOW):
+    span = min(window, 100)
+    weekly_high = _rolling(high, span, 'max')
+    weekly_low = _rolling(low, span, 'min')
+    equilibrium = (weekly_high + weekly_low) / 2
+    premium = weekly_high - (weekly_high - equilibrium) * 0.25
+    discount = weekly_low + (equilibrium - weekly_low) * 0.25
+    disc = close < discount
+    prem = ~disc & (close > premium)
+    return _bits(disc, R_PD_DISCOUNT) | _bits(prem, R_PD_PREMIUM)
+
+
+def ote_series(high, low, close, fvgs, window=WINDOW, swing_period=30):
+    recent_high = _rolling(high, swing_period, 'max')
+    recent_low = _rolling(low, swing_period, 'min')
+    fib_618 = recent_high - (recent_high - recent_low) * 0.618
+    fib_786 = recent_high - (recent_high - recent_low) * 0.786
+    in_zone = (fib_786 <= close) & (close <= fib_618)
+
+    bull, top, bottom = fvgs[0], fvgs[1], fvgs[2]
+    t = np.arange(len(close))
+    near = np.zeros(len(close), dtype=bool)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        for j in _last_indices(np.flatnonzero(bull), t, 3):
+            ok = (j >= t - window + 3) & (j >= 0)
+            jj = np.maximum(j, 0)
+            filled = (bottom[jj] <= close) & (close <= top[jj])
+            avg = (top[jj] + bottom[jj]) / 2
+            near |= ok & ~filled & (np.abs(close - avg) / close < 0.005)
+    return _bits(in_zone & near, R_OTE_FVG)
+
+
+def killzone_series(open_time, interval='15m'):
+    """Kill Zone mumun kapanış saatine göre (canlıda tarama kapanıştan hemen sonra çalışır)."""
+    hour = ((np.asarray(open_time, dtype=np.int64) + interval_to_ms(interval)) // 3_600_000) % 24
+    active = ((8 <= hour) & (hour < 10)) | ((13.5 <= hour) & (hour < 16))
+    return _bits(active, R_KILLZONE)
+
+
+# --- Birleştirme ---
+
+def _arrays(df):
+    return tuple(df[name].to_numpy(dtype=np.float64) for name in ('Open', 'High', 'Low', 'Close', 'Volume'))
+
+
+def backtest_hits(df, window=WINDOW, vp_bins=20, interval='15m'):
+    """Her mum için sebep bit maskesi (ilk window - 1 mum ve < MIN_BARS pencere için 0)."""
+    open_, high, low, close, volume = _arrays(df)
+    fvgs = _fvg_events(high, low)
+
+    reasons = structure_series(high, low, close, window)
+    reasons |= fvg_series(high, low, close, fvgs, window)
+    reasons |= rsi_bollinger_series(close)
+    reasons |= liquidity_series(open_, high, low, volume)
+    reasons |= volume_profile_series(high, low, close, volume, bins=vp_bins)
+    reasons |= order_block_series(open_, high, low, close)
+    reasons |= pd_array_series(high, low, close, window)
+    reasons |= ote_series(high, low, close, fvgs, window)
+    if 'Open time' in df.columns:
+        reasons |= killzone_series(df['Open time'].to_numpy(), interval)
+
+    reasons[:max(window, MIN_BARS) - 1] = 0   # Canlıdaki gibi tam pencere gelene kadar puanlama yok
+    return reasons
+
+
+def backtest_signals(df, weights, threshold, window=WINDOW, vp_bins=20, interval='15m'):
+    """
+    Tüm geçmiş için (sinyaller int8 [SIGNAL_*], puanlar, sebep bit maskeleri).
+    t. mumun sinyali sadece t ve öncesindeki mumlardan hesaplanır.
+    """
+    reasons = backtest_hits(df, window, vp_bins, interval)
+    long_, short = _apply_weights(reasons, weights)
+    is_long = (long_ >= threshold) & (long_ > short)
+    is_short = ~is_long & (short >= threshold) & (short > long_)
+    signals = np.zeros(len(reasons), dtype=np.int8)
+    signals[is_long] = SIGNAL_LONG
+    signals[is_short] = SIGNAL_SHORT
+    scores = np.where(is_long, long_, np.where(is_short, short, 0)).astype(np.int64)
+    return signals, scores, reasons
+
+
+# --- İşlem simülasyonu ---
+
+def leverage_series(close, lookback=40):
+    """
+    StrategyCore.calculate_volatility kuralları, her mum için:
+    son 40 mumun ortalama mutlak % değişimi ≥1 → 1x, >0.4 → 2x, >0.2 → 3x, aksi 5x (< 40 mum → 1x).
+    Dönüş: (kaldıraç int8, ortalama % değişim)
+    """
+    change = np.abs(pd.Series(close).pct_change().to_numpy()) * 100
+    avg = pd.Series(change).rolling(lookback, min_periods=1).mean().to_numpy(copy=True)
+    leverage = np.select([avg >= 1.0, avg > 0.4, avg > 0.2], [1, 2, 3], default=5).astype(np.int8)
+    leverage[:lookback - 1] = 1
+    avg[:lookback - 1] = 0.0
+    return leverage, avg
+
+
+def atr_series(high, low, close, window=14):
+    """
+    IndicatorBook/WilderATR ile aynı ATR serisi: ilk TR = High - Low, ilk `window` TR'nin
+    ortalaması (window - 1. mum), sonra Wilder yumuşatma. Öncesi NaN.
+    """
+    prev_close = np.concatenate(([np.nan], close[:-1]))
+    tr = np.fmax(high - low, np.fmax(np.abs(high - prev_close), np.abs(low - prev_close)))
+    out = np.full(len(close), np.nan)
+    if len(close) < window:
+        return out
+    seeded = tr[window - 1:].copy()
+    seeded[0] = tr[:window].mean()
+    # (atr * (w - 1) + tr) / w == üstel ortalama, alpha = 1 / w
+    out[window - 1:] = pd.Series(seeded).ewm(alpha=1 / window, adjust=False).mean().to_numpy()
+    return out
+
+
+def _trail_exit(t, bound, side, entry, atr, tp_pct, trail_mult, high, low):
+    """
+    (t, bound] aralığında ilk ATR trailing çıkışı: (mum, fiyat) veya (-1, nan).
+    Canlıdaki gibi takip sadece kâr ≥ tp_pct iken çalışır: LONG'da zirve tp seviyesini aşan
+    mumların High'larıyla güncellenir, Low ≤ zirve - ATR × çarpan olunca (çıkış yine kârda ise) kapanır.
+    Mum içi sıra bilinmediği için bir mumun kendi zirvesi ancak sonraki mumlarda tetikleyici olur.
+    """
+    if bound <= t:
+        return -1, np.nan
+    h, l = high[t + 1:bound + 1], low[t + 1:bound + 1]
+    if side == SIGNAL_LONG:
+        level = entry * (1 + tp_pct / 100)
+        reached = h >= level
+        peak = np.maximum.accumulate(np.where(reached, h, entry))
+        peak = np.concatenate(([entry], peak[:-1]))
+        trigger = peak - atr * trail_mult
+        hit = (trigger >= level) & (l <= trigger) & reached
+        price = np.minimum(trigger, h)
+    else:
+        level = entry * (1 - tp_pct / 100)
+        reached = l <= level
+        dip = np.minimum.accumulate(np.where(reached, l, entry))
+        dip = np.concatenate(([entry], dip[:-1]))
+        trigger = dip + atr * trail_mult
+        hit = (trigger <= level) & (h >= trigger) & reached
+        price = np.maximum(trigger, l)
+    j = int(hit.argmax())
+    if not hit[j]:
+        return -1, np.nan
+    return t + 1 + j, float(price[j])
+
+
+def simulate_trades(high, low, close, signals, leverage, sl_pct=4.0, fee_pct=0.04,
+                    atr=None, tp_pct=None, trail_mult=TRAIL_MULT):
+    """
+    Tek pozisyonlu simülasyon (dizilerle): açık pozisyon yokken gelen sinyalde t kapanışından girilir
+    (canlıdaki market emri), sabit %sl_pct stop (canlıdaki STOP_MARKET), ters sinyalde t kapanışından
+    çıkılır, veri biterse son kapanıştan kapatılır. Komisyon giriş + çıkış için notional üzerinden.
+    tp_pct ve atr verilirse canlıdaki ATR trailing de uygulanır (giriş ATR'si, en az %0.5 fiyat).
+    Aynı mumda öncelik: stop → trailing → ters sinyal (kötümser).
+    Dönüş: TRADE_DTYPE dizisi
+    """
+    n = len(close)
+    trailing = tp_pct is not None and atr is not None
+    long_at = np.flatnonzero(signals == SIGNAL_LONG)
+    short_at = np.flatnonzero(signals == SIGNAL_SHORT)
+    entries = np.flatnonzero(signals != SIGNAL_HOLD)
+
+    trades = []
+    k = 0
+    while k < len(entries):
+        t = int(entries[k])
+        side = int(signals[t])
+        entry = close[t]
+        lev = int(leverage[t])
+
+        stop = entry * (1 - sl_pct / 100) if side == SIGNAL_LONG else entry * (1 + sl_pct / 100)
+        lo, hi = (-np.inf, stop) if side == SIGNAL_LONG else (stop, np.inf)
+        edge = low if side == SIGNAL_LONG else high   # Karşı uçtaki NaN stop'u gizlemesin
+        stop_bar = int(first_overlap([t + 1], [lo], [hi], edge, edge)[0])
+
+        opposite = short_at if side == SIGNAL_LONG else long_at
+        p = np.searchsorted(opposite, t, side='right')
+        opposite_bar = int(opposite[p]) if p < len(opposite) else -1
+
+        candidates = [(b, r) for b, r in ((stop_bar, 0), (opposite_bar, 2)) if b >= 0]
+        trail_bar, trail_price = -1, np.nan
+        if trailing:
+            bound = min([b for b, _ in candidates] + [n - 1])
+            entry_atr = atr[t] if atr[t] == atr[t] and atr[t] > 0 else 0.0
+            entry_atr = max(entry_atr, entry * ATR_FLOOR_PCT / 100)
+            trail_bar, trail_price = _trail_exit(t, bound, side, entry, entry_atr, tp_pct, trail_mult, high, low)
+            if trail_bar >= 0:
+                candidates.append((trail_bar, 1))
+
+        if candidates:
+            exit_bar, priority = min(candidates)
+            reason = (EXIT_STOP, EXIT_TRAIL, EXIT_OPPOSITE)[priority]
+        else:
+            exit_bar, reason = n - 1, EXIT_END
+        if reason == EXIT_STOP:
+            exit_price = stop
+        elif reason == EXIT_TRAIL:
+            exit_price = trail_price
+        else:
+            exit_price = close[exit_bar]
+
+        move = (exit_price / entry - 1) * side
+        pnl = (move - 2 * fee_pct / 100) * lev * 100
+        trades.append((t, exit_bar, side, lev, entry, exit_price, pnl, reason))
+
+        k = np.searchsorted(entries, exit_bar, side='right')
+    return np.array(trades, dtype=TRADE_DTYPE)
+
+
+def simulate_entries(df, signals, leverage, sl_pct=4.0, fee_pct=0.04, tp_pct=None, trail_mult=TRAIL_MULT):
+    """DataFrame ile simulate_trades (tp_pct verilirse ATR trailing dahil)."""
+    _, high, low, close, _ = _arrays(df)
+    atr = atr_series(high, low, close) if tp_pct is not None else None
+    return simulate_trades(high, low, close, signals, leverage, sl_pct=sl_pct, fee_pct=fee_pct,
+                           atr=atr, tp_pct=tp_pct, trail_mult=trail_mult)
+
+
+def summarize(trades):
+    """İşlem listesi özeti (marjine göre % PnL toplamları)."""
+    if len(trades) == 0:
+        return {'trades': 0, 'wins': 0, 'win_rate': 0.0, 'pnl_pct': 0.0, 'avg_pnl_pct': 0.0, 'max_drawdown_pct': 0.0}
+    pnl = trades['pnl_pct']
+    equity = np.cumsum(pnl)
+    drawdown = np.maximum.accumulate(np.concatenate(([0.0], equity)))[1:] - equity
+    wins = int((pnl > 0).sum())
+    return {
+        'trades': len(trades),
+        'wins': wins,
+        'win_rate': wins / len(trades) * 100,
+        'pnl_pct': float(pnl.sum()),
+        'avg_pnl_pct': float(pnl.mean()),
+        'max_drawdown_pct': float(drawdown.max()),
+    }
+
+
+def run_backtest(engine, df, sl_pct=None, tp_pct=None, trail_mult=TRAIL_MULT, fee_pct=0.04,
+                 window=WINDOW, interval='15m'):
+    """
+    SignalEngine ağırlık/eşik/ayarlarıyla tam backtest (sl_pct/tp_pct verilmezse engine.settings'ten).
+    Dönüş: {'signals', 'scores', 'reasons', 'leverage', 'trades', 'summary'}
+    """
+    if sl_pct is None:
+        sl_pct = float(engine.settings.get('sl_pct', 4.0))
+    if tp_pct is None:
+        tp_pct = float(engine.settings.get('tp_pct', 1.0))
+    signals, scores, reasons = engine.backtest(df, window=window, interval=interval)
+    leverage, _ = leverage_series(df['Close'].to_numpy(dtype=np.float64))
+    trades = simulate_entries(df, signals, leverage, sl_pct=sl_pct, fee_pct=fee_pct,
+                              tp_pct=tp_pct, trail_mult=trail_mult)
+    return {
+        'signals': signals, 'scores': scores, 'reasons': reasons,
+        'leverage': leverage, 'trades': trades, 'summary': summarize(trades),
+    }
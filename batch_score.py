@@ -0,0 +1,315 @@
+"""
+Tüm evrenin tek çağrıda puanlanması (cross-sectional batch scoring).
+
+Girdi: (semboller × mumlar × alanlar) float dizisi, alan sırası ohlcv_store.FIELDS
+(open, high, low, close, volume, ...). Her modül, tüm semboller için son mumdaki durumu
+dizi işlemleriyle hesaplar ve bir "hit" bit maskesi döndürür; ağırlıklar sonradan uygulanır.
+Sonuçlar SignalEngine.get_composite_score ile aynıdır (indikatörlerde float toleransı dahilinde).
+
+    signals, scores, reasons = engine.score_batch(data)
+    decode_reasons(reasons[i])  →  "[Yapı: Trend Bullish] | [FVG: ...]"
+"""
+from datetime import datetime
+
+import numpy as np
+
+from ohlcv_store import FIELDS
+from strategies.structure import swing_masks
+from strategies.order_blocks import order_block_masks_from_arrays, MIN_AGE
+from strategies.volume_profile import batch_poc
+
+_OPEN, _HIGH, _LOW, _CLOSE, _VOLUME = (FIELDS.index(name) for name in ('open', 'high', 'low', 'close', 'volume'))
+
+MIN_BARS = 50
+
+# Sinyal kodları
+SIGNAL_HOLD = 0
+SIGNAL_LONG = 1
+SIGNAL_SHORT = -1
+SIGNAL_NAMES = {SIGNAL_HOLD: "HOLD", SIGNAL_LONG: "LONG", SIGNAL_SHORT: "SHORT"}
+
+# Sebep bitleri (modül sırasıyla)
+R_STRUCT_BULL = 1 << 0
+R_STRUCT_BEAR = 1 << 1
+R_STRUCT_BOS = 1 << 2
+R_FVG_BULL = 1 << 3
+R_FVG_BEAR = 1 << 4
+R_RSI_LOW = 1 << 5
+R_RSI_HIGH = 1 << 6
+R_LIQ_LOWER_WICK = 1 << 7
+R_LIQ_UPPER_WICK = 1 << 8
+R_LIQ_EQUAL_LOWS = 1 << 9
+R_LIQ_EQUAL_HIGHS = 1 << 10
+R_VP_BELOW = 1 << 11
+R_VP_ABOVE = 1 << 12
+R_OB_BULL = 1 << 13
+R_OB_BEAR = 1 << 14
+R_PD_DISCOUNT = 1 << 15
+R_PD_PREMIUM = 1 << 16
+R_OTE_FVG = 1 << 17
+R_KILLZONE = 1 << 18
+
+# (etiket, [(bit, metin), ...]) — get_composite_score'daki sebep metinleriyle aynı
+_REASON_GROUPS = [
+    ("Yapı", None),
+    ("FVG", [(R_FVG_BULL, "Bullish FVG Bölgesi"), (R_FVG_BEAR, "Bearish FVG Bölgesi")]),
+    ("İndikatör", [(R_RSI_LOW, "RSI<35 & BB Altı"), (R_RSI_HIGH, "RSI>65 & BB Üstü")]),
+    ("Likidite", [(R_LIQ_LOWER_WICK, "Lower Wick Hunt | "), (R_LIQ_UPPER_WICK, "Upper Wick Hunt | "),
+                  (R_LIQ_EQUAL_LOWS, "Equal Lows Zone | "), (R_LIQ_EQUAL_HIGHS, "Equal Highs Zone | ")]),
+    ("Hacim", [(R_VP_BELOW, "Price Below POC | "), (R_VP_ABOVE, "Price Above POC | ")]),
+    ("OB", [(R_OB_BULL, "Bullish OB Zone | "), (R_OB_BEAR, "Bearish OB Zone | ")]),
+    ("PD", [(R_PD_DISCOUNT, "Discount Zone | "), (R_PD_PREMIUM, "Premium Zone | ")]),
+    ("OTE", [(R_OTE_FVG, "OTE + FVG | ")]),
+    ("Zaman", [(R_KILLZONE, "Kill Zone Active | ")]),
+]
+
+
+def decode_reasons(code):
+    """Sebep bit maskesini get_composite_score'un sebep metnine çevirir."""
+    code = int(code)
+    parts = []
+    for label, items in _REASON_GROUPS:
+        if items is None:   # Yapı
+            if code & (R_STRUCT_BULL | R_STRUCT_BEAR):
+                text = "Trend Bullish" if code & R_STRUCT_BULL else "Trend Bearish"
+                if code & R_STRUCT_BOS:
+                    text += " + BOS"
+                parts.append(f"[{label}: {text}]")
+            continue
+        text = "".join(t for bit, t in items if code & bit)
+        if text:
+            parts.append(f"[{label}: {text}]")
+    return " | ".join(parts)
+
+
+# --- Yardımcılar ---
+
+def _last_k(mask, k):
+    """Her satırda maskedeki son k True'yu bırakır."""
+    from_end = np.cumsum(mask[:, ::-1], axis=1)[:, ::-1]
+    return mask & (from_end <= k)
+
+
+def _last_two(values, mask):
+    """Her satırda maskeli son iki değer (yoksa NaN): (son, bir önceki)"""
+    idx = np.where(mask, np.arange(mask.shape[1]), -1)
+    i1 = idx.max(axis=1)
+    i2 = np.where(idx == i1[:, None], -1, idx).max(axis=1)
+    rows = np.arange(len(values))
+    v1 = np.where(i1 >= 0, values[rows, np.maximum(i1, 0)], np.nan)
+    v2 = np.where(i2 >= 0, values[rows, np.maximum(i2, 0)], np.nan)
+    return v1, v2
+
+
+def _bits(mask, bit):
+    return np.where(mask, bit, 0).astype(np.int64)
+
+
+# --- Modül kernelleri: (semboller,) hit bit maskesi döndürür ---
+
+def structure_hits(high, low, close, lookback=5):
+    swing_high, swing_low = swing_masks(high, low, lookback)
+    h1, h2 = _last_two(high, swing_high)
+    l1, l2 = _last_two(low, swing_low)
+    enough = (swing_high | swing_low).sum(axis=1) >= 4   # NaN karşılaştırmaları zaten False
+
+    bull = enough & (h1 > h2) & (l1 > l2)
+    bear = enough & (h1 < h2) & (l1 < l2)
+    price = close[:, -1]
+    bos = (bull & (price > h1)) | (bear & (price < l1))
+    return _bits(bull, R_STRUCT_BULL) | _bits(bear, R_STRUCT_BEAR) | _bits(bos, R_STRUCT_BOS)
+
+
+def _fvg_masks(high, low):
+    """Bullish/bearish FVG maskeleri (semboller × n-2); sütun j → mum j + 2."""
+    first_high, first_low = high[:, :-2], low[:, :-2]
+    curr_high, curr_low = high[:, 2:], low[:, 2:]
+    return first_high < curr_low, first_low > curr_high
+
+
+def fvg_hits(high, low, close):
+    bull, bear = _fvg_masks(high, low)
+    price = close[:, -1:]
+    bull_in = _last_k(bull, 5) & (high[:, :-2] <= price) & (price <= low[:, 2:])
+    bear_in = _last_k(bear, 5) & (high[:, 2:] <= price) & (price <= low[:, :-2])
+    raw = 2 * bull_in.sum(axis=1) - 2 * bear_in.sum(axis=1)
+    return _bits(raw > 0, R_FVG_BULL) | _bits(raw < 0, R_FVG_BEAR)
+
+
+def rsi_last(close, window=14):
+    """ta.momentum.rsi'nin son değeri (ewm adjust=False, ilk fark 0), tüm semboller için."""
+    diff = np.diff(close, axis=1)
+    alpha = 1.0 / window
+    avg_up = np.zeros(len(close))
+    avg_down = np.zeros(len(close))
+    for t in range(diff.shape[1]):
+        d = diff[:, t]
+        avg_up = (1 - alpha) * avg_up + alpha * np.maximum(d, 0.0)
+        avg_down = (1 - alpha) * avg_down + alpha * np.maximum(-d, 0.0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rsi = np.where(avg_down == 0, 100.0, 100.0 - 100.0 / (1.0 + avg_up / avg_down))
+    if close.shape[1] < window:
+        rsi[:] = np.nan
+    return rsi
+
+
+def bollinger_last(close, window=20, window_dev=2):
+    """ta BollingerBands (std ddof=0) son değerleri: (upper, lower)"""
+    tail = close[:, -window:]
+    mavg = tail.mean(axis=1)
+    std = tail.std(axis=1)
+    return mavg + window_dev * std, mavg - window_dev * std
+
+
+def rsi_bollinger_hits(close):
+    rsi = rsi_last(close)
+    upper, lower = bollinger_last(close)
+    price = close[:, -1]
+    long_ = (rsi < 35) & (price < lower)
+    short = ~long_ & (rsi > 70) & (price > upper)
+    return _bits(long_, R_RSI_LOW) | _bits(short, R_RSI_HIGH)
+
+
+def liquidity_hits(open_, high, low, volume):
+    o, h, l = open_[:, -1], high[:, -1], low[:, -1]
+    rng = h - l + 1e-8
+    lower_wick, upper_wick = (o - l) / rng, (h - o) / rng
+    current_volume = volume[:, -1]
+    spike = current_volume > np.nanmean(volume[:, -5:], axis=1) * 1.8
+
+    hits = _bits((lower_wick > 0.6) & spike, R_LIQ_LOWER_WICK)
+    hits |= _bits((upper_wick > 0.6) & spike, R_LIQ_UPPER_WICK)
+
+    def _equal(x):
+        x = x[:, -50:]
+        eq = np.zeros(x.shape, dtype=bool)
+        eq[:, 1:] = np.abs(x[:, 1:] - x[:, :-1]) < x[:, 1:] * 0.001
+        return eq, x
+
+    eq_l, lows = _equal(low)
+    has_lows = eq_l.sum(axis=1) >= 2
+    with np.errstate(invalid='ignore', divide='ignore'):
+        zone = np.where(eq_l, lows, np.inf).min(axis=1)
+        near_lows = has_lows & (np.abs(l - zone) / zone < 0.002)
+
+        # Eşit dipler bulunduysa modül orada döner (eşit tepelere bakılmaz)
+        eq_h, highs = _equal(high)
+        has_highs = ~has_lows & (eq_h.sum(axis=1) >= 2)
+        zone = np.where(eq_h, highs, -np.inf).max(axis=1)
+        near_highs = has_highs & (np.abs(h - zone) / zone < 0.002)
+
+    return hits | _bits(near_lows, R_LIQ_EQUAL_LOWS) | _bits(near_highs, R_LIQ_EQUAL_HIGHS)
+
+
+def volume_profile_hits(high, low, close, volume, period=50, bins=20):
+    poc = batch_poc(high[:, -period:], low[:, -period:], volume[:, -period:], bins=bins)
+    price = close[:, -1]
+    below = price < poc * 0.99
+    above = ~below & (price > poc * 1.01)
+    return _bits(below, R_VP_BELOW) | _bits(above, R_VP_ABOVE)
+
+
+def order_block_hits(open_, high, low, close, lookback=50):
+    bull, bear = order_block_masks_from_arrays(open_, close)
+    n = open_.shape[1]
+    window = np.zeros(n, dtype=bool)
+    window[max(0, n - 1 - lookback):max(0, n - MIN_AGE)] = True
+    price = close[:, -1:]
+    bull_in = bull & window & (low <= price) & (price <= high * 1.01)
+    bear_in = bear & window & (low * 0.99 <= price) & (price <= high)
+    return _bits(bull_in.any(axis=1), R_OB_BULL) | _bits(bear_in.any(axis=1), R_OB_BEAR)
+
+
+def pd_array_hits(high, low, close):
+    weekly_high = np.nanmax(high[:, -100:], axis=1)
+    weekly_low = np.nanmin(low[:, -100:], axis=1)
+    equilibrium = (weekly_high + weekly_low) / 2
+    premium = weekly_high - (weekly_high - equilibrium) * 0.25
+    discount = weekly_low + (equilibrium - weekly_low) * 0.25
+    price = close[:, -1]
+    disc = price < discount
+    prem = ~disc & (price > premium)
+    return _bits(disc, R_PD_DISCOUNT) | _bits(prem, R_PD_PREMIUM)
+
+
+def ote_hits(high, low, close, swing_period=30):
+    recent_high = np.nanmax(high[:, -swing_period:], axis=1)
+    recent_low = np.nanmin(low[:, -swing_period:], axis=1)
+    fib_618 = recent_high - (recent_high - recent_low) * 0.618
+    fib_786 = recent_high - (recent_high - recent_low) * 0.786
+    price = close[:, -1]
+    in_zone = (fib_786 <= price) & (price <= fib_618)
+
+    bull, _ = _fvg_masks(high, low)
+    top, bottom = low[:, 2:], high[:, :-2]
+    avg = (top + bottom) / 2
+    p = price[:, None]
+    filled = (bottom <= p) & (p <= top)
+    near = _last_k(bull, 3) & ~filled & (np.abs(p - avg) / p < 0.005)
+    return _bits(in_zone & near.any(axis=1), R_OTE_FVG)
+
+
+def killzone_hits(count, utc_hour=None):
+    if utc_hour is None:
+        utc_hour = datetime.utcnow().hour
+    active = (8 <= utc_hour < 10) or (13.5 <= utc_hour < 16)
+    return np.full(count, R_KILLZONE if active else 0, dtype=np.int64)
+
+
+# --- Birleştirme ---
+
+def _apply_weights(reasons, weights):
+    """Hit bitlerinden (long, short) puanları (get_composite_score'daki modül puanlarıyla aynı)."""
+    def has(bit):
+        return (reasons & bit) != 0
+
+    def w(bit, value):
+        return np.where(has(bit), value, 0)
+
+    long_ = (w(R_STRUCT_BULL, weights['structure']) + np.where(has(R_STRUCT_BULL) & has(R_STRUCT_BOS), 1, 0)
+             + w(R_FVG_BULL, weights['fvg']) + w(R_RSI_LOW, weights['rsi_boll'])
+             + w(R_LIQ_LOWER_WICK, weights['liquidity']) + w(R_LIQ_EQUAL_LOWS, 2)
+             + w(R_VP_BELOW, weights['volume_profile']) + w(R_OB_BULL, weights['order_block'])
+             + w(R_PD_DISCOUNT, weights['pd_arrays']) + w(R_OTE_FVG, weights['ote'])
+             + w(R_KILLZONE, weights['killzones']))
+    short = (w(R_STRUCT_BEAR, weights['structure']) + np.where(has(R_STRUCT_BEAR) & has(R_STRUCT_BOS), 1, 0)
+             + w(R_FVG_BEAR, weights['fvg']) + w(R_RSI_HIGH, weights['rsi_boll'])
+             + w(R_LIQ_UPPER_WICK, weights['liquidity']) + w(R_LIQ_EQUAL_HIGHS, 2)
+             + w(R_VP_ABOVE, weights['volume_profile']) + w(R_OB_BEAR, weights['order_block'])
+             + w(R_PD_PREMIUM, weights['pd_arrays']) + w(R_KILLZONE, weights['killzones']))
+    return long_, short
+
+
+def score_batch(data, weights, threshold, vp_bins=20, utc_hour=None):
+    """
+    data: (semboller × mumlar × alanlar) dizisi (FIELDS sırası).
+    Dönüş: (sinyaller int8 [SIGNAL_*], puanlar int, sebep bit maskeleri int64)
+    """
+    data = np.asarray(data, dtype=np.float64)
+    count, bars = data.shape[0], data.shape[1]
+    signals = np.zeros(count, dtype=np.int8)
+    scores = np.zeros(count, dtype=np.int64)
+    reasons = np.zeros(count, dtype=np.int64)
+    if count == 0 or bars < MIN_BARS:
+        return signals, scores, reasons   # Yetersiz veri → HOLD
+
+    open_, high, low = data[:, :, _OPEN], data[:, :, _HIGH], data[:, :, _LOW]
+    close, volume = data[:, :, _CLOSE], data[:, :, _VOLUME]
+
+    reasons |= structure_hits(high, low, close)
+    reasons |= fvg_hits(high, low, close)
+    reasons |= rsi_bollinger_hits(close)
+    reasons |= liquidity_hits(open_, high, low, volume)
+    reasons |= volume_profile_hits(high, low, close, volume, bins=vp_bins)
+    reasons |= order_block_hits(open_, high, low, close)
+    reasons |= pd_array_hits(high, low, close)
+    reasons |= ote_hits(high, low, close)
+    reasons |= killzone_hits(count, utc_hour)
+
+    long_, short = _apply_weights(reasons, weights)
+    is_long = (long_ >= threshold) & (long_ > short)
+    is_short = ~is_long & (short >= threshold) & (short > long_)
+    signals[is_long] = SIGNAL_LONG
+    signals[is_short] = SIGNAL_SHORT
+    scores = np.where(is_long, long_, np.where(is_short, short, 0)).astype(np.int64)
+    return signals, scores, reasons
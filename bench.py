@@ -0,0 +1,272 @@
+"""
+Puanlama modülleri için tekrarlanabilir benchmark.
+
+Sabit tohumlu sentetik OHLCV (volatilite rejimleri, açılış boşlukları, uzun fitiller) üzerinde
+her SignalEngine._module_*, detect_structure, detect_fvg, risk yardımcıları ve get_composite_score
+farklı mum sayılarında (100, 1k, 10k) ölçülür; evren boyutlarında sıralı puanlama ve score_batch.
+Sonuç JSON olarak yazılır; --compare ile önceki bir commit'in sonucuyla kıyaslanır.
+
+    python bench.py                                  # → bench_output.txt (JSON)
+    python bench.py --out new.json --compare bench_output.txt
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import statistics
+import subprocess
+import time
+
+import numpy as np
+import pandas as pd
+
+from candle_archive import interval_to_ms
+from ohlcv_store import FIELDS, FRAME_COLUMNS
+
+BAR_COUNTS = (100, 1_000, 10_000)
+UNIVERSE_SIZES = (10, 100, 300)
+DEFAULT_OUT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bench_output.txt")
+
+# Volatilite rejimleri: (mum başı σ, rejimde kalma olasılığı)
+REGIMES = ((0.0015, 0.995), (0.004, 0.99), (0.012, 0.97))
+
+
+# --- Sentetik veri ---
+
+def synthetic_ohlcv(n, seed=0, interval='15m', start_price=100.0, start_ms=1_700_000_000_000):
+    """
+    Sabit tohumlu sentetik mum serisi (OHLCVStore.to_frame sütunları).
+    Getiriler t-dağılımlı (kalın kuyruk), σ Markov rejimleriyle değişir; seyrek açılış boşlukları
+    ve uzun fitiller eklenir. Aynı (n, seed) her zaman aynı seriyi verir.
+    """
+    rng = np.random.default_rng(seed)
+    sigma_by_regime = np.array([r[0] for r in REGIMES])
+    stay = np.array([r[1] for r in REGIMES])
+
+    regime = np.empty(n, dtype=np.int64)
+    state = 1
+    switches = rng.random(n)
+    jumps = rng.integers(0, len(REGIMES), n)
+    for i in range(n):
+        if switches[i] > stay[state]:
+            state = jumps[i]
+        regime[i] = state
+    sigma = sigma_by_regime[regime]
+
+    returns = rng.standard_t(4, n) * sigma / np.sqrt(2)   # t(4) varyansı 2
+    gaps = np.where(rng.random(n) < 0.004, rng.normal(0, 4, n) * sigma, 0.0)
+    close = start_price * np.exp(np.cumsum(returns + gaps))
+    open_ = np.concatenate(([start_price], close[:-1])) * np.exp(gaps)
+
+    wick = np.abs(rng.standard_t(3, (2, n))) * sigma * 0.6
+    wick *= np.where(rng.random((2, n)) < 0.02, 5.0, 1.0)          # Seyrek uzun fitiller (likidite avı)
+    high = np.maximum(open_, close) * (1 + wick[0])
+    low = np.minimum(open_, close) * (1 - wick[1])
+
+    volume = rng.lognormal(7, 0.5, n) * (1 + 80 * np.abs(returns)) * (sigma / sigma_by_regime[1])
+    taker_buy = volume * rng.beta(5, 5, n)
+
+    step = interval_to_ms(interval)
+    data = {'Open time': start_ms // step * step + np.arange(n, dtype=np.int64) * step}
+    for name, values in zip(FIELDS, (open_, high, low, close, volume, taker_buy)):
+        data[FRAME_COLUMNS[name]] = values
+    return pd.DataFrame(data)
+
+
+def synthetic_universe(symbols, n, seed=0, interval='15m'):
+    """{sembol: DataFrame}; her sembol kendi tohumuyla (seed + i), farklı fiyat seviyesinde."""
+    return {
+        f"SYN{i:03d}USDT": synthetic_ohlcv(n, seed + i, interval, start_price=10 ** (1 + i % 4))
+        for i in range(symbols)
+    }
+
+
+# --- Ölçüm ---
+
+def _time(func, repeat=5, min_time=0.05, max_loops=1000):
+    """Her ölçüm ≥ min_time sürecek kadar döngü; (çağrı başına min, medyan sn, döngü)."""
+    loops, elapsed = 1, 0.0
+    while True:
+        t0 = time.perf_counter()
+        for _ in range(loops):
+            func()
+        elapsed = time.perf_counter() - t0
+        if elapsed >= min_time or loops >= max_loops:
+            break
+        loops = min(max_loops, loops * max(2, int(min_time / max(elapsed, 1e-9))))
+    samples = [elapsed / loops]
+    for _ in range(repeat - 1):
+        t0 = time.perf_counter()
+        for _ in range(loops):
+            func()
+        samples.append((time.perf_counter() - t0) / loops)
+    return min(samples), statistics.median(samples), loops
+
+
+class BenchmarkSuite:
+    def __init__(self, bar_counts=BAR_COUNTS, universe_sizes=UNIVERSE_SIZES, seed=42, repeat=5,
+                 min_time=0.05, log_func=None):
+        self.bar_counts = bar_counts
+        self.universe_sizes = universe_sizes
+        self.seed = seed
+        self.repeat = repeat
+        self.min_time = min_time
+        self.log = log_func if log_func else print
+        self.results = []
+
+    def _record(self, group, name, func, bars, symbols=1):
+        try:
+            best, median, loops = _time(func, self.repeat, self.min_time)
+        except Exception as e:
+            self.log(f"❌ {group}/{name} [{bars} mum]: {e}")
+            return
+        self.results.append({
+            'group': group, 'name': name, 'bars': bars, 'symbols': symbols,
+            'min_ms': best * 1000, 'median_ms': median * 1000, 'loops': loops, 'repeat': self.repeat,
+        })
+        self.log(f"⏱️ {group:<10} {name:<28} {bars:>6} mum × {symbols:<4} {median * 1000:10.3f} ms")
+
+    def _engine(self, threshold=None):
+        from strategies.score import SignalEngine
+        engine = SignalEngine(log_func=lambda *args, **kwargs: None)
+        if threshold is not None:
+            engine.settings = {'score_thresh': threshold}
+        return engine
+
+    def run_modules(self):
+        """Her modül soğuk FeatureContext ile (paylaşılan primitiflerin hesabı dahil)."""
+        engine = self._engine()
+        for bars in self.bar_counts:
+            df = synthetic_ohlcv(bars, self.seed)
+            for module in engine.modules:
+                func = module['func']
+                self._record('module', module['name'], lambda: func(engine.feature_context(df)), bars)
+
+    def run_detectors(self):
+        from strategies.structure import detect_structure
+        from strategies.fvg import detect_fvg
+        for bars in self.bar_counts:
+            df = synthetic_ohlcv(bars, self.seed)
+            self._record('detector', 'detect_structure', lambda: detect_structure(df), bars)
+            self._record('detector', 'detect_fvg', lambda: detect_fvg(df), bars)
+
+    def run_risk(self):
+        from strategies.risk import (
+            calculate_atr, calculate_dynamic_stops, calc_chandelier_exit, calc_swing_exit, calc_msb_exit,
+        )
+        for bars in self.bar_counts:
+            df = synthetic_ohlcv(bars, self.seed)
+            price = float(df['Close'].iloc[-1])
+            atr = calculate_atr(df)
+            self._record('risk', 'calculate_atr', lambda: calculate_atr(df), bars)
+            self._record('risk', 'calculate_dynamic_stops', lambda: calculate_dynamic_stops(df, price, "LONG"), bars)
+            self._record('risk', 'calc_chandelier_exit', lambda: calc_chandelier_exit(df, "LONG", atr), bars)
+            self._record('risk', 'calc_swing_exit', lambda: calc_swing_exit(df, "LONG"), bars)
+            self._record('risk', 'calc_msb_exit', lambda: calc_msb_exit(df, "LONG"), bars)
+
+    def run_composite(self):
+        """get_composite_score: varsayılan eşik (erken HOLD açık) ve eşik 0 (tüm modüller çalışır)."""
+        for label, threshold in (('get_composite_score', None), ('get_composite_score[all]', 0)):
+            engine = self._engine(threshold)
+            for bars in self.bar_counts:
+                df = synthetic_ohlcv(bars, self.seed)
+                self._record('composite', label, lambda: engine.get_composite_score(df), bars)
+
+    def run_universe(self, bars=100):
+        """Canlı tarama boyutu (100 mum): sembol başına sıralı puanlama ve tek çağrıda score_batch."""
+        from strategies.batch_score import score_batch
+        engine = self._engine()
+        for symbols in self.universe_sizes:
+            frames = list(synthetic_universe(symbols, bars, self.seed).values())
+            data = np.stack([df[[FRAME_COLUMNS[name] for name in FIELDS]].to_numpy() for df in frames])
+
+            def sequential():
+                for df in frames:
+                    engine.get_composite_score(df)
+
+            self._record('universe', 'get_composite_score', sequential, bars, symbols)
+            self._record('universe', 'score_batch',
+                         lambda: score_batch(data, engine.weights, engine.threshold), bars, symbols)
+
+    def run(self, groups=None):
+        groups = groups or ('modules', 'detectors', 'risk', 'composite', 'universe')
+        for group in groups:
+            getattr(self, f"run_{group}")()
+        return self.report()
+
+    def report(self):
+        return {'meta': _metadata(self.seed), 'results': self.results}
+
+
+def _metadata(seed):
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__)), timeout=10).stdout.strip() or None
+    except Exception:
+        commit = None
+    try:
+        from strategies.kernels import get_backend
+        backend = get_backend()
+    except Exception:
+        backend = None
+    return {
+        'commit': commit,
+        'timestamp': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+        'seed': seed,
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'kernel_backend': backend,
+    }
+
+
+def compare(old, new, threshold=0.10):
+    """
+    İki sonucu (group, name, bars, symbols) anahtarıyla kıyaslar (medyan süreler).
+    Dönüş: [(anahtar, eski ms, yeni ms, oran)], oran = yeni / eski; |oran - 1| > threshold olanlar işaretlenir.
+    """
+    def index(report):
+        return {(r['group'], r['name'], r['bars'], r['symbols']): r['median_ms'] for r in report['results']}
+
+    before, after = index(old), index(new)
+    rows = []
+    for key in sorted(set(before) & set(after)):
+        ratio = after[key] / before[key] if before[key] else float('inf')
+        rows.append((key, before[key], after[key], ratio))
+    lines = [f"📊 {old['meta'].get('commit')} → {new['meta'].get('commit')}"]
+    for (group, name, bars, symbols), a, b, ratio in rows:
+        flag = "🔴" if ratio > 1 + threshold else "🟢" if ratio < 1 - threshold else "  "
+        lines.append(f"{flag} {group:<10} {name:<28} {bars:>6} × {symbols:<4} {a:10.3f} → {b:10.3f} ms ({ratio:.2f}x)")
+    return rows, "\n".join(lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Puanlama modülleri benchmark'ı")
+    parser.add_argument('--out', default=DEFAULT_OUT, help="JSON çıktı dosyası")
+    parser.add_argument('--compare', metavar='JSON', help="Önceki sonuçla kıyasla")
+    parser.add_argument('--groups', nargs='*', choices=('modules', 'detectors', 'risk', 'composite', 'universe'))
+    parser.add_argument('--bars', nargs='*', type=int, default=list(BAR_COUNTS))
+    parser.add_argument('--universe', nargs='*', type=int, default=list(UNIVERSE_SIZES))
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--min-time', type=float, default=0.05, help="Ölçüm başına en az süre (sn)")
+    args = parser.parse_args()
+
+    # Kıyas dosyası çıktıyla aynıysa üzerine yazmadan önce oku
+    previous = None
+    if args.compare:
+        with open(args.compare) as f:
+            previous = json.load(f)
+
+    suite = BenchmarkSuite(bar_counts=args.bars, universe_sizes=args.universe, seed=args.seed,
+                           repeat=args.repeat, min_time=args.min_time)
+    report = suite.run(args.groups)
+    with open(args.out, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"💾 {len(report['results'])} ölçüm → {args.out}")
+
+    if previous is not None:
+        print(compare(previous, report)[1])
@@ -0,0 +1,160 @@
+"""
+Sembol/interval başına sadece-ekleme (append-only) disk mum arşivi.
+
+Her dosya sabit boyutlu kayıtlardan oluşur (ARCHIVE_DTYPE, başlıksız), bu yüzden
+np.memmap ile kopyasız okunabilir ve çevrimdışı araştırmada doğrudan kullanılabilir:
+    arc = CandleArchive("data/candles")
+    rec = arc.read("BTCUSDT", "15m")          # yapılandırılmış dizi (memmap)
+    df = arc.read_frame("BTCUSDT", "15m")     # DataFrame
+    arc.gaps("BTCUSDT", "15m")                # kaynakta olmayan aralıklar: [(önceki open, sonraki open)]
+
+Arşiv normalde boşluksuzdur; borsanın kendisinde mum olmayan aralıklar (bakım, delist/relist) sadece
+append(..., allow_gap=True) ile yazılır ve yanındaki .gaps dosyasına (int64 çiftleri) kaydedilir.
+"""
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+from ohlcv_store import FIELDS, FRAME_COLUMNS
+
+ARCHIVE_DTYPE = np.dtype([('open_time', '<i8')] + [(name, '<f8') for name in FIELDS])
+
+_INTERVAL_UNITS_MS = {'m': 60_000, 'h': 3_600_000, 'd': 86_400_000, 'w': 604_800_000}
+
+
+def interval_to_ms(interval):
+    """'15m' → 900000. (Aylık '1M' desteklenmez.)"""
+    return int(interval[:-1]) * _INTERVAL_UNITS_MS[interval[-1]]
+
+
+class CandleArchive:
+    def __init__(self, root):
+        self.root = root
+        self._lock = threading.Lock()
+        self._file_locks = {}
+        self._last_open = {}   # (symbol, interval) -> son yazılan open time (dosyayı tekrar okumamak için)
+
+    def path(self, symbol, interval):
+        return os.path.join(self.root, interval, f"{symbol}.bin")
+
+    def _file_lock(self, key):
+        with self._lock:
+            lock = self._file_locks.get(key)
+            if lock is None:
+                lock = self._file_locks[key] = threading.Lock()
+            return lock
+
+    def gaps_path(self, symbol, interval):
+        return os.path.join(self.root, interval, f"{symbol}.gaps")
+
+    def symbols(self, interval):
+        folder = os.path.join(self.root, interval)
+        if not os.path.isdir(folder):
+            return []
+        return sorted(f[:-4] for f in os.listdir(folder) if f.endswith('.bin'))
+
+    def count(self, symbol, interval):
+        path = self.path(symbol, interval)
+        if not os.path.exists(path):
+            return 0
+        return os.path.getsize(path) // ARCHIVE_DTYPE.itemsize
+
+    def last_open_time(self, symbol, interval):
+        key = (symbol, interval)
+        if key in self._last_open:
+            return self._last_open[key]
+        with self._file_lock(key):
+            return self._last_open_locked(key)
+
+    def _last_open_locked(self, key):
+        """Dosya kilidi altında çağrılır."""
+        if key in self._last_open:
+            return self._last_open[key]
+        symbol, interval = key
+        n = self.count(symbol, interval)
+        if n == 0:
+            last = None
+        else:
+            with open(self.path(symbol, interval), 'rb') as f:
+                f.seek((n - 1) * ARCHIVE_DTYPE.itemsize)
+                last = int(np.frombuffer(f.read(ARCHIVE_DTYPE.itemsize), dtype=ARCHIVE_DTYPE)['open_time'][0])
+        self._last_open[key] = last
+        return last
+
+    def read(self, symbol, interval, limit=None, start_time=None, end_time=None):
+        """
+        Kayıtları yapılandırılmış dizi olarak döndürür (memmap görünümü, salt okunur).
+        start_time/end_time: open time aralığı (dahil/hariç).
+        """
+        n = self.count(symbol, interval)
+        if n == 0:
+            return np.empty(0, dtype=ARCHIVE_DTYPE)
+        rec = np.memmap(self.path(symbol, interval), dtype=ARCHIVE_DTYPE, mode='r', shape=(n,))
+        if start_time is not None or end_time is not None:
+            times = rec['open_time']
+            lo = 0 if start_time is None else int(np.searchsorted(times, start_time, side='left'))
+            hi = n if end_time is None else int(np.searchsorted(times, end_time, side='left'))
+            rec = rec[lo:hi]
+        if limit is not None:
+            rec = rec[-limit:]
+        return rec
+
+    def gaps(self, symbol, interval):
+        """Kayıtlı boşluklar: (k, 2) int64 dizisi, her satır (boşluktan önceki open time, sonraki open time)."""
+        path = self.gaps_path(symbol, interval)
+        if not os.path.exists(path):
+            return np.empty((0, 2), dtype=np.int64)
+        return np.fromfile(path, dtype='<i8').reshape(-1, 2)
+
+    def read_frame(self, symbol, interval, **kwargs):
+        rec = self.read(symbol, interval, **kwargs)
+        data = {'Open time': np.asarray(rec['open_time'])}
+        for name in FIELDS:
+            data[FRAME_COLUMNS[name]] = np.asarray(rec[name])
+        return pd.DataFrame(data, copy=True)
+
+    def append(self, symbol, interval, open_time, values, allow_gap=False):
+        """
+        Son arşivlenen mumdan yeni olanları dosyaya ekler.
+        open_time (n,), values (alan × n). Yazılan kayıt sayısını döndürür.
+        Arşiv boşluksuz tutulur: yeni mumlar son mumdan tam bir interval sonra başlamalı ve
+        aralarında boşluk olmamalı, aksi halde ValueError (hiçbir şey yazılmaz).
+        allow_gap: veri, borsadan son mumun hemen sonrasından itibaren çekildiyse aradaki eksikler
+        kaynakta yoktur → yazılır ve boşluklar gap index'e kaydedilir.
+        """
+        key = (symbol, interval)
+        open_time = np.asarray(open_time, dtype=np.int64)
+        # Son mum okuması ve yazım aynı kilit altında: iki thread aynı mumları iki kez eklemesin
+        with self._file_lock(key):
+            last = self._last_open_locked(key)
+            mask = open_time > last if last is not None else np.ones(len(open_time), dtype=bool)
+            n = int(mask.sum())
+            if n == 0:
+                return 0
+            step = interval_to_ms(interval)
+            new_times = open_time[mask]
+            prev = np.concatenate(([last], new_times[:-1])) if last is not None else new_times[:-1]
+            following = new_times if last is not None else new_times[1:]
+            jump = following - prev != step
+            if jump.any() and not allow_gap:
+                if last is not None and jump[0]:
+                    raise ValueError(f"{symbol} {interval}: arşiv {last} ile biterken {int(new_times[0])} eklenemez (boşluk)")
+                raise ValueError(f"{symbol} {interval}: eklenecek mumlar ardışık değil")
+            if np.any(following < prev):
+                raise ValueError(f"{symbol} {interval}: eklenecek mumlar sıralı değil")
+
+            rec = np.empty(n, dtype=ARCHIVE_DTYPE)
+            rec['open_time'] = new_times
+            for i, name in enumerate(FIELDS):
+                rec[name] = np.asarray(values[i])[mask]
+
+            os.makedirs(os.path.dirname(self.path(symbol, interval)), exist_ok=True)
+            with open(self.path(symbol, interval), 'ab') as f:
+                f.write(rec.tobytes())
+            if jump.any():
+                with open(self.gaps_path(symbol, interval), 'ab') as f:
+                    f.write(np.column_stack((prev[jump], following[jump])).astype('<i8').tobytes())
+            self._last_open[key] = int(rec['open_time'][-1])
+        return n
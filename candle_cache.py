@@ -0,0 +1,240 @@
+import threading
+import time
+
+import numpy as np
+
+from candle_archive import interval_to_ms
+from ohlcv_store import FIELDS, OHLCVStore
+
+MAX_GAP_PAGES = 20     # Sıcak başlangıçta arşivden sonraki boşluk için en fazla sayfa
+GAP_PAGE_LIMIT = 1000  # Boşluk doldurma sayfa boyutu
+MAX_PENDING_CLOSED = 16  # Canlı değilken saklanan kapanmış mum satırı (anahtar başına)
+
+
+class CandleCache:
+    """
+    (sembol, interval) bazlı, thread-safe paylaşımlı mum önbelleği.
+    Her anahtar sabit kapasiteli bir OHLCVStore (kolon bazlı ring buffer) tutar.
+    REST modunda sadece son açık mumdan (dahil) sonrasını çeker; WebSocket
+    akışı canlıysa buffer doğrudan akıştan beslenir ve REST'e hiç gidilmez.
+    Arşiv verilirse ilk erişimde diskten yüklenir (sadece kapanıştan sonraki boşluk
+    çekilir) ve kapanan mumlar arşive artımlı yazılır.
+    """
+
+    def __init__(self, client, max_bars=500, archive=None, log_func=None):
+        self.client = client
+        self.max_bars = max_bars
+        self.archive = archive
+        self.log = log_func if log_func else print
+        self._archive_errors = set()   # Arşiv hatası loglanmış anahtarlar (anahtar başına bir kez)
+
+        self._lock = threading.Lock()
+        self._stores = {}      # (symbol, interval) -> OHLCVStore
+        self._key_locks = {}   # Aynı anahtar için tek istek (tarayıcı + monitor aynı anda isteyebilir)
+        self._live = set()     # Akıştan beslenen (REST gerektirmeyen) anahtarlar
+        self._pending_closed = {}   # Canlı değilken gelen kapanmış mum satırları (backfill sonrası işlenir)
+
+    def _key_lock(self, key):
+        with self._lock:
+            lock = self._key_locks.get(key)
+            if lock is None:
+                lock = self._key_locks[key] = threading.Lock()
+            return lock
+
+    def _refresh(self, key, limit):
+        """Kilit altında çağrılır: store'u REST ile günceller ve döndürür."""
+        symbol, interval = key
+        store = self._stores.get(key)
+
+        if key in self._live and store is not None and len(store) >= limit:
+            return store
+
+        page = limit
+        if store is None:
+            store = self._stores[key] = OHLCVStore(self.max_bars)
+            if self._warm_start(key, store):
+                page = GAP_PAGE_LIMIT   # Kapanıştan beri oluşan boşluk büyük olabilir
+
+        if len(store) < limit:
+            # Soğuk başlangıç veya daha uzun geçmiş isteniyor → tam çekim
+            store.clear()
+            store.extend_klines(self.client.klines(symbol, interval, limit=limit))
+        elif not self._fetch_gap(key, store, page):
+            # Boşluk sayfa sınırından büyük → cache eskimiş, baştan çek
+            store.clear()
+            store.extend_klines(self.client.klines(symbol, interval, limit=limit))
+
+        self._archive_closed(key, store)
+        return store
+
+    def _fetch_gap(self, key, store, page):
+        """Son mumdan (dahil) sonrasını sayfa sayfa çeker. Yetişemezse False."""
+        symbol, interval = key
+        start = store.last_open_time()
+        max_pages = MAX_GAP_PAGES if page >= GAP_PAGE_LIMIT else 1
+        for _ in range(max_pages):
+            new_rows = self.client.klines(symbol, interval, startTime=start, limit=page)
+            if new_rows:
+                if self.archive is not None and len(new_rows) > 1:
+                    # Sayfa store kapasitesinden büyük olabilir → önce sayfanın kendisini arşivle
+                    self._archive_closed(key, OHLCVStore.from_klines(new_rows))
+                # Oluşmakta olan son mum (ve varsa çakışanlar) yenisiyle değişir
+                store.truncate_from(new_rows[0][0])
+                store.extend_klines(new_rows)
+            if len(new_rows) < page:
+                return True
+            start = new_rows[-1][0]
+        return False
+
+    def _warm_start(self, key, store):
+        """Arşivdeki son mumları store'a yükler. Yükleme olduysa True."""
+        if self.archive is None:
+            return False
+        rec = self.archive.read(key[0], key[1], limit=self.max_bars)
+        if len(rec) == 0:
+            return False
+        store.extend_arrays(
+            np.asarray(rec['open_time']),
+            np.vstack([np.asarray(rec[name]) for name in FIELDS])
+        )
+        return True
+
+    def _archive_closed(self, key, store, last_closed=False):
+        """
+        Store'daki kapanmış (ve henüz arşivlenmemiş) mumları arşive ekler.
+        Son satır, akış kapandığını bildirmedikçe (last_closed) oluşmakta kabul edilir ve yazılmaz:
+        yerel saat sunucunun gerisindeyse yarım mum arşive girip bir daha düzeltilemez.
+        Arşiv store'un ilk mumundan gerideyse (store baştan çekildiyse) önce REST ile ileri sarılır.
+        """
+        if self.archive is None or len(store) == 0:
+            return
+        try:
+            arrs = store.arrays()
+            now_ms = int(time.time() * 1000)
+            closed = arrs['open_time'] + interval_to_ms(key[1]) <= now_ms
+            if not last_closed:
+                closed[-1] = False
+            if closed.any():
+                times = arrs['open_time'][closed]
+                if not self._catch_up_archive(key, int(times[0])):
+                    self._log_archive_once(key, "arşiv boşluğu sayfa sınırından büyük, gap index'e kaydedildi")
+                # Arşivle store arası REST'ten dolduruldu: kalan eksikler kaynakta yok
+                self.archive.append(key[0], key[1], times, [arrs[name][closed] for name in FIELDS], allow_gap=True)
+        except Exception as e:
+            # Arşiv hatası canlı veriyi etkilemesin; ama sessizce de yutulmasın (anahtar başına bir kez logla)
+            self._log_archive_once(key, f"mum arşivine yazılamadı: {e}")
+
+    def _catch_up_archive(self, key, until):
+        """
+        Arşivin son mumundan `until` open time'ına kadar olan mumları REST'ten sayfa sayfa arşive yazar.
+        Aralık kapandıysa (veya boşluk yoksa) True.
+        """
+        symbol, interval = key
+        step = interval_to_ms(interval)
+        last = self.archive.last_open_time(symbol, interval)
+        if last is None or until <= last + step:
+            return True
+        cursor = last + step
+        for _ in range(MAX_GAP_PAGES):
+            rows = self.client.klines(symbol, interval, startTime=cursor, endTime=until - 1, limit=GAP_PAGE_LIMIT)
+            if rows:
+                arrs = OHLCVStore.from_klines(rows).arrays()
+                self.archive.append(symbol, interval, arrs['open_time'], [arrs[name] for name in FIELDS],
+                                    allow_gap=True)
+                cursor = int(rows[-1][0]) + step
+            if len(rows) < GAP_PAGE_LIMIT or cursor >= until:
+                return True
+        return False
+
+    def _log_archive_once(self, key, message):
+        if key in self._archive_errors:
+            return
+        self._archive_errors.add(key)
+        self.log(f"⚠️ {key[0]} {key[1]}: {message}")
+
+    def refresh(self, symbol, interval, limit=100):
+        """Anahtarı günceller (akış backfill'i için)."""
+        key = (symbol, interval)
+        with self._key_lock(key):
+            self._refresh(key, limit)
+
+    def get_frame(self, symbol, interval, limit=100):
+        """Son `limit` mumu DataFrame olarak döndürür (float kolonlar, kopya)."""
+        key = (symbol, interval)
+        with self._key_lock(key):
+            return self._refresh(key, limit).to_frame(limit)
+
+    def get_arrays(self, symbol, interval, limit=100):
+        """Son `limit` mumun NumPy dizileri (kilit dışında kullanılacağı için kopya)."""
+        key = (symbol, interval)
+        with self._key_lock(key):
+            arrs = self._refresh(key, limit).arrays(limit)
+            return {name: arr.copy() for name, arr in arrs.items()}
+
+    def apply_kline(self, symbol, interval, row, closed=False):
+        """
+        Akıştan gelen tek bir kline satırını buffer'a işler (son mumu günceller veya ekler).
+        closed: akışın mum kapandı bayrağı (k['x']) — kapanan mum hemen arşivlenir.
+        Anahtar canlı değilse (backfill bitmedi) satır işlenmez: oluşan mum satırları atılır,
+        kapanmış satırlar saklanıp set_live(True) ile uygulanır. Satır son mumdan bir interval'den
+        ileriyse araya kaçan mumlar önce REST ile çekilir (boşluklu ekleme yapılmaz).
+        """
+        key = (symbol, interval)
+        with self._key_lock(key):
+            if key not in self._live:
+                if closed:
+                    with self._lock:
+                        pending = self._pending_closed.setdefault(key, [])
+                        pending.append(row)
+                        del pending[:-MAX_PENDING_CLOSED]
+                return False
+            return self._apply_row(key, row, closed)
+
+    def _apply_row(self, key, row, closed):
+        """Kilit altında çağrılır."""
+        store = self._stores.get(key)
+        if store is None or len(store) == 0:
+            return False  # Henüz REST ile doldurulmadı, backfill bekleniyor
+        prev_last = store.last_open_time()
+        if int(row[0]) > prev_last + interval_to_ms(key[1]):
+            self._fill_gap(key, store)
+            prev_last = store.last_open_time()
+        updated = store.upsert_kline(row)
+        if updated and closed:
+            self._archive_closed(key, store, last_closed=True)
+        elif updated and store.last_open_time() != prev_last:
+            # Yeni mum açıldı → bir önceki kapanmıştır
+            self._archive_closed(key, store)
+        return updated
+
+    def _fill_gap(self, key, store):
+        """Akışta kaçan mumlar: son mumdan (dahil) itibaren REST; yetişemezse baştan çek."""
+        if not self._fetch_gap(key, store, GAP_PAGE_LIMIT):
+            store.clear()
+            store.extend_klines(self.client.klines(key[0], key[1], limit=self.max_bars))
+
+    def set_live(self, symbol, interval, live=True):
+        """
+        Anahtarın akıştan beslenip beslenmediğini işaretler.
+        Canlıya geçerken, canlı değilken gelen kapanmış mum satırları sırayla uygulanır.
+        """
+        key = (symbol, interval)
+        if not live:
+            with self._lock:
+                self._live.discard(key)
+            return
+        with self._key_lock(key):
+            with self._lock:
+                self._live.add(key)
+                pending = self._pending_closed.pop(key, [])
+            for row in pending:
+                self._apply_row(key, row, True)
+
+    def invalidate(self, symbol=None, interval=None):
+        """Önbelleği temizler (sembol/interval verilmezse hepsini)."""
+        with self._lock:
+            for key in list(self._stores):
+                if (symbol is None or key[0] == symbol) and (interval is None or key[1] == interval):
+                    del self._stores[key]
+                    self._live.discard(key)
+                    self._pending_closed.pop(key, None)
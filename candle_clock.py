@@ -0,0 +1,163 @@
+"""
+Mum kapanışına hizalı tarama zamanlayıcısı.
+
+Sabit `SCAN_INTERVAL_SECONDS` uykusu tarama başlangıcını mum sınırlarına göre kaydırır.
+CandleClock borsa sunucu saatine olan farkı (offset) ölçer ve taramayı her mum kapanışından
+`close_delay_ms` sonra tetikler; istenirse mum ortasında sabit aralıklarla ara taramalar da yapar.
+Mum kapanışı → tarama başlangıcı ve → sinyal üretimi arasındaki gecikme (skew) raporlanır.
+
+    clock = CandleClock(client, '15m', close_delay_ms=300, mid_bar_seconds=300)
+    while running:
+        tick = clock.wait(lambda: not running)     # {'close_time', 'is_close', 'skew_ms'}
+        scan()
+        clock.record_signal()                      # her sinyalde (sinyal gecikmesi)
+"""
+import threading
+import time
+
+from candle_archive import interval_to_ms
+
+WEEK_OFFSET_MS = 4 * 86_400_000   # Epoch Perşembe; Binance haftalık mumları Pazartesi 00:00 UTC açılır
+
+
+class CandleClock:
+    def __init__(self, client, interval='15m', close_delay_ms=300, mid_bar_seconds=None,
+                 resync_seconds=600, samples=3, log_func=None):
+        self.client = client
+        self.interval = interval
+        self.interval_ms = interval_to_ms(interval)
+        self.close_delay_ms = close_delay_ms
+        self.mid_bar_ms = int(mid_bar_seconds * 1000) if mid_bar_seconds else None
+        self.resync_seconds = resync_seconds
+        self.samples = samples
+        self.log = log_func if log_func else print
+
+        self.offset_ms = 0.0          # sunucu - yerel
+        self.rtt_ms = None
+        self._synced_at = None
+        self._lock = threading.Lock()
+
+        self._last_tick = None        # Son tetiklemenin mum kapanış zamanı (sunucu ms)
+        self.scan_skews = []          # Kapanış → tarama başlangıcı (ms)
+        self.signal_skews = []        # Kapanış → sinyal (ms)
+
+    # --- Sunucu saati ---
+
+    def sync(self):
+        """
+        client.time() ile offset ölçer; en kısa gidiş-dönüşlü ölçüm kullanılır
+        (sunucu zamanı isteğin ortasına denk kabul edilir).
+        """
+        best = None
+        for _ in range(self.samples):
+            try:
+                t0 = time.time() * 1000
+                server = self.client.time()['serverTime']
+                t1 = time.time() * 1000
+            except Exception as e:
+                self.log(f"⚠️ Sunucu saati alınamadı: {e}")
+                continue
+            rtt = t1 - t0
+            if best is None or rtt < best[1]:
+                best = (server - (t0 + t1) / 2, rtt)
+
+        with self._lock:
+            self._synced_at = time.time()
+            if best is not None:
+                self.offset_ms, self.rtt_ms = best
+        if best is not None:
+            self.log(f"🕒 Sunucu saati farkı: {self.offset_ms:+.0f} ms (RTT {self.rtt_ms:.0f} ms)")
+        return self.offset_ms
+
+    def _maybe_resync(self):
+        if self._synced_at is None or time.time() - self._synced_at >= self.resync_seconds:
+            self.sync()
+
+    def server_now_ms(self):
+        return time.time() * 1000 + self.offset_ms
+
+    # --- Mum sınırları ---
+
+    def bar_open(self, t_ms):
+        """t_ms anındaki mumun open time'ı (sunucu ms)."""
+        offset = WEEK_OFFSET_MS if self.interval.endswith('w') else 0
+        return int((t_ms - offset) // self.interval_ms * self.interval_ms + offset)
+
+    def next_fire(self, now_ms=None):
+        """
+        Bir sonraki tetikleme: (sunucu ms, mum kapanış zamanı, kapanış mı).
+        Mum ortası aralığı varsa kapanıştan önceki en yakın ara tik de aday olur.
+        """
+        now_ms = self.server_now_ms() if now_ms is None else now_ms
+        bar_open = self.bar_open(now_ms - self.close_delay_ms)
+        close_time = bar_open + self.interval_ms
+        fire = close_time + self.close_delay_ms
+
+        if self.mid_bar_ms:
+            k = (now_ms - bar_open - self.close_delay_ms) // self.mid_bar_ms + 1
+            mid = bar_open + k * self.mid_bar_ms + self.close_delay_ms
+            if mid < fire:
+                return mid, bar_open, False
+        return fire, close_time, True
+
+    def wait(self, should_stop=None, poll=1.0):
+        """
+        Bir sonraki tetiklemeye kadar uyur (should_stop() True dönerse None ile çıkar).
+        Dönüş: {'close_time': son kapanış (sunucu ms), 'is_close': bool, 'skew_ms': uyanma gecikmesi}
+        """
+        self._maybe_resync()
+        fire, close_time, is_close = self.next_fire()
+        while True:
+            if should_stop is not None and should_stop():
+                return None
+            remaining = (fire - self.server_now_ms()) / 1000
+            if remaining <= 0:
+                break
+            time.sleep(min(remaining, poll))
+
+        return self.mark_tick(close_time, is_close)
+
+    def mark_tick(self, close_time=None, is_close=True):
+        """
+        Tarama başlıyor: gecikmeyi kaydeder (başka bir tetikleyiciyle, örn. kline akışıyla uyanınca da çağrılır).
+        Akıştan uyanınca close_time mesajdaki kapanış olmalı (KlineStream.last_close_time = k['T'] + 1);
+        verilmezse şu anki mumun open time'ı kullanılır — kapanıştan sonraki mum sınırını geçen
+        gecikmede bu yanlış muma denk gelir.
+        """
+        if close_time is None:
+            close_time = self.bar_open(self.server_now_ms())
+        skew = self.server_now_ms() - close_time
+        with self._lock:
+            self._last_tick = close_time
+            if is_close:
+                self.scan_skews.append(skew)
+        return {'close_time': close_time, 'is_close': is_close, 'skew_ms': skew}
+
+    def seconds_to_next_fire(self):
+        self._maybe_resync()
+        return max(0.0, (self.next_fire()[0] - self.server_now_ms()) / 1000)
+
+    # --- Gecikme raporu ---
+
+    def record_signal(self):
+        """Bir sinyal üretildiğinde çağrılır: son mum kapanışından bu yana geçen süre (ms)."""
+        with self._lock:
+            if self._last_tick is None:
+                return None
+            skew = self.server_now_ms() - self._last_tick
+            self.signal_skews.append(skew)
+            return skew
+
+    def format_skew(self, reset=True):
+        """Kapanış → tarama / sinyal gecikmesi özeti (ort / max ms)."""
+        with self._lock:
+            parts = []
+            for name, values in (("tarama", self.scan_skews), ("sinyal", self.signal_skews)):
+                if values:
+                    parts.append(f"{name} ort {sum(values) / len(values):.0f} / max {max(values):.0f} ms ({len(values)})")
+            if reset:
+                self.scan_skews = []
+                self.signal_skews = []
+        if not parts:
+            return None
+        return "⏲️ Mum kapanışı gecikmesi | " + ", ".join(parts)
@@ -0,0 +1,150 @@
+import threading
+import time
+from decimal import Decimal, ROUND_DOWN, ROUND_HALF_UP
+
+
+def to_decimal(value):
+    """float/str → Decimal (float ikili hatası taşımadan)."""
+    if isinstance(value, Decimal):
+        return value
+    return Decimal(str(value))
+
+
+def format_decimal(value):
+    """Decimal → emir parametresi metni; str() '1E-7' gibi bilimsel gösterim üretebilir, borsa reddeder."""
+    return format(to_decimal(value), 'f')
+
+
+def quantize_down(value, step):
+    """Değeri step katına aşağı yuvarlar (miktar için: asla fazla gönderme)."""
+    value, step = to_decimal(value), to_decimal(step)
+    if step <= 0:
+        return value
+    return (value / step).to_integral_value(rounding=ROUND_DOWN) * step
+
+
+def quantize_nearest(value, step):
+    """Değeri en yakın step katına yuvarlar (fiyat için)."""
+    value, step = to_decimal(value), to_decimal(step)
+    if step <= 0:
+        return value
+    return (value / step).to_integral_value(rounding=ROUND_HALF_UP) * step
+
+
+class ExchangeFilterIndex:
+    """
+    Sembol bazlı borsa filtreleri (step/tick size, min notional, max qty).
+    exchange_info() bir kez yüklenir, arka planda periyodik yenilenir;
+    sorgular O(1) dict erişimidir.
+    İlk yükleme başarısız olursa yenileme thread'i retry_seconds aralıkla tekrar dener;
+    get() bilinmeyen sembolde (en fazla retry_seconds'ta bir) indeksi yeniden yükler.
+    """
+
+    def __init__(self, client, refresh_seconds=3600, retry_seconds=30, log_func=None):
+        self.client = client
+        self.refresh_seconds = refresh_seconds
+        self.retry_seconds = retry_seconds
+        self.log = log_func if log_func else print
+
+        self._filters = {}   # symbol -> dict (yenilemede tek atamayla değiştirilir)
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._load_lock = threading.Lock()
+        self._last_attempt = 0.0
+
+    def load(self):
+        """exchange_info() indirip indeksi yeniden kurar."""
+        self._last_attempt = time.time()
+        info = self.client.exchange_info()
+        index = {}
+        for s in info.get('symbols', []):
+            entry = {
+                'step_size': Decimal('0.001'),
+                'tick_size': Decimal('0.01'),
+                'min_qty': Decimal('0'),
+                'max_qty': None,
+                'market_max_qty': None,
+                'min_notional': Decimal('0'),
+            }
+            for f in s.get('filters', []):
+                ftype = f.get('filterType')
+                if ftype == 'LOT_SIZE':
+                    entry['step_size'] = Decimal(f['stepSize'])
+                    entry['min_qty'] = Decimal(f['minQty'])
+                    entry['max_qty'] = Decimal(f['maxQty'])
+                elif ftype == 'MARKET_LOT_SIZE':
+                    entry['market_max_qty'] = Decimal(f['maxQty'])
+                elif ftype == 'PRICE_FILTER':
+                    entry['tick_size'] = Decimal(f['tickSize'])
+                elif ftype == 'MIN_NOTIONAL':
+                    entry['min_notional'] = Decimal(f.get('notional', f.get('minNotional', '0')))
+            index[s['symbol']] = entry
+
+        self._filters = index
+        return len(index)
+
+    def _try_load(self):
+        with self._load_lock:
+            try:
+                count = self.load()
+            except Exception as e:
+                self.log(f"⚠️ Borsa filtreleri yüklenemedi: {e}")
+                return False
+        self.log(f"📚 Borsa filtreleri yüklendi: {count} sembol")
+        return True
+
+    def start(self):
+        """İlk yüklemeyi dener ve (başarısız olsa da) arka plan yenileme thread'ini başlatır."""
+        self._try_load()
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._refresh_loop, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+
+    def _refresh_loop(self):
+        # İndeks boşken kısa aralıkla, doluyken refresh_seconds'ta bir
+        while not self._stop_event.wait(self.refresh_seconds if self._filters else self.retry_seconds):
+            self._try_load()
+
+    def get(self, symbol):
+        f = self._filters.get(symbol)
+        if f is None and time.time() - self._last_attempt >= self.retry_seconds:
+            # İlk yükleme başarısız olmuş veya sembol yeni listelenmiş olabilir
+            self._try_load()
+            f = self._filters.get(symbol)
+        return f
+
+    def quantize_qty(self, symbol, quantity, market=True):
+        """
+        Miktarı step'e aşağı yuvarlar ve max qty ile sınırlar.
+        Filtre yoksa None döner.
+        """
+        f = self._filters.get(symbol)
+        if f is None:
+            return None
+        qty = quantize_down(quantity, f['step_size'])
+        max_qty = f['market_max_qty'] if market and f['market_max_qty'] else f['max_qty']
+        if max_qty is not None and qty > max_qty:
+            qty = quantize_down(max_qty, f['step_size'])
+        return qty
+
+    def quantize_price(self, symbol, price):
+        f = self._filters.get(symbol)
+        if f is None:
+            return None
+        return quantize_nearest(price, f['tick_size'])
+
+    def check_order(self, symbol, quantity, price):
+        """Min qty / min notional kontrolü. (ok, sebep) döner."""
+        f = self._filters.get(symbol)
+        if f is None:
+            return False, "filtre yok"
+        qty = to_decimal(quantity)
+        if qty < f['min_qty'] or qty <= 0:
+            return False, f"min qty {f['min_qty']}"
+        notional = qty * to_decimal(price)
+        if notional < f['min_notional']:
+            return False, f"min notional {f['min_notional']}"
+        return True, ""
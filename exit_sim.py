@@ -0,0 +1,245 @@
+"""
+Çıkış politikası simülatörü: AllyGatorLogic.update_trailing_stop kurallarını geçmiş veride,
+çok sayıda pozisyon için aynı anda (pozisyon × tik matrisleriyle) uygular.
+
+Canlıdaki sıra ve koşullar:
+  - Sabit stop (STOP_MARKET, %sl_pct): her zaman aktif
+  - Aşağıdakiler sadece kâr ≥ %tp_pct iken çalışır (giriş ATR'si, en az fiyatın %0.5'i):
+      ATR trailing   : fiyat ≤ zirve - ATR × trail_mult (zirve yalnızca kârdayken güncellenir)
+      Chandelier     : fiyat ≤ son 22 mumun (oluşan dahil) en yükseği - ATR × 3
+      Swing          : fiyat < önceki 5 kapanmış mumun en düşüğü
+      MSB            : fiyat < önceki 20 kapanmış mumun en düşüğü
+    (SHORT için simetrik.)
+
+Fiyat yolu (tikler): her mum Open → yakın uç → uzak uç → Close olarak dört tik. intrabar olarak 1m mumlar
+verilirse yol 1m mumlardan kurulur; oluşan mumun High/Low'u tik tik büyür (canlıdaki df_recent gibi).
+Bir seviye iki tik arasında geçilirse dolum seviyeden yapılır (arada boşluk varsa tik fiyatından).
+
+    ticks = build_ticks(df_15m, intrabar=df_1m)
+    trades = simulate_exits(ticks, entry_bar, side, atr[entry_bar], sl_pct=4.0, tp_pct=1.0)
+    report = exit_report(trades)
+"""
+import numpy as np
+import pandas as pd
+
+from strategies.backtest import (
+    SIGNAL_LONG, TRADE_DTYPE, TRAIL_MULT, ATR_FLOOR_PCT,
+    EXIT_STOP, EXIT_TRAIL, EXIT_CHANDELIER, EXIT_SWING, EXIT_MSB, EXIT_END, EXIT_NAMES,
+)
+
+EXIT_RULES = ('trail', 'chandelier', 'swing', 'msb')   # update_trailing_stop'taki kontrol sırası
+HORIZON_TICKS = 256        # İlk tarama penceresi; çıkmayan pozisyonlar için iki katına çıkar
+BLOCK_ELEMENTS = 1 << 21   # Pozisyon × tik matrisi başına eleman sınırı
+
+
+# --- Fiyat yolu ---
+
+def _ohlc_path(open_, high, low, close):
+    """Mum başına 4 tik: Open, Open'a yakın uç, diğer uç, Close."""
+    high_first = (high - open_) < (open_ - low)
+    first = np.where(high_first, high, low)
+    second = np.where(high_first, low, high)
+    return np.column_stack((open_, first, second, close)).ravel()
+
+
+def _prior(values, lookback, how):
+    """Her mum b için [b - lookback, b - 1] kapanmış mumlarının max/min'i (yetersizse NaN, rolling gibi)."""
+    return getattr(pd.Series(values).rolling(lookback), how)().shift(1).to_numpy()
+
+
+def build_ticks(bars, intrabar=None, ce_period=22, swing_lookback=5, msb_lookback=20):
+    """
+    bars: sinyal mumları (Open, High, Low, Close; intrabar için 'Open time').
+    intrabar: opsiyonel alt zaman dilimi (örn. 1m) mumları; her biri Open time'ına göre bir bar'a düşer.
+    Dönüş: tik fiyatları, tik başına bar indeksi, bar başına ilk tik ve kural seviyeleri (tik başına).
+    """
+    open_, high, low, close = (bars[name].to_numpy(dtype=np.float64) for name in ('Open', 'High', 'Low', 'Close'))
+    n = len(close)
+
+    if intrabar is None:
+        price = _ohlc_path(open_, high, low, close)
+        bar = np.repeat(np.arange(n), 4)
+    else:
+        minute_bar = np.searchsorted(bars['Open time'].to_numpy(), intrabar['Open time'].to_numpy(), side='right') - 1
+        keep = (minute_bar >= 0) & (minute_bar < n)
+        m = [intrabar[name].to_numpy(dtype=np.float64)[keep] for name in ('Open', 'High', 'Low', 'Close')]
+        price = _ohlc_path(*m)
+        bar = np.repeat(minute_bar[keep], 4)
+
+    # Oluşan mumun o ana kadarki uçları (df_recent.iloc[-1])
+    groups = pd.Series(price).groupby(bar)
+    high_run = groups.cummax().to_numpy()
+    low_run = groups.cummin().to_numpy()
+
+    return {
+        'price': price,
+        'bar': bar,
+        'start': np.searchsorted(bar, np.arange(n + 1)),   # bar b'nin ilk tiki (b = n → tik sonu)
+        'close': close,
+        # Chandelier: rolling(22).iloc[-1] = önceki 21 kapanmış mum + oluşan mum
+        'ce_high': np.maximum(_prior(high, ce_period - 1, 'max')[bar], high_run),
+        'ce_low': np.minimum(_prior(low, ce_period - 1, 'min')[bar], low_run),
+        # Swing / MSB: rolling(k).iloc[-2] = oluşan mumdan önceki k kapanmış mum
+        'swing_low': _prior(low, swing_lookback, 'min')[bar],
+        'swing_high': _prior(high, swing_lookback, 'max')[bar],
+        'msb_low': _prior(low, msb_lookback, 'min')[bar],
+        'msb_high': _prior(high, msb_lookback, 'max')[bar],
+    }
+
+
+# --- Simülasyon ---
+
+def _first_hit(hit, x, x_prev, level):
+    """Satır başına ilk tetiklenen tik ve dolum (normalize uzayda: LONG yönü). Tetik yoksa sütun = K."""
+    k = hit.shape[1]
+    col = np.where(hit.any(axis=1), hit.argmax(axis=1), k)
+    rows = np.arange(hit.shape[0])
+    c = np.minimum(col, k - 1)
+    # Seviye önceki tikten bu tike inerken geçildiyse seviyeden, boşlukla geçildiyse tikten
+    fill = np.maximum(x[rows, c], np.minimum(x_prev[rows, c], level[rows, c]))
+    return col, fill
+
+
+def _simulate_block(ticks, first, sign, entry, atr, sl_pct, tp_pct, trail_mult, ce_mult, rules, width):
+    """first: pozisyonların ilk tik indeksi. Dönüş: (çıkış tiki veya -1, dolum, sebep)."""
+    total = len(ticks['price'])
+    idx = first[:, None] + np.arange(width)[None, :]
+    valid = idx < total
+    idx = np.minimum(idx, total - 1)
+    s = sign[:, None]
+    long_side = s > 0
+
+    # Normalize uzay: x = yön × fiyat; tüm çıkışlar "x seviyenin altına iner" biçiminde
+    x = s * ticks['price'][idx]
+    x_prev = np.concatenate(((sign * entry)[:, None], x[:, :-1]), axis=1)
+    tp_level = (sign * entry * (1 + sign * tp_pct / 100))[:, None]
+    stop_level = (sign * entry * (1 - sign * sl_pct / 100))[:, None]
+    active = valid & (x >= tp_level)
+    a = atr[:, None]
+
+    checks = [(EXIT_STOP, valid & (x <= stop_level), np.broadcast_to(stop_level, x.shape))]
+    if 'trail' in rules:
+        # Zirve kârdaki tiklerle güncellenir; mevcut tik yeni zirveyse çıkış olmaz (önceki zirve yeterli)
+        peak = np.maximum.accumulate(np.where(active, x, (sign * entry)[:, None]), axis=1)
+        level = peak - a * trail_mult
+        checks.append((EXIT_TRAIL, active & (x <= level), level))
+    if 'chandelier' in rules:
+        level = np.where(long_side, ticks['ce_high'][idx], -ticks['ce_low'][idx]) - a * ce_mult
+        checks.append((EXIT_CHANDELIER, active & (x <= level), level))
+    if 'swing' in rules:
+        level = np.where(long_side, ticks['swing_low'][idx], -ticks['swing_high'][idx])
+        checks.append((EXIT_SWING, active & (x < level), level))
+    if 'msb' in rules:
+        level = np.where(long_side, ticks['msb_low'][idx], -ticks['msb_high'][idx])
+        checks.append((EXIT_MSB, active & (x < level), level))
+
+    cols, fills = zip(*(_first_hit(hit, x, x_prev, level) for _, hit, level in checks))
+    cols, fills = np.array(cols), np.array(fills)
+    col = cols.min(axis=0)
+    # Aynı tikte birden fazla kural: seviyesi önce geçilen (daha iyi dolum), eşitlikte canlıdaki sıra
+    pick = np.where(cols == col, fills, -np.inf).argmax(axis=0)
+    reasons = np.array([reason for reason, _, _ in checks])[pick]
+    fill = sign * fills[pick, np.arange(len(first))]
+
+    exit_tick = np.where(col < width, first + col, -1)
+    # Pencere veri sonuna ulaştı ve çıkış yok → veri sonu
+    ended = (exit_tick < 0) & (first + width >= total)
+    exit_tick[ended] = total
+    return exit_tick, np.where(ended, np.nan, fill), np.where(ended, EXIT_END, reasons)
+
+
+def simulate_exits(ticks, entry_bar, side, atr, sl_pct=4.0, tp_pct=1.0, trail_mult=TRAIL_MULT, ce_mult=3.0,
+                   leverage=1, fee_pct=0.04, rules=EXIT_RULES):
+    """
+    entry_bar: giriş mumu (giriş bu mumun kapanışından, çıkışlar sonraki mumdan itibaren).
+    side: SIGNAL_LONG / SIGNAL_SHORT (pozisyon başına); atr: giriş ATR'si (pozisyon başına).
+    rules: EXIT_RULES alt kümesi (sabit stop her zaman aktif).
+    Dönüş: TRADE_DTYPE dizisi (girdi sırasıyla); exit_idx çıkışın olduğu sinyal mumu.
+    """
+    entry_bar = np.atleast_1d(np.asarray(entry_bar, dtype=np.int64))
+    count = len(entry_bar)
+    sign = np.where(np.broadcast_to(side, (count,)) == SIGNAL_LONG, 1, -1).astype(np.int8)
+    leverage = np.broadcast_to(np.asarray(leverage, dtype=np.int8), (count,))
+    close = ticks['close']
+    entry = close[entry_bar]
+    atr = np.broadcast_to(np.asarray(atr, dtype=np.float64), (count,))
+    atr = np.fmax(np.where(atr > 0, atr, np.nan), entry * ATR_FLOOR_PCT / 100)   # calculate_atr alt sınırı
+
+    first = ticks['start'][np.minimum(entry_bar + 1, len(close))]
+    exit_tick = np.full(count, -1, dtype=np.int64)
+    fill = np.full(count, np.nan)
+    reason = np.full(count, EXIT_END, dtype=np.int8)
+
+    pending = np.flatnonzero(first < len(ticks['price']))
+    exit_tick[first >= len(ticks['price'])] = len(ticks['price'])
+    width = HORIZON_TICKS
+    while len(pending):
+        rows = max(1, BLOCK_ELEMENTS // width)
+        unresolved = []
+        for lo in range(0, len(pending), rows):
+            p = pending[lo:lo + rows]
+            t, f, r = _simulate_block(ticks, first[p], sign[p], entry[p], atr[p], sl_pct, tp_pct,
+                                      trail_mult, ce_mult, rules, width)
+            done = t >= 0
+            exit_tick[p[done]], fill[p[done]], reason[p[done]] = t[done], f[done], r[done]
+            unresolved.append(p[~done])
+        pending = np.concatenate(unresolved)
+        width *= 2
+
+    ended = reason == EXIT_END
+    exit_bar = np.where(ended, len(close) - 1, ticks['bar'][np.minimum(exit_tick, len(ticks['price']) - 1)])
+    exit_bar = np.maximum(exit_bar, entry_bar)
+    fill = np.where(ended, close[exit_bar], fill)
+
+    trades = np.empty(count, dtype=TRADE_DTYPE)
+    trades['entry_idx'] = entry_bar
+    trades['exit_idx'] = exit_bar
+    trades['side'] = sign
+    trades['leverage'] = leverage
+    trades['entry'] = entry
+    trades['exit'] = fill
+    trades['pnl_pct'] = ((fill / entry - 1) * sign - 2 * fee_pct / 100) * leverage * 100
+    trades['reason'] = reason
+    return trades
+
+
+# --- Rapor ---
+
+def exit_report(trades):
+    """Çıkış sebebi dağılımı, tutma süresi (mum) ve PnL (marjine göre %) dağılımı."""
+    if len(trades) == 0:
+        return {'trades': 0, 'reasons': {}, 'hold_bars': {}, 'pnl_pct': {}, 'win_rate': 0.0}
+    pnl = trades['pnl_pct']
+    hold = trades['exit_idx'] - trades['entry_idx']
+    reasons = {}
+    for code in np.unique(trades['reason']):
+        mask = trades['reason'] == code
+        reasons[EXIT_NAMES[int(code)]] = {
+            'count': int(mask.sum()),
+            'avg_pnl_pct': float(pnl[mask].mean()),
+            'avg_hold_bars': float(hold[mask].mean()),
+        }
+    p5, p25, p50, p75, p95 = np.percentile(pnl, [5, 25, 50, 75, 95])
+    return {
+        'trades': len(trades),
+        'reasons': reasons,
+        'hold_bars': {'mean': float(hold.mean()), 'median': float(np.median(hold)),
+                      'p90': float(np.percentile(hold, 90)), 'max': int(hold.max())},
+        'pnl_pct': {'mean': float(pnl.mean()), 'std': float(pnl.std()), 'p5': p5, 'p25': p25,
+                    'p50': p50, 'p75': p75, 'p95': p95},
+        'win_rate': float((pnl > 0).mean() * 100),
+    }
+
+
+def format_exit_report(report):
+    if not report['trades']:
+        return "📭 Çıkış simülasyonu: işlem yok"
+    pnl, hold = report['pnl_pct'], report['hold_bars']
+    lines = [
+        f"🧾 Çıkış simülasyonu: {report['trades']} işlem | Kazanma %{report['win_rate']:.1f} | "
+        f"PnL ort %{pnl['mean']:.2f} (p5 %{pnl['p5']:.2f} / medyan %{pnl['p50']:.2f} / p95 %{pnl['p95']:.2f}) | "
+        f"Tutma ort {hold['mean']:.1f} mum (medyan {hold['median']:.0f})"
+    ]
+    for name, stats in sorted(report['reasons'].items(), key=lambda item: -item[1]['count']):
+        lines.append(f"   {name}: {stats['count']} | ort %{stats['avg_pnl_pct']:.2f} | {stats['avg_hold_bars']:.1f} mum")
+    return "\n".join(lines)
@@ -0,0 +1,155 @@
+import numpy as np
+import ta.momentum
+import ta.volatility
+
+from strategies.fvg import find_fvg_arrays, fvg_at, detect_fvg_fill
+from strategies.structure import swing_masks, swing_at, trend_from_swings
+from strategies.order_blocks import find_order_blocks, order_blocks_at
+from strategies.volume_profile import volume_profile
+
+
+class FeatureContext:
+    """
+    Tek (sembol, mum) puanlaması için paylaşılan özellik önbelleği.
+    Modüllerin ortak kullandığı her primitif (indikatörler, swing yapısı, FVG'ler, order block'lar,
+    kuyruk max/min'leri...) ilk istendiğinde bir kez hesaplanır ve saklanır.
+    Girdi DataFrame'i hiçbir zaman değiştirilmez.
+
+    Son satır oluşan mumdur. Yalnızca kapanmış mumlardan türeyen parçalar (swing'ler, FVG'ler,
+    order block'lar) closed_store verilirse (SignalCache) aynı kapanmış mumun sonraki taramalarında
+    yeniden kullanılır; oluşan muma bağlı kısım her seferinde ayrıca eklenir.
+    """
+
+    def __init__(self, df, symbol=None, interval='15m', indicator_book=None, closed_store=None):
+        self.df = df
+        self.symbol = symbol
+        self.interval = interval
+        self.indicator_book = indicator_book
+        self.closed_store = closed_store
+        self._memo = {}
+
+    def __len__(self):
+        return len(self.df)
+
+    @property
+    def key(self):
+        """(sembol, son mumun open time'ı) — bağlamın ait olduğu mum."""
+        open_time = int(self.df['Open time'].iloc[-1]) if 'Open time' in self.df.columns else None
+        return self.symbol, open_time
+
+    def memo(self, key, func):
+        """Genel memoizasyon: key ilk istendiğinde func() çalışır."""
+        try:
+            return self._memo[key]
+        except KeyError:
+            value = self._memo[key] = func()
+            return value
+
+    def closed(self, key, func):
+        """Kapanmış mumlara ait özellik: closed_store varsa mum kapanana kadar taramalar arası paylaşılır."""
+        if self.closed_store is None:
+            return func()
+        try:
+            return self.closed_store[key]
+        except KeyError:
+            value = self.closed_store[key] = func()
+            return value
+
+    # --- Ham diziler ---
+
+    def column(self, name):
+        """Kolonun float64 NumPy dizisi ('Open', 'High', 'Low', 'Close', 'Volume')."""
+        return self.memo(('col', name), lambda: self.df[name].to_numpy(dtype=np.float64))
+
+    @property
+    def close(self):
+        return self.column('Close')[-1]
+
+    def tail_max(self, name, n):
+        return self.memo(('tail_max', name, n), lambda: np.nanmax(self.column(name)[-n:]))
+
+    def tail_min(self, name, n):
+        return self.memo(('tail_min', name, n), lambda: np.nanmin(self.column(name)[-n:]))
+
+    def tail_mean(self, name, n):
+        return self.memo(('tail_mean', name, n), lambda: np.nanmean(self.column(name)[-n:]))
+
+    # --- İndikatörler ---
+
+    def indicators(self):
+        """Son mumun {'rsi', 'bb_upper', 'bb_lower'} değerleri (akışlı durum veya ta)."""
+        return self.memo('indicators', self._indicators)
+
+    def _indicators(self):
+        if self.indicator_book is not None and self.symbol and 'Open time' in self.df.columns:
+            return self.indicator_book.update(self.symbol, self.interval, self.df)
+        close = self.df['Close']
+        bb = ta.volatility.BollingerBands(close, window=20, window_dev=2)
+        return {
+            'rsi': ta.momentum.rsi(close, window=14).iloc[-1],
+            'bb_upper': bb.bollinger_hband().iloc[-1],
+            'bb_lower': bb.bollinger_lband().iloc[-1],
+        }
+
+    # --- Price action primitifleri ---
+
+    def trend(self, lookback=5):
+        """check_trend(detect_structure(df)) → (trend, bos)"""
+        def _build():
+            high, low = self.column('High'), self.column('Low')
+            # Sağ penceresi kapanmış mumlarda biten swing'ler; sadece son adayın penceresi oluşan muma dayanır
+            swing_high_idx, swing_low_idx = self.closed(('swings', lookback), lambda: tuple(
+                np.flatnonzero(mask) for mask in swing_masks(high[:-1], low[:-1], lookback)
+            ))
+            i = len(self.df) - 1 - lookback
+            is_high, is_low = swing_at(high, low, i, lookback)
+            if is_high:
+                swing_high_idx = np.append(swing_high_idx, i)
+            if is_low:
+                swing_low_idx = np.append(swing_low_idx, i)
+            return trend_from_swings(high, low, self.close, swing_high_idx, swing_low_idx)
+        return self.memo(('trend', lookback), _build)
+
+    def fvgs(self):
+        """Son fiyata göre fill durumu güncellenmiş (bullish, bearish) FVG dizileri."""
+        def _build():
+            closed_bull, closed_bear = self.closed('fvgs', lambda: find_fvg_arrays(self.df.iloc[:-1]))
+            live_bull, live_bear = fvg_at(self.column('High'), self.column('Low'), len(self.df) - 1)
+            # concatenate kopya üretir → fill güncellemesi önbellekteki dizilere dokunmaz
+            fvg_bull = np.concatenate((closed_bull, live_bull))
+            fvg_bear = np.concatenate((closed_bear, live_bear))
+            return detect_fvg_fill(self.df, fvg_bull), detect_fvg_fill(self.df, fvg_bear)
+        return self.memo('fvgs', _build)
+
+    def order_blocks(self):
+        """find_order_blocks(df) → (bullish, bearish)"""
+        def _build():
+            closed_bull, closed_bear = self.closed('order_blocks', lambda: find_order_blocks(self.df.iloc[:-1]))
+            live_bull, live_bear = order_blocks_at(
+                self.column('Open'), self.column('Close'), self.column('Low'), self.column('High'), len(self.df) - 1
+            )
+            return np.concatenate((closed_bull, live_bull)), np.concatenate((closed_bear, live_bear))
+        return self.memo('order_blocks', _build)
+
+    def volume_profile(self, period=50, bins=20):
+        return self.memo(('volume_profile', period, bins), lambda: volume_profile(
+            self.column('High')[-period:], self.column('Low')[-period:], self.column('Volume')[-period:],
+            bins=bins
+        ))
+
+    def wick_ratios(self):
+        """Son mumun (alt, üst) fitil oranları: (Open - Low) / range, (High - Open) / range"""
+        def _build():
+            o, h, l = self.column('Open')[-1], self.column('High')[-1], self.column('Low')[-1]
+            rng = h - l + 1e-8
+            return (o - l) / rng, (h - o) / rng
+        return self.memo('wick_ratios', _build)
+
+    def equal_levels(self, name, n=50, tol=0.001):
+        """Son n mumda bir öncekine %tol yakın seviyeler (eşit dip/tepe adayları)."""
+        def _build():
+            x = self.column(name)[-n:]
+            eq = np.zeros(len(x), dtype=bool)
+            eq[1:] = np.abs(x[1:] - x[:-1]) < x[1:] * tol
+            return x[eq]
+        return self.memo(('equal_levels', name, n, tol), _build)
@@ -0,0 +1,192 @@
+import pandas as pd
+import numpy as np
+
+# Yapılandırılmış FVG dizisi: her satır bir gap (oluştuğu mum indeksine göre sıralı)
+FVG_DTYPE = np.dtype([
+    ('index', '<i8'),       # Gap'in oluştuğu (tamamlandığı) mum indeksi
+    ('top', '<f8'),         # Gap üst sınırı
+    ('bottom', '<f8'),      # Gap alt sınırı
+    ('avg_price', '<f8'),
+    ('filled', '?'),
+    ('mitigated', '?'),
+    ('breaker', 'i1'),      # BREAKER_NONE / BREAKER_BULLISH / BREAKER_BEARISH
+])
+
+BREAKER_NONE = 0
+BREAKER_BULLISH = 1
+BREAKER_BEARISH = -1
+
+_BREAKER_NAMES = {BREAKER_BULLISH: 'bullish', BREAKER_BEARISH: 'bearish'}
+
+
+def _make_fvg_array(index, top, bottom):
+    fvgs = np.zeros(len(index), dtype=FVG_DTYPE)
+    fvgs['index'] = index
+    fvgs['top'] = top
+    fvgs['bottom'] = bottom
+    fvgs['avg_price'] = (top + bottom) / 2
+    return fvgs
+
+
+def find_fvg_arrays(df):
+    """
+    Price Action: Fair Value Gap (FVG) Tespiti (vektörel).
+    Notlar: 3 mumluk formasyon; i-2 (1. mum) ile i (3. mum) kaydırılmış dizilerle karşılaştırılır.
+    Bullish FVG: 1. mumun High'ı < 3. mumun Low'u.
+    Bearish FVG: 1. mumun Low'u > 3. mumun High'ı.
+    Dönüş: (bullish, bearish) FVG_DTYPE yapılandırılmış dizileri.
+    """
+    if len(df) < 3:
+        return np.zeros(0, dtype=FVG_DTYPE), np.zeros(0, dtype=FVG_DTYPE)
+
+    high = df['High'].to_numpy(dtype=np.float64)
+    low = df['Low'].to_numpy(dtype=np.float64)
+
+    first_high, first_low = high[:-2], low[:-2]   # 1. mum (i-2)
+    curr_high, curr_low = high[2:], low[2:]       # 3. mum (i)
+
+    # Katı eşitsizlik gap_size > 0 şartını da kapsar (NaN'lar False döner)
+    bull_idx = np.flatnonzero(first_high < curr_low)
+    bear_idx = np.flatnonzero(first_low > curr_high)
+
+    fvg_bullish = _make_fvg_array(bull_idx + 2, curr_low[bull_idx], first_high[bull_idx])
+    fvg_bearish = _make_fvg_array(bear_idx + 2, first_low[bear_idx], curr_high[bear_idx])
+    return fvg_bullish, fvg_bearish
+
+
+def fvg_at(high, low, i):
+    """
+    Sadece i. mumda tamamlanan formasyon (find_fvg_arrays'in tek mumluk hali; oluşan mum için).
+    Dönüş: (bullish, bearish) 0 veya 1 elemanlı FVG_DTYPE dizileri.
+    """
+    empty = np.zeros(0, dtype=FVG_DTYPE)
+    if i < 2:
+        return empty, empty
+    idx = np.array([i])
+    bull = _make_fvg_array(idx, low[idx], high[idx - 2]) if high[i - 2] < low[i] else empty
+    bear = _make_fvg_array(idx, low[idx - 2], high[idx]) if low[i - 2] > high[i] else empty
+    return bull, bear
+
+
+def fvg_to_dicts(fvgs):
+    """Yapılandırılmış diziyi eski dict listesi formatına çevirir."""
+    out = []
+    for idx, top, bottom, avg, filled, mitigated, breaker in fvgs.tolist():
+        fvg = {'index': idx, 'top': top, 'bottom': bottom, 'avg_price': avg, 'filled': filled}
+        if mitigated:
+            fvg['mitigated'] = True
+        if breaker != BREAKER_NONE:
+            fvg['breaker'] = _BREAKER_NAMES[breaker]
+        out.append(fvg)
+    return out
+
+
+def detect_fvg(df, lookback=3):
+    """
+    Uyumluluk sarmalayıcısı: find_fvg_arrays sonucunu eski dict listeleri olarak döndürür.
+    ({'index', 'top', 'bottom', 'avg_price', 'filled'})
+    """
+    fvg_bullish, fvg_bearish = find_fvg_arrays(df)
+    return fvg_to_dicts(fvg_bullish), fvg_to_dicts(fvg_bearish)
+
+
+def update_fvg_state(df, fvgs):
+    """
+    Son mum itibariyle fill, mitigation ve breaker durumlarını tek seferde günceller
+    (detect_fvg_fill → detect_mitigation → detect_breaker sırasıyla aynı sonuç).
+    """
+    detect_fvg_fill(df, fvgs)
+    detect_mitigation(df, fvgs)
+    detect_breaker(df, fvgs)
+    return fvgs
+
+def check_fvg_signal(df, fvg_bullish, fvg_bearish):
+    """
+    Son mum kapanışı itibariyle FVG durumuna göre sinyal/skor üretir.
+    """
+    if len(df) == 0: return 0
+    
+    current_price = df['Close'].iloc[-1]
+    signal_score = 0
+
+    if isinstance(fvg_bullish, np.ndarray) and isinstance(fvg_bearish, np.ndarray):
+        bull, bear = fvg_bullish[-5:], fvg_bearish[-5:]
+        signal_score += 2 * int(((bull['bottom'] <= current_price) & (current_price <= bull['top'])).sum())
+        signal_score -= 2 * int(((bear['bottom'] <= current_price) & (current_price <= bear['top'])).sum())
+        return signal_score
+    
+    # 1. Bullish FVG Kontrolü (Long Fırsatı)
+    # Fiyat bullish FVG bölgesine geri çekildiyse (retest) ve oradan tepki alıyorsa
+    for fvg in fvg_bullish[-5:]: # Sadece son 5 FVG'ye bakmak yeterli, çok eskiler önemsiz
+        # Fiyat gap'in içine girmiş mi? (Bottom < Price < Top)
+        if fvg['bottom'] <= current_price <= fvg['top']:
+            signal_score += 2 # Destek bölgesinde
+            
+    # 2. Bearish FVG Kontrolü (Short Fırsatı)
+    for fvg in fvg_bearish[-5:]:
+        if fvg['bottom'] <= current_price <= fvg['top']:
+            signal_score -= 2 # Direnç bölgesinde
+
+    return signal_score
+
+# FVG Fill Detection — dict listesi veya FVG_DTYPE dizisi (yerinde güncellenir)
+def detect_fvg_fill(df, fvg_list):
+    price = df['Close'].iloc[-1]
+    if isinstance(fvg_list, np.ndarray):
+        fvg_list['filled'] |= (fvg_list['bottom'] <= price) & (price <= fvg_list['top'])
+        return fvg_list
+    for fvg in fvg_list:
+        if not fvg['filled']:
+            if fvg['bottom'] <= price <= fvg['top']:
+                fvg['filled'] = True
+    return fvg_list
+
+
+# Mitigation Detection (Body ile temizlik) — dict listesi veya FVG_DTYPE dizisi (yerinde güncellenir)
+def detect_mitigation(df, fvg_list):
+    open_ = df['Open'].iloc[-1]
+    close = df['Close'].iloc[-1]
+
+    low_body = min(open_, close)
+    high_body = max(open_, close)
+
+    if isinstance(fvg_list, np.ndarray):
+        hit = ~fvg_list['filled'] & (low_body <= fvg_list['top']) & (high_body >= fvg_list['bottom'])
+        fvg_list['mitigated'] |= hit
+        fvg_list['filled'] |= hit
+        return fvg_list
+
+    for fvg in fvg_list:
+        if fvg.get('filled'):
+            continue
+        if low_body <= fvg['top'] and high_body >= fvg['bottom']:
+            fvg['mitigated'] = True
+            fvg['filled'] = True
+    return fvg_list
+
+
+# Breaker Block Tespiti — dict listesi veya FVG_DTYPE dizisi (yerinde güncellenir)
+def detect_breaker(df, fvg_list):
+    close = df['Close'].iloc[-1]
+    if isinstance(fvg_list, np.ndarray):
+        fvg_list['breaker'][close > fvg_list['top']] = BREAKER_BULLISH
+        fvg_list['breaker'][close < fvg_list['bottom']] = BREAKER_BEARISH
+        return fvg_list
+    for fvg in fvg_list:
+        if close > fvg['top']:
+            fvg['breaker'] = 'bullish'
+        elif close < fvg['bottom']:
+            fvg['breaker'] = 'bearish'
+    return fvg_list
+
+
+# # BOS (Break of Structure)  başka dosyaya taşıdık sonra silinecek
+# def bos_filter(df, lookback=10):
+#     highs = df['High'].tail(lookback)
+#     lows = df['Low'].tail(lookback)
+
+#     if highs.iloc[-1] >= highs.max():
+#         return "bullish"
+#     if lows.iloc[-1] <= lows.min():
+#         return "bearish"
+#     return "neutral"
@@ -0,0 +1,205 @@
+"""
+Döngü ağırlıklı dedektörler için çekirdekler (backtest: yıllarca 1m veri).
+
+Her çekirdeğin iki hali var:
+  - döngü hali: düz Python döngüsü; numba kuruluysa njit ile derlenir ('numba' backend)
+  - NumPy hali: vektörel/parçalı karşılığı ('numpy' backend)
+
+Çekirdekler ve kullanıldıkları yerler:
+  - swing_flags   : detect_structure, backtest.structure_series
+  - first_overlap : backtest.simulate_trades (sabit stop'un ilk tetiklendiği mum)
+  - latest_block  : backtest.order_block_series
+
+Backend seçimi: set_backend('auto' | 'numba' | 'numpy') veya ALLYGATOR_KERNELS ortam değişkeni.
+'auto' numba varsa onu, yoksa NumPy'ı kullanır. İki backend'in eşdeğerliği
+tests/test_kernels.py'de döngü hallerine karşı test edilir.
+"""
+import os
+
+import numpy as np
+
+from strategies.structure import swing_masks
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+BACKENDS = ('auto', 'numba', 'numpy')
+_backend = 'auto'
+_jit_cache = {}
+
+
+def numba_available():
+    return numba is not None
+
+
+def set_backend(name):
+    """'auto', 'numba' veya 'numpy'. numba zorlanırsa ve kurulu değilse ImportError."""
+    global _backend
+    if name not in BACKENDS:
+        raise ValueError(f"Bilinmeyen kernel backend: {name} (seçenekler: {', '.join(BACKENDS)})")
+    if name == 'numba' and numba is None:
+        raise ImportError("numba kurulu değil; 'numpy' veya 'auto' kullanın")
+    _backend = name
+
+
+if os.environ.get('ALLYGATOR_KERNELS'):
+    set_backend(os.environ['ALLYGATOR_KERNELS'])
+
+
+def get_backend():
+    """Etkin backend adı ('numba' veya 'numpy')."""
+    if _backend == 'auto':
+        return 'numba' if numba is not None else 'numpy'
+    return _backend
+
+
+def _jit(func):
+    """Döngü halinin derlenmiş sürümü (ilk çağrıda derlenir, süreç boyunca saklanır)."""
+    compiled = _jit_cache.get(func.__name__)
+    if compiled is None:
+        compiled = _jit_cache[func.__name__] = numba.njit(cache=True)(func)
+    return compiled
+
+
+def _f64(x):
+    return np.ascontiguousarray(x, dtype=np.float64)
+
+
+# --- 1) Swing onayı (detect_structure) ---
+
+def _swing_flags_loop(high, low, lookback):
+    n = high.shape[0]
+    swing_high = np.zeros(n, dtype=np.bool_)
+    swing_low = np.zeros(n, dtype=np.bool_)
+    if lookback < 1:
+        return swing_high, swing_low
+    for i in range(lookback, n - lookback):
+        # NaN'lar atlanır (pandas .max()/.min() gibi); sol veya sağ pencerede geçerli değer yoksa bayrak False
+        h, l = high[i], low[i]
+        is_high = h == h
+        is_low = l == l
+        for side in range(2):
+            first = i - lookback if side == 0 else i + 1
+            seen_h = False
+            seen_l = False
+            for j in range(first, first + lookback):
+                if high[j] == high[j]:
+                    seen_h = True
+                    if not h > high[j]:
+                        is_high = False
+                if low[j] == low[j]:
+                    seen_l = True
+                    if not l < low[j]:
+                        is_low = False
+            is_high = is_high and seen_h
+            is_low = is_low and seen_l
+        swing_high[i] = is_high
+        swing_low[i] = is_low
+    return swing_high, swing_low
+
+
+def _swing_flags_numpy(high, low, lookback):
+    return swing_masks(high, low, lookback)
+
+
+def swing_flags(high, low, lookback=5):
+    """detect_structure bayrakları: (swing_high, swing_low) bool dizileri."""
+    high, low = _f64(high), _f64(low)
+    if get_backend() == 'numba':
+        return _jit(_swing_flags_loop)(high, low, int(lookback))
+    return _swing_flags_numpy(high, low, int(lookback))
+
+
+# --- 2) İlk kesişim taraması (stop seviyeleri) ---
+
+def _first_overlap_loop(start, level_lo, level_hi, series_lo, series_hi):
+    n = series_lo.shape[0]
+    out = np.full(start.shape[0], -1, dtype=np.int64)
+    for k in range(start.shape[0]):
+        lo, hi = level_lo[k], level_hi[k]
+        for j in range(max(start[k], 0), n):
+            if series_lo[j] <= hi and series_hi[j] >= lo:
+                out[k] = j
+                break
+    return out
+
+
+def _first_overlap_numpy(start, level_lo, level_hi, series_lo, series_hi, first_window=64):
+    n = series_lo.shape[0]
+    out = np.full(start.shape[0], -1, dtype=np.int64)
+    for k in range(start.shape[0]):
+        # Büyüyen pencereler: erken kesişimde kısa dilim, geç kesişimde O(n) toplam iş
+        s, width = max(int(start[k]), 0), first_window
+        lo, hi = level_lo[k], level_hi[k]
+        while s < n:
+            e = min(n, s + width)
+            hit = (series_lo[s:e] <= hi) & (series_hi[s:e] >= lo)
+            j = int(hit.argmax())
+            if hit[j]:
+                out[k] = s + j
+                break
+            s, width = e, width * 2
+    return out
+
+
+def first_overlap(start, level_lo, level_hi, series_lo, series_hi):
+    """
+    Her sorgu k için start[k]'dan itibaren [series_lo[j], series_hi[j]] aralığının
+    [level_lo[k], level_hi[k]] ile kesiştiği ilk j (yoksa -1).
+    Örnekler:
+      - FVG fill: seri = Close (lo = hi = Close), seviye = [bottom, top]
+      - Mitigation: seri = gövde [min(O, C), max(O, C)]
+      - LONG stop: seri = Low (lo = hi = Low), seviye = [-inf, stop]; LONG TP: seri = High, [tp, +inf]
+    """
+    start = np.ascontiguousarray(start, dtype=np.int64)
+    args = (start, _f64(level_lo), _f64(level_hi), _f64(series_lo), _f64(series_hi))
+    if get_backend() == 'numba':
+        return _jit(_first_overlap_loop)(*args)
+    return _first_overlap_numpy(*args)
+
+
+# --- 3) Order block araması (latest_order_blocks'un her mum için hali) ---
+
+def _latest_block_loop(mask, block_low, block_high, close, lookback, min_age, lo_mult, hi_mult):
+    n = close.shape[0]
+    out = np.full(n, -1, dtype=np.int64)
+    for i in range(n):
+        price = close[i]
+        for j in range(i - min_age, max(0, i - lookback) - 1, -1):
+            if mask[j] and block_low[j] * lo_mult <= price and price <= block_high[j] * hi_mult:
+                out[i] = j
+                break
+    return out
+
+
+def _latest_block_numpy(mask, block_low, block_high, close, lookback, min_age, lo_mult, hi_mult):
+    n = close.shape[0]
+    out = np.full(n, -1, dtype=np.int64)
+    pending = np.ones(n, dtype=bool)
+    # Yaştan yaşa (en yeni bloktan eskiye) tek geçiş; ilk eşleşen blok kazanır
+    for age in range(min_age, lookback + 1):
+        if age >= n:
+            break
+        j = np.arange(n - age)
+        i = j + age
+        price = close[i]
+        hit = pending[i] & mask[j] & (block_low[j] * lo_mult <= price) & (price <= block_high[j] * hi_mult)
+        out[i[hit]] = j[hit]
+        pending[i[hit]] = False
+    return out
+
+
+def latest_block(mask, block_low, block_high, close, lookback=50, min_age=3, lo_mult=1.0, hi_mult=1.0):
+    """
+    Her mum i için [i - lookback, i - min_age] aralığında, bölgesi
+    (block_low * lo_mult <= Close[i] <= block_high * hi_mult) fiyatı içeren en yeni blok mumu (yoksa -1).
+    Bullish OB: lo_mult=1.0, hi_mult=1.01; Bearish OB: lo_mult=0.99, hi_mult=1.0.
+    """
+    args = (np.ascontiguousarray(mask, dtype=np.bool_), _f64(block_low), _f64(block_high), _f64(close),
+            int(lookback), int(min_age), float(lo_mult), float(hi_mult))
+    if get_backend() == 'numba':
+        return _jit(_latest_block_loop)(*args)
+    return _latest_block_numpy(*args)
+
@@ -0,0 +1,204 @@
+"""
+Sayfalı, kaldığı yerden devam eden geçmiş mum indirici (backtest verisi).
+
+client.klines çağrı başına en fazla 1500 mum döndürür. KlineDownloader her sembol için
+[start, end) aralığını 1500'lük sayfalarla gezer ve mumları doğrudan CandleArchive'a yazar:
+  - İstekler RequestScheduler üzerinden (dakikalık ağırlık bütçesi, 429/5xx geri çekilme)
+  - Semboller thread havuzunda eşzamanlı
+  - Her sayfadan sonra checkpoint (JSON, atomik yazım); kesintide aynı komut kaldığı yerden sürer
+  - Çakışan sayfalar tekilleştirilir (sayfa içi tekrarlar + arşivdeki son mumdan eskiler atılır)
+  - Mevcut arşiv her zaman son mumundan devam ettirilir; sadece borsada olmayan aralıklar
+    (bakım, delist/relist) boşluk olarak yazılır ve arşivin gap index'ine kaydedilir
+  - Sadece kapanmış mumlar yazılır (sunucu saatine göre)
+
+    python kline_downloader.py --symbols BTCUSDT ETHUSDT --interval 15m --start 2024-01-01
+"""
+import argparse
+import datetime
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import numpy as np
+
+from candle_archive import CandleArchive, interval_to_ms
+from ohlcv_store import FIELDS, OHLCVStore
+
+PAGE_LIMIT = 1500   # /fapi/v1/klines üst sınırı (ağırlık 10)
+
+
+class KlineDownloader:
+    def __init__(self, client, archive, interval='15m', page_limit=PAGE_LIMIT, workers=4,
+                 checkpoint_path=None, log_func=None):
+        self.client = client
+        self.archive = archive
+        self.interval = interval
+        self.interval_ms = interval_to_ms(interval)
+        self.page_limit = page_limit
+        self.workers = workers
+        self.checkpoint_path = checkpoint_path or os.path.join(archive.root, f"download_{interval}.json")
+        self.log = log_func if log_func else print
+
+        self._lock = threading.Lock()
+        self._checkpoint = self._load_checkpoint()
+        self.pages = 0
+        self.written = 0
+
+    # --- Checkpoint ---
+
+    def _load_checkpoint(self):
+        try:
+            with open(self.checkpoint_path) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            self.log(f"⚠️ Checkpoint okunamadı, baştan başlanıyor: {e}")
+            return {}
+
+    def _save_checkpoint(self, symbol, cursor, end_time, done):
+        """Sembolün bir sonraki istek zamanı (cursor) — geçici dosyaya yazılıp yerine taşınır."""
+        with self._lock:
+            self._checkpoint[symbol] = {'cursor': int(cursor), 'end': int(end_time), 'done': bool(done)}
+            os.makedirs(os.path.dirname(os.path.abspath(self.checkpoint_path)), exist_ok=True)
+            tmp = self.checkpoint_path + ".tmp"
+            with open(tmp, 'w') as f:
+                json.dump(self._checkpoint, f)
+            os.replace(tmp, self.checkpoint_path)
+
+    def _resume_cursor(self, symbol, start_time):
+        """
+        Arşiv doluysa her zaman son mumdan bir interval sonrası (arşiv boşluksuz kalır);
+        boşsa istenen başlangıç ile checkpoint'ten ileri olanı.
+        """
+        last = self.archive.last_open_time(symbol, self.interval)
+        if last is not None:
+            cursor = last + self.interval_ms
+            if start_time > cursor:
+                self.log(f"ℹ️ {symbol}: arşiv {_fmt_ms(last)} tarihinde bitiyor, boşluk kalmasın diye "
+                         f"{_fmt_ms(start_time)} yerine oradan devam ediliyor")
+            return cursor
+        cursor = start_time
+        saved = self._checkpoint.get(symbol)
+        if saved is not None:
+            cursor = max(cursor, saved['cursor'])
+        return cursor
+
+    # --- İndirme ---
+
+    def _server_now(self):
+        try:
+            return int(self.client.time()['serverTime'])
+        except Exception:
+            return int(time.time() * 1000)
+
+    def _download_symbol(self, symbol, start_time, end_time, now_ms):
+        """Tek sembolün sayfaları. Dönüş: yazılan mum sayısı."""
+        cursor = self._resume_cursor(symbol, start_time)
+        end_time = min(end_time, now_ms)
+        written = 0
+        while cursor < end_time:
+            page = self.client.klines(symbol=symbol, interval=self.interval, startTime=int(cursor),
+                                      endTime=int(end_time) - 1, limit=self.page_limit)
+            with self._lock:
+                self.pages += 1
+            if not page:
+                self._save_checkpoint(symbol, cursor, end_time, True)
+                break
+
+            arrs = OHLCVStore.from_klines(page).arrays()
+            open_time = arrs['open_time']
+            # Sayfa içi tekrar/sıra bozukluğu: open time'a göre tekil ve sıralı
+            open_time, first = np.unique(open_time, return_index=True)
+            values = [arrs[name][first] for name in FIELDS]
+            keep = (open_time >= cursor) & (open_time < end_time) & (open_time + self.interval_ms <= now_ms)
+            if keep.any():
+                # Cursor arşivin son mumunun hemen sonrası: sayfadaki eksikler borsada yok (bakım, delist) → gap index
+                written += self.archive.append(symbol, self.interval, open_time[keep], [v[keep] for v in values],
+                                               allow_gap=True)
+
+            next_cursor = int(open_time[-1]) + self.interval_ms
+            if next_cursor <= cursor:
+                break   # İlerleme yok (bozuk sayfa), sonsuz döngüye girme
+            cursor = next_cursor
+            done = len(page) < self.page_limit or cursor >= end_time
+            self._save_checkpoint(symbol, cursor, end_time, done)
+            if done:
+                break
+        else:
+            self._save_checkpoint(symbol, cursor, end_time, True)
+
+        with self._lock:
+            self.written += written
+        return written
+
+    def download(self, symbols, start_time, end_time=None):
+        """
+        symbols için [start_time, end_time) aralığını (ms, open time) arşive indirir.
+        end_time None → sunucu saati. Dönüş: {sembol: yazılan mum sayısı} (hatalı semboller hariç)
+        """
+        now_ms = self._server_now()
+        end_time = now_ms if end_time is None else int(end_time)
+        start_time = int(start_time)
+        results = {}
+        t0 = time.time()
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            futures = {
+                executor.submit(self._download_symbol, symbol, start_time, end_time, now_ms): symbol
+                for symbol in symbols
+            }
+            for future in as_completed(futures):
+                symbol = futures[future]
+                try:
+                    results[symbol] = future.result()
+                except Exception as e:
+                    self.log(f"❌ {symbol} indirilemedi: {e}")
+                    continue
+                first = self.archive.read(symbol, self.interval, limit=None)['open_time'][:1]
+                if len(first) and first[0] > start_time + self.interval_ms:
+                    # Arşiv sadece sona ekler: mevcut arşivin öncesi (veya liste tarihinden öncesi) doldurulmaz
+                    self.log(f"ℹ️ {symbol}: arşiv {_fmt_ms(int(first[0]))} tarihinden başlıyor")
+                self.log(f"📥 {symbol}: {results[symbol]} mum ({len(results)}/{len(futures)})")
+
+        self.log(f"✅ İndirme bitti: {self.written} mum, {self.pages} sayfa, {time.time() - t0:.1f} sn")
+        return results
+
+
+def _fmt_ms(ms):
+    return datetime.datetime.fromtimestamp(ms / 1000, tz=datetime.timezone.utc).strftime('%Y-%m-%d %H:%M')
+
+
+def _parse_time(value):
+    """'2024-01-01', '2024-01-01T12:00' (UTC) veya ms."""
+    if value is None:
+        return None
+    if value.isdigit():
+        return int(value)
+    dt = datetime.datetime.fromisoformat(value)
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=datetime.timezone.utc)
+    return int(dt.timestamp() * 1000)
+
+
+if __name__ == "__main__":
+    from binance.um_futures import UMFutures
+    from request_scheduler import RequestScheduler
+
+    parser = argparse.ArgumentParser(description="Sayfalı geçmiş mum indirici (CandleArchive'a yazar)")
+    parser.add_argument('--symbols', nargs='+', required=True)
+    parser.add_argument('--interval', default='15m')
+    parser.add_argument('--start', required=True, help="UTC tarih (2024-01-01) veya ms")
+    parser.add_argument('--end', help="UTC tarih veya ms (varsayılan: şimdi)")
+    parser.add_argument('--archive', default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "candles"))
+    parser.add_argument('--base-url', default="https://fapi.binance.com")
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--checkpoint', help="Varsayılan: <archive>/download_<interval>.json")
+    args = parser.parse_args()
+
+    client = RequestScheduler(UMFutures(base_url=args.base_url))
+    downloader = KlineDownloader(client, CandleArchive(args.archive), interval=args.interval,
+                                 workers=args.workers, checkpoint_path=args.checkpoint)
+    downloader.download(args.symbols, _parse_time(args.start), _parse_time(args.end))
@@ -0,0 +1,283 @@
+import json
+import threading
+import time
+
+import websocket
+
+from candle_cache import CandleCache
+
+MAINNET_STREAM_URL = "wss://fstream.binance.com"
+TESTNET_STREAM_URL = "wss://stream.binancefuture.com"
+
+MAX_STREAMS_PER_CONNECTION = 200   # Binance combined stream limiti
+
+
+class _Connection:
+    """Tek bir combined stream bağlantısı (en fazla MAX_STREAMS_PER_CONNECTION sembol)."""
+
+    def __init__(self, symbols):
+        self.symbols = set(symbols)
+        self.stop_event = threading.Event()
+        self.app = None
+        self.generation = 0   # Bu bağlantının şu anki soketinin nesli (her yeniden bağlanmada yenilenir)
+
+
+class KlineStream:
+    """
+    Combined `<symbol>@kline_<interval>` akışına abone olur ve gelen mumları
+    CandleCache ring buffer'larına yazar.
+
+    - Her bağlantı (yeniden bağlanma dahil) açıldığında semboller REST ile backfill edilir.
+    - Sembol listesi değişince sadece eklenen/çıkan semboller SUBSCRIBE/UNSUBSCRIBE edilir;
+      sadece yeni semboller backfill edilir.
+    - Her soket bir nesil numarası alır; eski nesilden (kapanmış/yerini yenisine bırakmış soket)
+      gelen set_live çağrıları yok sayılır.
+    - Bir mum kapandığında `wait_for_close` bekleyenleri uyandırılır, böylece
+      tarama bir sonraki sabit aralığı beklemeden başlar.
+    """
+
+    def __init__(self, cache: CandleCache, interval='15m', stream_url=MAINNET_STREAM_URL,
+                 backfill_limit=100, reconnect_delay=2.0, log_func=None):
+        self.cache = cache
+        self.interval = interval
+        self.stream_url = stream_url.rstrip('/')
+        self.backfill_limit = backfill_limit
+        self.reconnect_delay = reconnect_delay
+        self.log = log_func if log_func else print
+
+        self.symbols = []
+        self._running = False
+        self._connections = []
+
+        # Sembol → akışı besleyen soketin nesli. set_live sadece sahibi olan nesilden kabul edilir.
+        self._lock = threading.Lock()
+        self._owner = {}
+        self._generation = 0
+        self._request_id = 0
+
+        # Mum kapanış bildirimi
+        self._close_cond = threading.Condition()
+        self._close_generation = 0
+        self._closed_symbols = set()
+        self.last_close_time = None   # Son kapanan mumun kapanış zamanı (k['T'] + 1, sunucu ms)
+
+    # --- Yaşam döngüsü ---
+
+    def start(self, symbols):
+        self.symbols = sorted(set(symbols))
+        self._running = True
+        for i in range(0, len(self.symbols), MAX_STREAMS_PER_CONNECTION):
+            self._start_connection(self.symbols[i:i + MAX_STREAMS_PER_CONNECTION])
+        self.log(f"📡 Kline akışı başlatıldı: {len(self.symbols)} sembol ({self.interval})")
+
+    def _start_connection(self, symbols):
+        conn = _Connection(symbols)
+        self._connections.append(conn)
+        threading.Thread(target=self._run_connection, args=(conn,), daemon=True).start()
+        return conn
+
+    def stop(self):
+        self._running = False
+        with self._lock:
+            self._owner.clear()   # Kapanan soketlerin geç gelen set_live çağrıları artık etkisiz
+        for conn in self._connections:
+            self._stop_connection(conn)
+        for symbol in self.symbols:
+            self.cache.set_live(symbol, self.interval, False)
+        with self._close_cond:
+            self._close_cond.notify_all()
+        self._connections = []
+
+    def _stop_connection(self, conn):
+        conn.stop_event.set()
+        if conn.app is not None:
+            try:
+                conn.app.close()
+            except Exception:
+                pass
+
+    def update_symbols(self, symbols):
+        """
+        Tarama evreni değiştiyse sadece farkı günceller: çıkan semboller UNSUBSCRIBE edilir,
+        eklenenler boş yeri olan bağlantılara SUBSCRIBE edilip backfill edilir (diğerleri dokunulmaz).
+        """
+        wanted = set(symbols)
+        if not self._running:
+            self.start(wanted)
+            return
+        current = set(self.symbols)
+        added, removed = wanted - current, current - wanted
+        if not added and not removed:
+            return
+
+        for conn in list(self._connections):
+            gone = conn.symbols & removed
+            if not gone:
+                continue
+            with self._lock:
+                conn.symbols -= gone
+                for symbol in gone:
+                    self._owner.pop(symbol, None)
+            for symbol in gone:
+                self.cache.set_live(symbol, self.interval, False)
+            if conn.symbols:
+                self._send_method(conn, "UNSUBSCRIBE", gone)
+            else:
+                self._stop_connection(conn)
+                self._connections.remove(conn)
+
+        pending = sorted(added)
+        for conn in self._connections:
+            room = MAX_STREAMS_PER_CONNECTION - len(conn.symbols)
+            if room <= 0 or not pending:
+                continue
+            chunk, pending = pending[:room], pending[room:]
+            with self._lock:
+                conn.symbols.update(chunk)
+                generation = conn.generation
+                for symbol in chunk:
+                    self._owner[symbol] = generation
+            # Soket o an kopuksa gönderim başarısız olur; yeniden bağlanınca URL ve backfill yeni sembolleri içerir
+            if self._send_method(conn, "SUBSCRIBE", chunk):
+                threading.Thread(target=self._backfill, args=(conn, generation, chunk), daemon=True).start()
+        for i in range(0, len(pending), MAX_STREAMS_PER_CONNECTION):
+            self._start_connection(pending[i:i + MAX_STREAMS_PER_CONNECTION])
+
+        self.symbols = sorted(wanted)
+        self.log(f"📡 Kline akışı güncellendi: +{len(added)} / -{len(removed)} sembol ({len(self.symbols)} toplam)")
+
+    def is_running(self):
+        return self._running
+
+    # --- Bağlantı ---
+
+    def _stream_name(self, symbol):
+        return f"{symbol.lower()}@kline_{self.interval}"
+
+    def _build_url(self, symbols):
+        streams = "/".join(self._stream_name(s) for s in symbols)
+        return f"{self.stream_url}/stream?streams={streams}"
+
+    def _send_method(self, conn, method, symbols):
+        """Açık sokete SUBSCRIBE/UNSUBSCRIBE mesajı. Gönderilemediyse False."""
+        app = conn.app
+        if app is None or app.sock is None or not app.sock.connected:
+            return False
+        with self._lock:
+            self._request_id += 1
+            request_id = self._request_id
+        try:
+            app.send(json.dumps({
+                "method": method,
+                "params": [self._stream_name(s) for s in sorted(symbols)],
+                "id": request_id,
+            }))
+            return True
+        except Exception as e:
+            self.log(f"⚠️ Kline akışı {method} gönderilemedi: {e}")
+            return False
+
+    def _set_live(self, symbol, generation, live):
+        """Sadece sembolün sahibi olan nesil canlı bayrağını değiştirebilir."""
+        with self._lock:
+            if self._owner.get(symbol) != generation:
+                return False
+            self.cache.set_live(symbol, self.interval, live)
+            return True
+
+    def _run_connection(self, conn):
+        stop_event = conn.stop_event
+        while not stop_event.is_set():
+            with self._lock:
+                self._generation += 1
+                generation = conn.generation = self._generation
+                symbols = sorted(conn.symbols)
+            if not symbols:
+                return
+            app = websocket.WebSocketApp(
+                self._build_url(symbols),
+                on_open=lambda ws, gen=generation: self._on_open(conn, gen),
+                on_message=lambda ws, msg: self._on_message(msg),
+                on_error=lambda ws, err: self.log(f"⚠️ Kline akışı hatası: {err}"),
+            )
+            conn.app = app
+            try:
+                app.run_forever(ping_interval=180, ping_timeout=10)
+            except Exception as e:
+                self.log(f"⚠️ Kline akışı koptu: {e}")
+
+            # Bağlantı koptu → bu semboller tekrar REST'e düşer (yerlerini başka nesil aldıysa dokunma)
+            for symbol in symbols:
+                self._set_live(symbol, generation, False)
+
+            if not stop_event.is_set():
+                self.log(f"🔄 Kline akışı yeniden bağlanıyor ({len(symbols)} sembol)...")
+                stop_event.wait(self.reconnect_delay)
+
+    def _on_open(self, conn, generation):
+        with self._lock:
+            if conn.generation != generation or conn.stop_event.is_set():
+                return
+            symbols = sorted(conn.symbols)
+            for symbol in symbols:
+                self._owner[symbol] = generation
+        self._backfill(conn, generation, symbols)
+
+    def _backfill(self, conn, generation, symbols):
+        # Kopukluk süresince (veya abonelikten önce) kaçan mumları REST ile tamamla, sonra akışa geç
+        for symbol in symbols:
+            if conn.stop_event.is_set() or conn.generation != generation:
+                return
+            try:
+                if not self._set_live(symbol, generation, False):
+                    continue   # Sembol çıkarıldı veya yeni bir soket devraldı
+                self.cache.refresh(symbol, self.interval, limit=self.backfill_limit)
+                self._set_live(symbol, generation, True)
+            except Exception as e:
+                self.log(f"⚠️ {symbol} backfill hatası: {e}")
+
+    def _on_message(self, message):
+        try:
+            payload = json.loads(message)
+            data = payload.get('data', payload)
+            if data.get('e') != 'kline':
+                return
+            k = data['k']
+            symbol = data['s']
+            row = [k['t'], k['o'], k['h'], k['l'], k['c'], k['v'],
+                   k['T'], k['q'], k['n'], k['V'], k['Q'], k.get('B', '0')]
+            self.cache.apply_kline(symbol, self.interval, row, closed=bool(k['x']))
+
+            if k['x']:
+                with self._close_cond:
+                    self.last_close_time = int(k['T']) + 1
+                    self._closed_symbols.add(symbol)
+                    self._close_generation += 1
+                    self._close_cond.notify_all()
+        except Exception as e:
+            self.log(f"⚠️ Kline mesajı işlenemedi: {e}")
+
+    # --- Mum kapanışı bekleme ---
+
+    def wait_for_close(self, timeout, settle=0.5):
+        """
+        Bir sonraki mum kapanışına kadar (en fazla `timeout` sn) bekler.
+        Aynı anda kapanan diğer sembollerin mesajları için `settle` sn daha toplar.
+        Kapanan sembolleri döndürür (zaman aşımında boş set); kapanış zamanı last_close_time'da.
+        """
+        deadline = time.time() + timeout
+        with self._close_cond:
+            start_gen = self._close_generation
+            while self._running and self._close_generation == start_gen:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    return set()
+                self._close_cond.wait(remaining)
+
+        if settle > 0:
+            time.sleep(settle)
+
+        with self._close_cond:
+            closed = self._closed_symbols
+            self._closed_symbols = set()
+        return closed
@@ -0,0 +1,395 @@
+"""
+Geliştirme/deneme için yerel sahte sunucular (gerçek borsaya bağlanmadan).
+
+FakeKlineWebsocketServer: KlineStream'i yerelde denemek için minimal WebSocket sunucusu.
+    server = FakeKlineWebsocketServer(); server.start()
+    stream = KlineStream(cache, stream_url=server.url)
+    server.push_kline('BTCUSDT', open_time, 100, 101, 99, 100.5, 12, closed=True)
+    server.drop_clients()   # kopma → yeniden bağlanma + REST backfill denemesi
+    server.requests         # istemcinin SUBSCRIBE/UNSUBSCRIBE mesajları
+
+RecordedHTTPServer: Kaydedilmiş REST yanıtlarını sunan sahte Futures REST sunucusu.
+    Dizin yapısı: <dir>/ticker_24hr.json, <dir>/klines/<SYMBOL>.json
+    server = RecordedHTTPServer("recorded/").start()
+    AsyncScanner(base_url=server.url, ...)
+
+SyntheticKlineHTTPServer: /fapi/v1/klines sayfalarını deterministik sentetik mumlarla sunar
+(startTime/endTime/limit ≤ 1500, /fapi/v1/time). KlineDownloader'ı gerçek borsa olmadan denemek için.
+    server = SyntheticKlineHTTPServer(listings={'NEWUSDT': t0}, fail_every=7).start()
+    KlineDownloader(RequestScheduler(UMFutures(base_url=server.url)), archive).download(...)
+"""
+import base64
+import hashlib
+import json
+import os
+import socket
+import struct
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+
+_WS_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+
+class FakeKlineWebsocketServer:
+    def __init__(self, host="127.0.0.1", port=0):
+        self._sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._sock.bind((host, port))
+        self.host, self.port = self._sock.getsockname()
+        self.url = f"ws://{self.host}:{self.port}"
+
+        self._clients = []
+        self._lock = threading.Lock()
+        self._running = False
+        self.paths = []   # İstemcilerin bağlandığı yollar (abonelik kontrolü için)
+        self.requests = []   # İstemcilerden gelen JSON mesajlar (SUBSCRIBE/UNSUBSCRIBE)
+
+    def start(self):
+        self._running = True
+        self._sock.listen(8)
+        threading.Thread(target=self._accept_loop, daemon=True).start()
+        return self
+
+    def stop(self):
+        self._running = False
+        self.drop_clients()
+        try:
+            self._sock.close()
+        except Exception:
+            pass
+
+    def _accept_loop(self):
+        while self._running:
+            try:
+                conn, _ = self._sock.accept()
+            except OSError:
+                return
+            threading.Thread(target=self._handshake, args=(conn,), daemon=True).start()
+
+    def _handshake(self, conn):
+        try:
+            request = b""
+            while b"\r\n\r\n" not in request:
+                chunk = conn.recv(4096)
+                if not chunk:
+                    conn.close()
+                    return
+                request += chunk
+
+            lines = request.decode("latin-1").split("\r\n")
+            path = lines[0].split(" ")[1]
+            headers = {}
+            for line in lines[1:]:
+                if ":" in line:
+                    k, v = line.split(":", 1)
+                    headers[k.strip().lower()] = v.strip()
+
+            accept = base64.b64encode(
+                hashlib.sha1((headers["sec-websocket-key"] + _WS_GUID).encode()).digest()
+            ).decode()
+            conn.sendall((
+                "HTTP/1.1 101 Switching Protocols\r\n"
+                "Upgrade: websocket\r\n"
+                "Connection: Upgrade\r\n"
+                f"Sec-WebSocket-Accept: {accept}\r\n\r\n"
+            ).encode())
+
+            with self._lock:
+                self.paths.append(path)
+                self._clients.append(conn)
+        except Exception:
+            conn.close()
+            return
+        self._read_loop(conn)
+
+    def _read_loop(self, conn):
+        """İstemci frame'lerini okur (maskeli); metin mesajları requests'e eklenir, yanıt {"result": null}."""
+        def recv_exact(n):
+            data = b""
+            while len(data) < n:
+                chunk = conn.recv(n - len(data))
+                if not chunk:
+                    raise ConnectionError("kapandı")
+                data += chunk
+            return data
+
+        try:
+            while self._running:
+                b0, b1 = recv_exact(2)
+                opcode, length = b0 & 0x0F, b1 & 0x7F
+                if length == 126:
+                    length = struct.unpack("!H", recv_exact(2))[0]
+                elif length == 127:
+                    length = struct.unpack("!Q", recv_exact(8))[0]
+                mask = recv_exact(4) if b1 & 0x80 else b"\0\0\0\0"
+                payload = bytes(b ^ mask[i % 4] for i, b in enumerate(recv_exact(length)))
+                if opcode == 0x8:
+                    # Kapanış el sıkışması: close frame'i geri yolla ve bağlantıyı bırak
+                    with self._lock:
+                        if conn in self._clients:
+                            self._clients.remove(conn)
+                    conn.sendall(struct.pack("!BB", 0x88, 0))
+                    conn.close()
+                    return
+                if opcode == 0x1:
+                    message = json.loads(payload)
+                    with self._lock:
+                        self.requests.append(message)
+                    self.send({"result": None, "id": message.get("id")})
+        except (OSError, ConnectionError, ValueError):
+            return
+
+    def client_count(self):
+        with self._lock:
+            return len(self._clients)
+
+    def send(self, payload):
+        """Bağlı tüm istemcilere JSON metin frame'i gönderir."""
+        data = json.dumps(payload).encode()
+        if len(data) < 126:
+            header = struct.pack("!BB", 0x81, len(data))
+        elif len(data) < 65536:
+            header = struct.pack("!BBH", 0x81, 126, len(data))
+        else:
+            header = struct.pack("!BBQ", 0x81, 127, len(data))
+
+        with self._lock:
+            for conn in list(self._clients):
+                try:
+                    conn.sendall(header + data)
+                except OSError:
+                    self._clients.remove(conn)
+
+    def push_kline(self, symbol, open_time, o, h, l, c, v, closed=False, interval="15m",
+                   interval_ms=900_000, taker_buy_volume=0.0):
+        """Binance combined stream formatında tek bir kline mesajı yollar."""
+        self.send({
+            "stream": f"{symbol.lower()}@kline_{interval}",
+            "data": {
+                "e": "kline", "E": open_time + interval_ms, "s": symbol,
+                "k": {
+                    "t": open_time, "T": open_time + interval_ms - 1, "s": symbol, "i": interval,
+                    "o": str(o), "h": str(h), "l": str(l), "c": str(c), "v": str(v),
+                    "n": 1, "x": closed, "q": str(v * c),
+                    "V": str(taker_buy_volume), "Q": str(taker_buy_volume * c), "B": "0",
+                },
+            },
+        })
+
+    def drop_clients(self):
+        """Tüm bağlantıları keser (kopma senaryosu)."""
+        with self._lock:
+            for conn in self._clients:
+                try:
+                    conn.shutdown(socket.SHUT_RDWR)
+                    conn.close()
+                except OSError:
+                    pass
+            self._clients = []
+
+
+class _QueuedHTTPServer(ThreadingHTTPServer):
+    request_queue_size = 256   # Yüksek eşzamanlı bağlantı (varsayılan 5 → bağlantı düşer)
+    daemon_threads = True
+
+
+class RecordedHTTPServer:
+    def __init__(self, directory, host="127.0.0.1", port=0):
+        self.directory = directory
+        self._cache = {}   # Dosyalar bir kez okunur (disk I/O ölçüme girmesin)
+        handler = self._make_handler()
+        self._httpd = _QueuedHTTPServer((host, port), handler)
+        self.host, self.port = self._httpd.server_address[:2]
+        self.url = f"http://{self.host}:{self.port}"
+        self.request_count = 0
+
+    def _load(self, relpath):
+        body = self._cache.get(relpath)
+        if body is None:
+            path = os.path.join(self.directory, relpath)
+            if not os.path.exists(path):
+                return None
+            with open(path, "rb") as f:
+                body = self._cache[relpath] = f.read()
+        return body
+
+    def _route(self, path, query):
+        if path == "/fapi/v1/ticker/24hr":
+            return self._load("ticker_24hr.json")
+        if path == "/fapi/v1/klines":
+            symbol = query.get("symbol", [""])[0].upper()
+            return self._load(os.path.join("klines", f"{symbol}.json"))
+        return None
+
+    def _make_handler(self):
+        server = self
+
+        class _Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"   # keep-alive (havuzlu oturum ölçümü için)
+
+            def do_GET(self):
+                server.request_count += 1
+                url = urlparse(self.path)
+                body = server._route(url.path, parse_qs(url.query))
+                if body is None:
+                    body = b'{"code": -1121, "msg": "Invalid symbol."}'
+                    self.send_response(400)
+                else:
+                    self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.send_header("X-MBX-USED-WEIGHT-1M", "1")
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        return _Handler
+
+    def start(self):
+        threading.Thread(target=self._httpd.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+
+class SyntheticKlineHTTPServer:
+    """
+    Sembol başına deterministik fiyat eğrisi; aynı (sembol, open time) her istekte aynı mumu verir.
+    - listings: {sembol: ilk open time (ms)} → öncesi için boş/kısmi sayfa (liste tarihi)
+    - now_ms: sunucu saati (varsayılan gerçek saat); oluşan mum da döner (kapanmamış)
+    - fail_every: her N. klines isteğine 503 (geri çekilme/yeniden deneme denemesi)
+    - gaps: {sembol: [(başlangıç, bitiş), ...]} → [başlangıç, bitiş) open time'lı mumlar hiç yok (bakım, delist)
+    """
+
+    MAX_LIMIT = 1500
+
+    def __init__(self, interval_ms=900_000, listings=None, now_ms=None, fail_every=None, gaps=None,
+                 host="127.0.0.1", port=0):
+        self.interval_ms = interval_ms
+        self.listings = listings or {}
+        self.gaps = gaps or {}
+        self.now_ms = now_ms
+        self.fail_every = fail_every
+        self._lock = threading.Lock()
+        self._minute = None
+        self._used_weight = 0
+        self.request_count = 0
+        self.kline_requests = []   # (sembol, startTime, endTime, limit)
+
+        self._httpd = _QueuedHTTPServer((host, port), self._make_handler())
+        self.host, self.port = self._httpd.server_address[:2]
+        self.url = f"http://{self.host}:{self.port}"
+
+    def _now(self):
+        return self.now_ms if self.now_ms is not None else int(time.time() * 1000)
+
+    def bars(self, symbol, open_times):
+        """Verilen open time'lar için Binance kline satırları (istek/sayfa sınırlarından bağımsız)."""
+        seed = zlib.crc32(symbol.encode())
+        base = 10 + seed % 1000
+        phase = seed % 997
+        index = open_times // self.interval_ms
+
+        def price(i):
+            # open time'ın deterministik fonksiyonu: sayfa sınırlarında süreksizlik yok
+            return base * np.exp(0.08 * np.sin((i + phase) / 397.0) + 0.03 * np.sin((i + phase) / 37.0)
+                                 + 0.006 * np.sin(i * 1.7))
+
+        close, prev = price(index), price(index - 1)
+        wick = 1 + 0.002 * (1 + np.sin(index * 0.61))
+        high = np.maximum(prev, close) * wick
+        low = np.minimum(prev, close) / wick
+        volume = 1000 * (1.5 + np.sin(index * 0.23))
+        return [
+            [int(t), f"{o:.8f}", f"{h:.8f}", f"{l:.8f}", f"{c:.8f}", f"{v:.4f}", int(t) + self.interval_ms - 1,
+             f"{v * c:.4f}", 100, f"{v / 2:.4f}", f"{v * c / 2:.4f}", "0"]
+            for t, o, h, l, c, v in zip(open_times, prev, high, low, close, volume)
+        ]
+
+    def _existing(self, symbol, open_times):
+        """gaps aralıklarındaki mumları çıkarır."""
+        keep = np.ones(len(open_times), dtype=bool)
+        for start, end in self.gaps.get(symbol, ()):
+            keep &= (open_times < start) | (open_times >= end)
+        return open_times[keep]
+
+    def _klines(self, query):
+        symbol = query.get("symbol", [""])[0].upper()
+        limit = min(int(query.get("limit", ["500"])[0]), self.MAX_LIMIT)
+        now = self._now()
+        end = min(int(query.get("endTime", [now])[0]), now)
+        start = query.get("startTime")
+        listing = self.listings.get(symbol, 0)
+        if start is not None:
+            first = max(int(start[0]), listing)
+            first = -(-first // self.interval_ms) * self.interval_ms
+            open_times = self._existing(symbol, np.arange(first, end + 1, self.interval_ms, dtype=np.int64))[:limit]
+        else:
+            last = end // self.interval_ms * self.interval_ms
+            missing = sum((e - s) // self.interval_ms + 1 for s, e in self.gaps.get(symbol, ()))
+            first = max(-(-listing // self.interval_ms) * self.interval_ms,
+                        last - (limit - 1 + missing) * self.interval_ms)
+            open_times = self._existing(symbol, np.arange(first, last + 1, self.interval_ms, dtype=np.int64))[-limit:]
+        with self._lock:
+            self.kline_requests.append((symbol, start and int(start[0]), end, limit))
+        return self.bars(symbol, open_times), (10 if limit > 1000 else 5 if limit >= 500 else 2 if limit >= 100 else 1)
+
+    def _make_handler(self):
+        server = self
+
+        class _Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def _send(self, status, payload, weight=1):
+                body = json.dumps(payload).encode()
+                with server._lock:
+                    minute = int(time.time() // 60)
+                    if minute != server._minute:
+                        server._minute, server._used_weight = minute, 0
+                    server._used_weight += weight
+                    used = server._used_weight
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.send_header("X-MBX-USED-WEIGHT-1M", str(used))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                query = parse_qs(url.query)
+                with server._lock:
+                    server.request_count += 1
+                    count = server.request_count
+                if url.path == "/fapi/v1/time":
+                    self._send(200, {"serverTime": server._now()})
+                elif url.path == "/fapi/v1/klines":
+                    if server.fail_every and count % server.fail_every == 0:
+                        self._send(503, {"code": -1001, "msg": "Internal error; unable to process your request."})
+                        return
+                    rows, weight = server._klines(query)
+                    self._send(200, rows, weight)
+                else:
+                    self._send(400, {"code": -1121, "msg": "Invalid symbol."})
+
+            def log_message(self, *args):
+                pass
+
+        return _Handler
+
+    def start(self):
+        threading.Thread(target=self._httpd.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
@@ -17,6 +17,15 @@ from config import (TESTNET_API_KEY, TESTNET_SECRET_KEY, TESTNET_BASE_URL,
 from gui import BotGUI 
 from strategies.score import SignalEngine
 from strategy import StrategyCore 
+from kline_stream import KlineStream, MAINNET_STREAM_URL, TESTNET_STREAM_URL
+from exchange_filters import ExchangeFilterIndex, format_decimal, quantize_down, quantize_nearest
+from position_state import PositionBook
+from request_scheduler import RequestScheduler
+from async_scan import AsyncScanner, aiohttp
+from candle_archive import CandleArchive
+from strategies.batch_score import SIGNAL_HOLD, SIGNAL_NAMES, decode_reasons
+from process_scoring import ProcessScorer
+from candle_clock import CandleClock
 from binance.um_futures import UMFutures
 from binance.error import ClientError
 
@@ -35,6 +44,15 @@ logging.getLogger("urllib3").setLevel(logging.ERROR)
 
 UPDATE_INTERVAL_SECONDS = 5 
 SCAN_INTERVAL_SECONDS = 120 
+USE_KLINE_STREAM = True  # WebSocket kline akışı: tarama mum kapanışında başlar, veri buffer'dan okunur
+USE_ASYNC_SCAN = False   # aiohttp ile tek oturumda async kline çekimi (akış kapalıyken)
+USE_BATCH_SCORING = False  # Tüm evreni tek dizi çağrısında puanla (sembol başına thread görevi yerine)
+USE_PROCESS_POOL = False   # Puanlamayı süreç havuzuna dağıt (mumlar shared memory ile, emirler ana süreçte)
+USE_CANDLE_CLOCK = True    # Taramayı sunucu saatine göre mum kapanışına hizala (sabit uyku yerine)
+SCAN_CLOSE_DELAY_MS = 300  # Mum kapanışından kaç ms sonra tarama başlasın
+MID_BAR_SCAN_SECONDS = None  # Mum ortası ara tarama aralığı (örn. 300); None → sadece kapanışta
+POSITION_MAX_AGE_SECONDS = 30  # Pozisyon görüntüsü bundan eskiyse yeni pozisyon açılmaz (monitor 4 sn'de bir yeniler)
+CANDLE_ARCHIVE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "candles")  # None → arşiv kapalı
 
 class AllyGatorLogic:
     def __init__(self, root):
@@ -45,8 +63,15 @@ class AllyGatorLogic:
         self.is_running = False        
         self.trading_active = False    
         self.scan_thread_active = False # YENİ EKLEME
-        self.client: UMFutures = None  
+        self.client: RequestScheduler = None  
         self.strategy_core: StrategyCore = None
+        self.kline_stream: KlineStream = None
+        self.process_scorer: ProcessScorer = None
+        self.candle_clock: CandleClock = None
+        self.exchange_filters: ExchangeFilterIndex = None
+        self.position_book: PositionBook = None
+        self.stream_url = MAINNET_STREAM_URL
+        self.base_url = REAL_BASE_URL
         
         # Hesap İstatistikleri
         self.current_balance = 0.0
@@ -86,25 +111,51 @@ class AllyGatorLogic:
             api_key = TESTNET_API_KEY
             secret_key = TESTNET_SECRET_KEY
             base_url = TESTNET_BASE_URL
+            self.stream_url = TESTNET_STREAM_URL
         else:
             api_key = REAL_API_KEY
             secret_key = REAL_SECRET_KEY
             base_url = REAL_BASE_URL
+            self.stream_url = MAINNET_STREAM_URL
 
         if not api_key or not secret_key:
             self.gui.log("HATA: API Key yok!", force=True)
             self.gui.on_stop_press()
             return
         
+        self.base_url = base_url
         try:
-            self.client = UMFutures(key=api_key, secret=secret_key, base_url=base_url)
+            # Tüm çağrılar ağırlık bütçesine duyarlı zamanlayıcıdan geçer
+            self.client = RequestScheduler(
+                UMFutures(key=api_key, secret=secret_key, base_url=base_url),
+                log_func=self.gui.log
+            )
             self.gui.log("✅ Bağlantı başarılı.", force=True)
         except Exception as e:
             self.gui.log(f"❌ Bağlantı Hatası: {e}", force=True)
             self.gui.on_stop_press()
             return
         
-        self.strategy_core = StrategyCore(self.client, self.gui.settings, self.gui.log)
+        # Borsa filtreleri: bir kez yükle, arka planda yenile (her emirde exchange_info çekme)
+        # İlk yükleme başarısız olursa arka plan thread'i kısa aralıkla tekrar dener
+        self.exchange_filters = ExchangeFilterIndex(self.client, log_func=self.gui.log)
+        self.exchange_filters.start()
+
+        self.position_book = PositionBook(self.client, max_age=POSITION_MAX_AGE_SECONDS)
+        try:
+            # Tarama monitor döngüsünden önce başlayabilir: mevcut pozisyonları hemen yükle
+            self.position_book.refresh()
+        except Exception as e:
+            self.gui.log(f"⚠️ Açılışta pozisyonlar alınamadı ({e}) → ilk başarılı yenilemeye kadar yeni işlem açılmaz", force=True)
+        archive = CandleArchive(CANDLE_ARCHIVE_DIR) if CANDLE_ARCHIVE_DIR else None
+        self.strategy_core = StrategyCore(self.client, self.gui.settings, self.gui.log, archive=archive)
+        self.kline_stream = None  # Yeni cache → akış ilk taramada yeniden kurulur
+        if USE_CANDLE_CLOCK:
+            self.candle_clock = CandleClock(
+                self.client, '15m', close_delay_ms=SCAN_CLOSE_DELAY_MS,
+                mid_bar_seconds=MID_BAR_SCAN_SECONDS, log_func=self.gui.log
+            )
+            self.candle_clock.sync()
         self.is_running = True
         self.start_time = time.time()
         self.position_monitor_active = True
@@ -124,6 +175,12 @@ class AllyGatorLogic:
         self.is_running = False
         self.trading_active = False
         self.position_monitor_active = False
+        if self.kline_stream:
+            self.kline_stream.stop()
+        if self.process_scorer:
+            self.process_scorer.stop()
+        if self.exchange_filters:
+            self.exchange_filters.stop()
 
     def toggle_trading(self, active_state):
         self.trading_active = active_state
@@ -154,10 +211,10 @@ class AllyGatorLogic:
                 # 1. Hesap bilgilerini güncelle
                 self.get_account_info()
                 
-                # 2. Pozisyonları al
-                positions = self.client.get_position_risk()
-                current_positions = [p for p in positions if float(p.get('positionAmt', 0)) != 0]
-                current_symbols = {p['symbol'] for p in current_positions}
+                # 2. Pozisyonları al (tik başına tek istek, herkes bu snapshot'ı kullanır)
+                snapshot = self.position_book.refresh()
+                current_positions = snapshot.active()
+                current_symbols = snapshot.symbols()
 
                 # 3. Kapanan pozisyonları tespit et ve temizle
                 closed_symbols = self.previous_symbols - current_symbols
@@ -180,7 +237,7 @@ class AllyGatorLogic:
                     self.additional_risk_checks(pos)
                 
                 # 5. GUI'yi güncelle
-                self.update_open_positions()
+                self.update_open_positions(snapshot)
 
             except Exception as e:
                 self.gui.log(f"Monitor loop hatası: {e}", force=False)
@@ -332,33 +389,22 @@ class AllyGatorLogic:
                 self.strategy_core.engine.settings = current_settings.copy()  # Engine'i doğrudan güncelle
                 self.gui.settings = current_settings
 
-                symbols = self.strategy_core.get_symbols_to_scan()
-                
-                if not symbols:
-                    self.gui.log("UYARI: Hiçbir sembol filtreyi geçemedi.", force=True)
-                    continue
-                    
-                # DÜZGÜN ThreadPool kullanımı
-                with ThreadPoolExecutor(max_workers=5) as executor:
-                    # Tüm sembolleri paralel işle
-                    futures = {}
-                    for symbol in symbols:
-                        if not self.is_running or not self.trading_active:
-                            break
-                        # Her sembol için analiz işlemini başlat
-                        future = executor.submit(self.analyze_and_trade_symbol, symbol)
-                        futures[future] = symbol
+                if USE_ASYNC_SCAN and not USE_KLINE_STREAM and aiohttp is not None:
+                    # Ticker + tüm kline'lar tek async oturumda, biten frame doğrudan puanlamaya
+                    self.async_scan_and_trade()
+                else:
+                    symbols = self.strategy_core.get_symbols_to_scan()
                     
-                    # Sonuçları bekle ve işle
-                    for future in as_completed(futures):
-                        if not self.is_running or not self.trading_active:
-                            break
-                        symbol = futures[future]
-                        try:
-                            result = future.result()
-                            # result burada sinyal bilgisi olacak
-                        except Exception as e:
-                            self.gui.log(f"❌ {symbol} analiz hatası: {e}", force=False)
+                    if not symbols:
+                        self.gui.log("UYARI: Hiçbir sembol filtreyi geçemedi.", force=True)
+                        continue
+
+                    if USE_PROCESS_POOL:
+                        self.process_scan_and_trade(symbols)
+                    elif USE_BATCH_SCORING:
+                        self.batch_scan_and_trade(symbols)
+                    else:
+                        self.scan_symbols(symbols)
                     
             except Exception as e:
                 self.gui.log(f"❌ Tarama Hatası: {e}", force=True)
@@ -366,8 +412,30 @@ class AllyGatorLogic:
             if not self.is_running or not self.trading_active:
                 break
                 
-            self.gui.log(f"Tarama bitti. {SCAN_INTERVAL_SECONDS} sn bekleme...", force=True)
-            time.sleep(SCAN_INTERVAL_SECONDS)
+            if self.candle_clock:
+                skew_report = self.candle_clock.format_skew()
+                if skew_report:
+                    self.gui.log(skew_report, force=False)
+
+            if self.kline_stream and self.kline_stream.is_running():
+                # Akış açıksa bir sonraki mum kapanışında hemen tara (en fazla SCAN_INTERVAL / sonraki tik kadar bekle)
+                timeout = SCAN_INTERVAL_SECONDS
+                if self.candle_clock:
+                    timeout = self.candle_clock.seconds_to_next_fire() + 1
+                self.gui.log(f"Tarama bitti. Mum kapanışı bekleniyor (max {timeout:.0f} sn)...", force=True)
+                closed = self.kline_stream.wait_for_close(timeout)
+                if self.candle_clock:
+                    # Gecikme mesajdaki gerçek kapanıştan ölçülür (yerel saatin mum sınırından değil)
+                    close_time = self.kline_stream.last_close_time if closed else None
+                    self.candle_clock.mark_tick(close_time, is_close=bool(closed))
+            elif self.candle_clock:
+                fire, _, is_close = self.candle_clock.next_fire()
+                wait_s = (fire - self.candle_clock.server_now_ms()) / 1000
+                self.gui.log(f"Tarama bitti. {'Mum kapanışı' if is_close else 'Ara tarama'} için {wait_s:.0f} sn bekleme...", force=True)
+                self.candle_clock.wait(lambda: not self.is_running or not self.trading_active)
+            else:
+                self.gui.log(f"Tarama bitti. {SCAN_INTERVAL_SECONDS} sn bekleme...", force=True)
+                time.sleep(SCAN_INTERVAL_SECONDS)
 
             self.scan_thread_active = False
         
@@ -376,27 +444,132 @@ class AllyGatorLogic:
         elif self.is_running and not self.trading_active:
                     self.gui.log("ALIM MODU kapandı, tarama bitti.", force=True)
 
+    def scan_symbols(self, symbols):
+        """Sembolleri thread havuzunda analiz eder (veri cache/akış buffer'ından)."""
+        if USE_KLINE_STREAM:
+            self.ensure_kline_stream(symbols)
+            
+        # Worker sayısı kalan istek ağırlığı bütçesine göre (kısıtlamayı zamanlayıcı yapar)
+        with ThreadPoolExecutor(max_workers=self.client.recommended_workers()) as executor:
+            # Tüm sembolleri paralel işle
+            futures = {}
+            for symbol in symbols:
+                if not self.is_running or not self.trading_active:
+                    break
+                # Her sembol için analiz işlemini başlat
+                future = executor.submit(self.analyze_and_trade_symbol, symbol)
+                futures[future] = symbol
+            
+            # Sonuçları bekle ve işle
+            for future in as_completed(futures):
+                if not self.is_running or not self.trading_active:
+                    break
+                symbol = futures[future]
+                try:
+                    result = future.result()
+                    # result burada sinyal bilgisi olacak
+                except Exception as e:
+                    self.gui.log(f"❌ {symbol} analiz hatası: {e}", force=False)
+        
+        # Modül başına çağrı/süre istatistiği (birikimli)
+        self.gui.log(self.strategy_core.engine.format_module_stats(), force=False)
+
+    def batch_scan_and_trade(self, symbols):
+        """Toplu tarama: veriler paralel toplanır, tüm evren tek çağrıda puanlanır."""
+        if USE_KLINE_STREAM:
+            self.ensure_kline_stream(symbols)
+
+        with ThreadPoolExecutor(max_workers=self.client.recommended_workers()) as executor:
+            kept, data = self.strategy_core.get_batch(symbols, interval='15m', limit=100, executor=executor)
+
+        t0 = time.perf_counter()
+        signals, scores, reasons = self.strategy_core.engine.score_batch(data)
+        self.gui.log(f"🧮 Toplu puanlama: {len(kept)} sembol, {(time.perf_counter() - t0) * 1000:.0f} ms", force=False)
+
+        for i in np.flatnonzero(signals != SIGNAL_HOLD):
+            if not self.is_running or not self.trading_active:
+                break
+            symbol = kept[i]
+            try:
+                df = self.strategy_core.get_candlesticks(symbol, interval='15m', limit=100)
+                if df is not None:
+                    self.trade_on_signal(symbol, SIGNAL_NAMES[int(signals[i])], decode_reasons(reasons[i]), df)
+            except Exception as e:
+                self.gui.log(f"❌ {symbol} işlem hatası: {e}", force=False)
+
+    def process_scan_and_trade(self, symbols):
+        """Süreç havuzu taraması: veri thread'lerle toplanır, puanlama worker süreçlerinde yapılır."""
+        if USE_KLINE_STREAM:
+            self.ensure_kline_stream(symbols)
+
+        with ThreadPoolExecutor(max_workers=self.client.recommended_workers()) as executor:
+            kept, data = self.strategy_core.get_batch(symbols, interval='15m', limit=100, executor=executor)
+
+        if self.process_scorer is None:
+            self.process_scorer = ProcessScorer(log_func=self.gui.log)
+
+        t0 = time.perf_counter()
+        engine = self.strategy_core.engine
+        results = self.process_scorer.score(kept, data, engine.settings, engine.weights, engine.threshold)
+        self.gui.log(
+            f"🧮 Süreç havuzu: {len(kept)} sembol, {self.process_scorer.workers} worker, "
+            f"{(time.perf_counter() - t0) * 1000:.0f} ms", force=False
+        )
+
+        # Emirler ana süreçte
+        for symbol, signal, score, reason in results:
+            if not self.is_running or not self.trading_active:
+                break
+            try:
+                df = self.strategy_core.get_candlesticks(symbol, interval='15m', limit=100)
+                if df is not None:
+                    self.trade_on_signal(symbol, signal, reason, df)
+            except Exception as e:
+                self.gui.log(f"❌ {symbol} işlem hatası: {e}", force=False)
+
+    def async_scan_and_trade(self):
+        """Async tarama: frame'ler geldikçe puanlama thread havuzunda yapılır."""
+        scanner = AsyncScanner(self.base_url, interval='15m', limit=100, log_func=self.gui.log)
+        with ThreadPoolExecutor(max_workers=5) as executor:
+            _, stats = scanner.run(
+                self.strategy_core.min_volume_mn(),
+                on_frame=self.analyze_and_trade_symbol,
+                executor=executor
+            )
+        self.gui.log(
+            f"⚡ Async tarama: {stats['frames']}/{stats['symbols']} sembol, "
+            f"{stats['total_sec']:.2f} sn (ağırlık: {scanner.last_used_weight})", force=True
+        )
+
+    def ensure_kline_stream(self, symbols):
+        """Tarama evreni için kline akışını başlatır/günceller."""
+        try:
+            if self.kline_stream is None:
+                self.kline_stream = KlineStream(
+                    self.strategy_core.candle_cache,
+                    interval='15m',
+                    stream_url=self.stream_url,
+                    log_func=self.gui.log
+                )
+            self.kline_stream.update_symbols(symbols)
+        except Exception as e:
+            self.gui.log(f"⚠️ Kline akışı başlatılamadı, REST ile devam: {e}", force=True)
+
     # YENİ FONKSİYON EKLE - Thread'lerde çalışacak
-    def analyze_and_trade_symbol(self, symbol):
-        """Tek bir sembolü analiz eder ve trade açar"""
+    def analyze_and_trade_symbol(self, symbol, df=None):
+        """Tek bir sembolü analiz eder ve trade açar (df verilmezse cache'den çeker)"""
         try:
             #self.gui.log(f"-> {symbol} kontrol...", force=False)
-            df = self.strategy_core.get_candlesticks(symbol, interval='15m', limit=100)
+            if df is None:
+                df = self.strategy_core.get_candlesticks(symbol, interval='15m', limit=100)
             if df is None: 
                 return None
-                
-            leverage, avg_vol = self.strategy_core.calculate_volatility(df)
             
             # Güncellenmiş sinyal çağrısı
             signal, reason, _, _, _ = self.strategy_core.generate_signal(df, symbol=symbol)
             
             if signal != "HOLD":
-                self.gui.log(f"🔔 SİNYAL: {symbol} -> {signal} | Kaldıraç: {leverage}x | Vol: {avg_vol:.2f}% | Sebep: {reason}", force=True)
-                
-                if not self.has_open_position(symbol):
-                    self.open_position(symbol, signal, leverage, df)
-                else:
-                    self.gui.log(f"⚠️ {symbol} zaten açık pozisyon var.", force=False)
+                self.trade_on_signal(symbol, signal, reason, df)
                     
             return signal
             
@@ -404,17 +577,33 @@ class AllyGatorLogic:
             self.gui.log(f"❌ {symbol} işlem hatası: {e}", force=False)
             return None
 
+    def trade_on_signal(self, symbol, signal, reason, df):
+        """Sinyal veren sembol için kaldıracı belirler ve açık pozisyon yoksa işlem açar."""
+        leverage, avg_vol = self.strategy_core.calculate_volatility(df)
+        skew = self.candle_clock.record_signal() if self.candle_clock else None
+        delay = f" | Kapanıştan: {skew / 1000:.1f} sn" if skew is not None else ""
+        self.gui.log(f"🔔 SİNYAL: {symbol} -> {signal} | Kaldıraç: {leverage}x | Vol: {avg_vol:.2f}% | Sebep: {reason}{delay}", force=True)
+        
+        if not self.has_open_position(symbol):
+            self.open_position(symbol, signal, leverage, df)
+        else:
+            self.gui.log(f"⚠️ {symbol} zaten açık pozisyon var.", force=False)
+
     # --- 3. EMİR VE POZİSYON YÖNETİMİ ---
 
     def has_open_position(self, symbol):
+        """
+        Paylaşımlı snapshot'tan (açık pozisyon veya bekleyen açılış) - REST çağrısı yok.
+        Snapshot eskiyse veya okunamıyorsa True (emin olmadan pozisyon açılmaz).
+        """
         try:
-            positions = self.client.get_position_risk(symbol=symbol)
-            for p in positions:
-                if float(p['positionAmt']) != 0:
-                    return True
-            return False
-        except:
-            return False
+            if self.position_book.is_stale():
+                self.gui.log(f"⚠️ {symbol}: pozisyon görüntüsü {POSITION_MAX_AGE_SECONDS} sn'den eski → işlem açılmıyor", force=False)
+                return True
+            return self.position_book.has_open(symbol)
+        except Exception as e:
+            self.gui.log(f"❌ {symbol} pozisyon kontrolü hatası: {e} → işlem açılmıyor", force=False)
+            return True
 
     def set_leverage_and_margin_mode(self, symbol, leverage):
         margin_mode = "ISOLATED" if self.gui.isolated_var.get() == 1 else "CROSSED"
@@ -430,12 +619,12 @@ class AllyGatorLogic:
              return True
 
     def round_step_size(self, quantity, step_size):
-        """Basit ve güvenli rounding"""
-        return round(quantity, 6)  # Çoğu coin için yeterli
+        """Miktarı step_size katına aşağı yuvarlar (Decimal, tam)"""
+        return quantize_down(quantity, step_size)
 
     def round_price(self, price, tick_size):
-        """Basit ve güvenli rounding"""
-        return round(price, 8)  # Çoğu coin için yeterli
+        """Fiyatı tick_size katına yuvarlar (Decimal, tam)"""
+        return quantize_nearest(price, tick_size)
     
     def clean_open_orders(self, symbol):
         try:
@@ -468,20 +657,25 @@ class AllyGatorLogic:
             self.gui.log(f"PNL Geçmiş Hatası ({symbol}): {e}", force=False)
 
     # --- KRİTİK DEĞİŞİKLİK: open_position artık 'df' alıyor ---
-    def calculate_atr(self, df, period=14):
+    def calculate_atr(self, df, period=14, symbol=None):
         """
         Average True Range (ATR) hesaplar - GÜVENLİ VERSİYON
+        symbol verilirse (period=14) sembolün akışlı ATR durumu kullanılır.
         """
         try:
             if len(df) < period + 1:
                 return 0.0
-                
-            atr_indicator = ta.volatility.AverageTrueRange(
-                high=df['High'], low=df['Low'], close=df['Close'], window=period
-            )
-            atr_series = atr_indicator.average_true_range()
             
-            atr_value = atr_series.iloc[-1] if not atr_series.empty else 0.0
+            indicators = self.strategy_core.indicators if self.strategy_core else None
+            if symbol and period == 14 and indicators is not None and 'Open time' in df.columns:
+                atr_value = indicators.update(symbol, '15m', df)['atr']
+            else:
+                atr_indicator = ta.volatility.AverageTrueRange(
+                    high=df['High'], low=df['Low'], close=df['Close'], window=period
+                )
+                atr_series = atr_indicator.average_true_range()
+                
+                atr_value = atr_series.iloc[-1] if not atr_series.empty else 0.0
             
             if atr_value == 0 or pd.isna(atr_value):
                 current_price = df['Close'].iloc[-1]
@@ -494,9 +688,20 @@ class AllyGatorLogic:
             return current_price * 0.01
 
     def open_position(self, symbol, signal, leverage, df):
-        if self.has_open_position(symbol):
+        # Atomik rezervasyon: iki tarayıcı thread'i aynı sembolde çift pozisyon açamaz
+        if not self.position_book.try_reserve(symbol):
             return
 
+        opened = False
+        try:
+            opened = self._open_position(symbol, signal, leverage, df)
+        finally:
+            if not opened:
+                self.position_book.release(symbol)
+
+    def _open_position(self, symbol, signal, leverage, df):
+        """Emri gönderir; market emri gittiyse True döner."""
+        opened = False
         try:
             account_resp = self.client.account()
             available_balance = 0.0
@@ -522,35 +727,25 @@ class AllyGatorLogic:
             ticker = self.client.ticker_price(symbol)
             current_price = float(ticker['price'])
             
-            exchange_info = self.client.exchange_info()
-            step_size = 0.001
-            tick_size = 0.01
-            for s in exchange_info['symbols']:
-                if s['symbol'] == symbol:
-                    for f in s['filters']:
-                        if f['filterType'] == 'LOT_SIZE': 
-                            step_size = float(f['stepSize'])
-                        if f['filterType'] == 'PRICE_FILTER': 
-                            tick_size = float(f['tickSize'])
-                    break
+            # Filtreler önbellekten (O(1)) - exchange_info her emirde indirilmez
+            filters = self.exchange_filters.get(symbol) if self.exchange_filters else None
+            if filters is None:
+                self.gui.log(f"⚠️ {symbol}: Borsa filtresi bulunamadı, işlem atlandı.", force=True)
+                return
             
             qty_raw = (investment_amount * leverage) / current_price 
-            
-            if step_size <= 0:
-                step_size = 0.001
-
-            try:
-                qty_precision = max(0, min(6, int(round(-np.log10(step_size), 0))))
-            except:
-                qty_precision = 3
-
-            quantity = float(f"{qty_raw:.{qty_precision}f}")
+            quantity = self.exchange_filters.quantize_qty(symbol, qty_raw)
             
             if quantity == 0: return
 
+            order_ok, order_reason = self.exchange_filters.check_order(symbol, quantity, current_price)
+            if not order_ok:
+                self.gui.log(f"⚠️ {symbol}: Emir filtreye takıldı ({order_reason}).", force=True)
+                return
+
             # ATR HESAPLAMA - Risk.py'deki calculate_atr fonksiyonunu kullan
             #from risk import calculate_atr  # Risk dosyasından import et
-            atr_val = self.calculate_atr(df)
+            atr_val = self.calculate_atr(df, symbol=symbol)
     
             # ATR çok küçükse minimum değer kullan
             current_price = float(ticker['price'])
@@ -566,14 +761,6 @@ class AllyGatorLogic:
                 order_side = "SELL"
                 close_side = "BUY"
             
-            if tick_size <= 0:
-                tick_size = 0.01
-
-            try:
-                price_precision = max(2, min(8, int(round(-np.log10(tick_size), 0))))
-            except:
-                price_precision = 4
-
             # SABİT STOP LOSS (Arayüzden gelen sl_pct ile)
             sl_pct = self.gui.settings['sl_pct'] / 100
             if signal == "LONG":
@@ -581,11 +768,13 @@ class AllyGatorLogic:
             else:  # SHORT
                 stop_loss_fixed = current_price * (1 + sl_pct)
             
-            stop_loss_fixed = round(stop_loss_fixed, price_precision)
+            stop_loss_fixed = self.round_price(stop_loss_fixed, filters['tick_size'])
 
             try:
                 # Pozisyon aç
-                self.client.new_order(symbol=symbol, side=order_side, type="MARKET", quantity=quantity)
+                self.client.new_order(symbol=symbol, side=order_side, type="MARKET",
+                                      quantity=format_decimal(quantity))
+                opened = True
                 self.gui.log(f"🚀 {symbol} {signal} AÇILDI. {quantity} adet @ {current_price} | ATR: {atr_val:.4f}", force=True)
                 
                 # Stop loss emri (SABİT - değişmedi)
@@ -594,7 +783,7 @@ class AllyGatorLogic:
                         symbol=symbol, 
                         side="SELL", 
                         type="STOP_MARKET", 
-                        stopPrice=stop_loss_fixed, 
+                        stopPrice=format_decimal(stop_loss_fixed), 
                         closePosition="true"
                     )
                 else:  # SHORT
@@ -602,7 +791,7 @@ class AllyGatorLogic:
                         symbol=symbol, 
                         side="BUY", 
                         type="STOP_MARKET", 
-                        stopPrice=stop_loss_fixed, 
+                        stopPrice=format_decimal(stop_loss_fixed), 
                         closePosition="true"
                     )
                 
@@ -614,7 +803,7 @@ class AllyGatorLogic:
                     'direction': signal,
                     'entry_price': current_price,
                     'peak_price': current_price,  # LONG için entry, SHORT için entry
-                    'initial_stop_loss': stop_loss_fixed,  # Sabit SL'i de kaydet
+                    'initial_stop_loss': float(stop_loss_fixed),  # Sabit SL'i de kaydet
                     'multiplier': 1.8  # Varsayılan multiplier
                 }
     
@@ -628,12 +817,14 @@ class AllyGatorLogic:
             
         except Exception as e:
             self.gui.log(f"❌ İşlem Hatası ({symbol}): {e}", force=True)
+
+        return opened
+
     def close_all_positions(self):
         """Tümünü kapatır - Geliştirilmiş versiyon"""
         self.gui.log("⚠️ TÜM POZİSYONLAR İÇİN KAPATMA EMRİ VERİLİYOR...", force=True)
         try:
-            all_positions = self.client.get_position_risk()
-            active_positions = [p for p in all_positions if float(p['positionAmt']) != 0]
+            active_positions = self.position_book.refresh().active()
 
             if not active_positions:
                 self.gui.log("⚠️ Kapatılacak açık pozisyon yok.", force=True)
@@ -651,10 +842,7 @@ class AllyGatorLogic:
                     self.gui.log(f"📦 {i+1}/{len(active_positions)} {symbol} kapatılıyor...", force=False)
                     self.close_single_position(symbol)
                     success_count += 1
-                    
-                    # Her 5 işlemde bir 1 saniye bekle (rate limit koruması)
-                    if (i + 1) % 5 == 0:
-                        time.sleep(1)
+                    # Rate limit koruması RequestScheduler'da (emirler öncelikli)
                         
                 except Exception as e:
                     error_count += 1
@@ -686,11 +874,12 @@ class AllyGatorLogic:
         except Exception as e:
             pass
 
-    def update_open_positions(self):
-        if not self.client: return
+    def update_open_positions(self, snapshot=None):
+        if not self.client or not self.position_book: return
         try:
-            positions = self.client.get_position_risk()
-            active_positions = [p for p in positions if float(p.get('positionAmt', 0)) != 0]
+            if snapshot is None:
+                snapshot = self.position_book.snapshot()
+            active_positions = snapshot.active()
             self.total_position_value = sum(float(p['markPrice']) * abs(float(p['positionAmt'])) for p in active_positions)
 
             def update_gui():
@@ -735,14 +924,12 @@ class AllyGatorLogic:
     def close_single_position(self, symbol):
         def _action():
             try:
-                positions = self.client.get_position_risk(symbol=symbol)
-                amt = 0.0
-                entry_price = 0.0
-                for p in positions:
-                    if float(p['positionAmt']) != 0:
-                        amt = float(p['positionAmt'])
-                        entry_price = float(p['entryPrice'])
-                        break
+                pos = self.position_book.get(symbol)
+                if pos is None:
+                    # Snapshot'ta yoksa (örn. yeni açıldı) tazele
+                    pos = self.position_book.refresh().get(symbol)
+                amt = float(pos['positionAmt']) if pos else 0.0
+                entry_price = float(pos['entryPrice']) if pos else 0.0
                 
                 if amt == 0:
                     #self.safe_cancel_all_orders(symbol, reason="Temizlik")
@@ -755,6 +942,7 @@ class AllyGatorLogic:
                 response = self.client.new_order(symbol=symbol, side=side, type="MARKET", quantity=qty, reduceOnly="true", recvWindow=30000)
                 
                 self.previous_symbols.discard(symbol) 
+                self.position_book.mark_closed(symbol)
                 #self.safe_cancel_all_orders(symbol)
 
                 exit_price = float(response.get('avgPrice', 0))
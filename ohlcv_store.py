@@ -0,0 +1,125 @@
+import numpy as np
+import pandas as pd
+
+# Kolon sırası (values dizisinin satırları)
+FIELDS = ('open', 'high', 'low', 'close', 'volume', 'taker_buy_volume')
+
+# Ham kline satırındaki karşılık gelen indeksler
+_KLINE_IDX = [1, 2, 3, 4, 5, 9]
+
+# DataFrame görünümündeki kolon isimleri (mevcut modüllerle uyumlu)
+FRAME_COLUMNS = {
+    'open': 'Open', 'high': 'High', 'low': 'Low', 'close': 'Close',
+    'volume': 'Volume', 'taker_buy_volume': 'Taker buy base asset volume'
+}
+
+
+class OHLCVStore:
+    """
+    Tek sembol için kolon bazlı mum deposu.
+    Önceden ayrılmış tek bir float64 blok (alan × 2*kapasite) ve int64 open time dizisi tutar;
+    ekleme kayan pencere şeklindedir (dolunca son mumlar başa kaydırılır), böylece
+    `arrays()` her zaman bitişik, kopyasız NumPy görünümleri döndürür.
+
+    Not: Görünümler bir sonraki yazmaya kadar geçerlidir; başka thread yazıyorsa kopya alın.
+    """
+
+    def __init__(self, capacity=500):
+        self.capacity = capacity
+        self._buf_len = 2 * capacity
+        self.open_time = np.zeros(self._buf_len, dtype=np.int64)
+        self.values = np.zeros((len(FIELDS), self._buf_len), dtype=np.float64)
+        self._start = 0
+        self._end = 0
+
+    @classmethod
+    def from_klines(cls, klines, capacity=None):
+        store = cls(capacity or max(len(klines), 1))
+        store.extend_klines(klines)
+        return store
+
+    def __len__(self):
+        return self._end - self._start
+
+    def clear(self):
+        self._start = self._end = 0
+
+    def last_open_time(self):
+        if self._end == self._start:
+            return None
+        return int(self.open_time[self._end - 1])
+
+    # --- Yazma ---
+
+    def _reserve(self, n):
+        """n yeni mum için yer açar (gerekirse son mumları buffer başına kaydırır)."""
+        if self._end + n <= self._buf_len:
+            return
+        keep = min(len(self), self.capacity - n)
+        if keep > 0:
+            self.open_time[:keep] = self.open_time[self._end - keep:self._end]
+            self.values[:, :keep] = self.values[:, self._end - keep:self._end]
+        self._start = 0
+        self._end = max(keep, 0)
+
+    def extend_klines(self, klines):
+        """Ham kline satırlarını (Binance formatı, eskiden yeniye) sona ekler."""
+        if not klines:
+            return
+        if len(klines) > self.capacity:
+            klines = klines[-self.capacity:]
+
+        raw = np.asarray(klines, dtype=object)
+        self.extend_arrays(raw[:, 0].astype(np.int64), raw[:, _KLINE_IDX].astype(np.float64).T)
+
+    def extend_arrays(self, open_time, values):
+        """open_time (n,) ve values (alan × n) dizilerini sona ekler."""
+        n = len(open_time)
+        if n == 0:
+            return
+        if n > self.capacity:
+            open_time, values = open_time[-self.capacity:], values[:, -self.capacity:]
+            n = self.capacity
+
+        self._reserve(n)
+        self.open_time[self._end:self._end + n] = open_time
+        self.values[:, self._end:self._end + n] = values
+        self._end += n
+        if len(self) > self.capacity:
+            self._start = self._end - self.capacity
+
+    def upsert_kline(self, row):
+        """Tek satır: son mumla aynı open time ise günceller, daha yeniyse ekler."""
+        open_time = int(row[0])
+        last = self.last_open_time()
+        if last is not None and open_time == last:
+            self.values[:, self._end - 1] = [float(row[i]) for i in _KLINE_IDX]
+            return True
+        if last is None or open_time > last:
+            self.extend_klines([row])
+            return True
+        return False
+
+    def truncate_from(self, open_time):
+        """open_time ve sonrasındaki mumları atar (REST birleştirmesinde son mumu değiştirmek için)."""
+        times = self.open_time[self._start:self._end]
+        cut = int(np.searchsorted(times, open_time, side='left'))
+        self._end = self._start + cut
+
+    # --- Okuma ---
+
+    def arrays(self, limit=None):
+        """Son `limit` mumun kopyasız görünümleri: {'open_time': ..., 'open': ..., ...}"""
+        start = self._start if limit is None else max(self._start, self._end - limit)
+        out = {'open_time': self.open_time[start:self._end]}
+        for i, name in enumerate(FIELDS):
+            out[name] = self.values[i, start:self._end]
+        return out
+
+    def to_frame(self, limit=None):
+        """Gerektiğinde DataFrame görünümü (kopya) oluşturur."""
+        arrs = self.arrays(limit)
+        data = {'Open time': arrs['open_time']}
+        for name in FIELDS:
+            data[FRAME_COLUMNS[name]] = arrs[name]
+        return pd.DataFrame(data, copy=True)
@@ -0,0 +1,93 @@
+import numpy as np
+
+# Yapılandırılmış Order Block dizisi: her satır bir blok mumu
+OB_DTYPE = np.dtype([
+    ('index', '<i8'),   # Blok mumunun indeksi (güçlü mum; formasyon bu mumda tamamlanır)
+    ('low', '<f8'),     # Blok alt sınırı (mumun Low'u)
+    ('high', '<f8'),    # Blok üst sınırı (mumun High'ı)
+])
+
+# Blok mumu ile son mum arasında en az bu kadar mum olmalı (eski döngüdeki current_idx - 2 sınırı)
+MIN_AGE = 3
+
+
+def order_block_masks(df):
+    """
+    Her mum için Order Block formasyonu maskeleri (vektörel, tek geçiş).
+    Bullish OB: önceki mum bearish, bu mum bullish ve gövdesi öncekinin 2 katından büyük.
+    Bearish OB: önceki mum bullish, bu mum bearish ve gövdesi öncekinin 2 katından büyük.
+    İlk mumun öncesi olmadığı için her iki maskede de False'tur.
+    """
+    return order_block_masks_from_arrays(
+        df['Open'].to_numpy(dtype=np.float64), df['Close'].to_numpy(dtype=np.float64)
+    )
+
+
+def order_block_masks_from_arrays(open_, close):
+    """order_block_masks'ın dizi hali (son eksen boyunca; toplu tarama için semboller × n olabilir)."""
+    bullish = np.zeros(open_.shape, dtype=bool)
+    bearish = np.zeros(open_.shape, dtype=bool)
+    if open_.shape[-1] < 2:
+        return bullish, bearish
+
+    prev_o, prev_c = open_[..., :-1], close[..., :-1]
+    o, c = open_[..., 1:], close[..., 1:]
+
+    bullish[..., 1:] = (prev_c < prev_o) & (c > o) & ((c - o) > 2 * np.abs(prev_o - prev_c))
+    bearish[..., 1:] = (prev_c > prev_o) & (c < o) & (np.abs(o - c) > 2 * (prev_c - prev_o))
+    return bullish, bearish
+
+
+def _make_ob_array(idx, low, high):
+    blocks = np.zeros(len(idx), dtype=OB_DTYPE)
+    blocks['index'] = idx
+    blocks['low'] = low[idx]
+    blocks['high'] = high[idx]
+    return blocks
+
+
+def find_order_blocks(df):
+    """
+    Tüm geçmişteki Order Block'ları tek seferde döndürür (backtest için).
+    Dönüş: (bullish, bearish) OB_DTYPE dizileri, indekse göre sıralı.
+    Not: Blok mumu j, ancak j + MIN_AGE. mumdan itibaren canlı modüldeki gibi kullanılabilir.
+    """
+    bullish, bearish = order_block_masks(df)
+    low = df['Low'].to_numpy(dtype=np.float64)
+    high = df['High'].to_numpy(dtype=np.float64)
+    return (_make_ob_array(np.flatnonzero(bullish), low, high),
+            _make_ob_array(np.flatnonzero(bearish), low, high))
+
+
+def order_blocks_at(open_, close, low, high, i):
+    """Sadece i. mumdaki blok (find_order_blocks'un tek mumluk hali; oluşan mum için)."""
+    empty = np.zeros(0, dtype=OB_DTYPE)
+    if i < 1:
+        return empty, empty
+    bullish, bearish = order_block_masks_from_arrays(open_[i - 1:i + 1], close[i - 1:i + 1])
+    idx = np.array([i])
+    return (_make_ob_array(idx, low, high) if bullish[1] else empty,
+            _make_ob_array(idx, low, high) if bearish[1] else empty)
+
+
+def latest_order_blocks(df, current_price, lookback=50, blocks=None):
+    """
+    Son `lookback` mum içinde fiyatın bölgesinde olduğu en yeni bullish/bearish blokları bulur.
+    Bullish bölge: low <= fiyat <= high * 1.01, Bearish bölge: low * 0.99 <= fiyat <= high.
+    blocks: önceden hesaplanmış find_order_blocks sonucu (verilmezse hesaplanır).
+    Dönüş: (bullish kayıt veya None, bearish kayıt veya None)
+    """
+    if blocks is None:
+        blocks = find_order_blocks(df)
+    bull, bear = blocks
+
+    last_idx = len(df) - 1
+    lo, hi = max(0, last_idx - lookback), last_idx - MIN_AGE
+
+    bull = bull[(bull['index'] >= lo) & (bull['index'] <= hi)]
+    bear = bear[(bear['index'] >= lo) & (bear['index'] <= hi)]
+
+    bull = bull[(bull['low'] <= current_price) & (current_price <= bull['high'] * 1.01)]
+    bear = bear[(bear['low'] * 0.99 <= current_price) & (current_price <= bear['high'])]
+
+    return (bull[-1] if len(bull) else None), (bear[-1] if len(bear) else None)
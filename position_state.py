@@ -0,0 +1,96 @@
+import threading
+import time
+
+
+class PositionSnapshot:
+    """Belirli bir andaki açık pozisyonların değişmez görüntüsü."""
+
+    def __init__(self, version, timestamp, positions):
+        self.version = version
+        self.timestamp = timestamp
+        self.positions = positions   # symbol -> get_position_risk satırı (sadece positionAmt != 0)
+
+    def get(self, symbol):
+        return self.positions.get(symbol)
+
+    def active(self):
+        return list(self.positions.values())
+
+    def symbols(self):
+        return set(self.positions)
+
+
+class PositionBook:
+    """
+    Tek paylaşımlı pozisyon durumu.
+    get_position_risk() tik başına bir kez çağrılır (refresh); tüm okuyucular aynı
+    versiyonlu snapshot'ı görür. Tarayıcı thread'lerinin aynı sembolde çift pozisyon
+    açmaması için açılış öncesi atomik rezervasyon (try_reserve) sağlar.
+
+    Snapshot max_age saniyeden eskiyse (hiç yenilenmedi veya monitor döngüsü takıldı)
+    kitap kapalı tarafta kalır: has_open True, try_reserve False döner.
+    """
+
+    def __init__(self, client, reservation_ttl=60.0, max_age=30.0):
+        self.client = client
+        self.reservation_ttl = reservation_ttl
+        self.max_age = max_age
+
+        self._lock = threading.Lock()
+        self._snapshot = PositionSnapshot(0, 0.0, {})
+        self._pending = {}   # symbol -> rezervasyon zamanı (emir gönderildi, snapshot'ta henüz yok)
+
+    def refresh(self):
+        """Pozisyonları borsadan çeker ve yeni snapshot yayınlar."""
+        positions = self.client.get_position_risk()
+        active = {p['symbol']: p for p in positions if float(p.get('positionAmt', 0)) != 0}
+
+        with self._lock:
+            self._snapshot = PositionSnapshot(self._snapshot.version + 1, time.time(), active)
+            # Snapshot'ta görünen veya süresi dolan rezervasyonları düş
+            now = time.time()
+            for symbol, ts in list(self._pending.items()):
+                if symbol in active or now - ts > self.reservation_ttl:
+                    del self._pending[symbol]
+            return self._snapshot
+
+    def snapshot(self):
+        with self._lock:
+            return self._snapshot
+
+    def get(self, symbol):
+        return self.snapshot().get(symbol)
+
+    def _stale_locked(self):
+        return time.time() - self._snapshot.timestamp > self.max_age
+
+    def is_stale(self):
+        """Snapshot max_age'den eski mi (hiç yenilenmediyse de True)."""
+        with self._lock:
+            return self._stale_locked()
+
+    def has_open(self, symbol):
+        """Açık pozisyon veya bekleyen açılış var mı; snapshot eskiyse bilinemez → True."""
+        with self._lock:
+            return self._stale_locked() or symbol in self._snapshot.positions or symbol in self._pending
+
+    def try_reserve(self, symbol):
+        """Sembolde pozisyon/rezervasyon yoksa atomik olarak rezerve eder (snapshot eskiyse reddeder)."""
+        with self._lock:
+            if self._stale_locked() or symbol in self._snapshot.positions or symbol in self._pending:
+                return False
+            self._pending[symbol] = time.time()
+            return True
+
+    def release(self, symbol):
+        """Açılış başarısızsa rezervasyonu bırakır."""
+        with self._lock:
+            self._pending.pop(symbol, None)
+
+    def mark_closed(self, symbol):
+        """Kapatma emri sonrası snapshot'tan düşer (bir sonraki refresh'e kadar)."""
+        with self._lock:
+            if symbol in self._snapshot.positions:
+                positions = dict(self._snapshot.positions)
+                positions.pop(symbol)
+                self._snapshot = PositionSnapshot(self._snapshot.version + 1, time.time(), positions)
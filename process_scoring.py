@@ -0,0 +1,127 @@
+"""
+Süreç havuzunda (multiprocessing) puanlama.
+
+Puanlama CPU ağırlıklı olduğu için thread havuzunda GIL yüzünden tek çekirdeğe sıkışır.
+ProcessScorer mum dizisini (semboller × mumlar × alanlar) tek bir SharedMemory bloğuna yazar;
+worker'lar bloğa kopyasız bağlanıp kendi aralıklarını puanlar ve sadece sinyal veren sembollerin
+(indeks, sinyal, puan, sebep) özetlerini döndürür. Emirler ana süreçte kalır.
+"""
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from ohlcv_store import FIELDS, FRAME_COLUMNS
+
+_ENGINE = None   # Worker başına tek SignalEngine
+
+
+def _init_worker():
+    global _ENGINE
+    from strategies.score import SignalEngine
+    _ENGINE = SignalEngine(log_func=lambda *args, **kwargs: None)
+
+
+def _score_chunk(shm_name, shape, start, stop, settings, weights=None):
+    """
+    Worker: [start, stop) sembollerini puanlar. Dönüş: [(indeks, sinyal, puan, sebep), ...] (HOLD hariç)
+    settings/weights her görevde ana süreçteki motordan gelir (eşik settings['score_thresh']'te).
+    """
+    # spawn worker'ları ana sürecin resource_tracker'ını paylaşır; unlink ana süreçte yapılır
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        data = np.ndarray(shape, dtype=np.float64, buffer=shm.buf)
+        _ENGINE.settings = settings
+        if weights is not None:
+            _ENGINE.weights = weights
+        out = []
+        for i in range(start, stop):
+            block = data[i]
+            df = pd.DataFrame({FRAME_COLUMNS[name]: block[:, j] for j, name in enumerate(FIELDS)}, copy=True)
+            signal, score, reason = _ENGINE.get_composite_score(df)
+            if signal != "HOLD":
+                out.append((i, signal, score, reason))
+        del data, block
+        return out
+    finally:
+        shm.close()
+
+
+class ProcessScorer:
+    def __init__(self, workers=None, log_func=None):
+        self.workers = workers or max(1, (os.cpu_count() or 2) - 1)
+        self.log = log_func if log_func else print
+        self._pool = None
+
+    def start(self):
+        if self._pool is None:
+            # spawn: ana süreçteki thread'ler (GUI, websocket) fork'la kopyalanmasın
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_init_worker
+            )
+        return self
+
+    def stop(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def score(self, symbols, data, settings, weights=None, threshold=None):
+        """
+        symbols (S,), data (S × mumlar × alanlar, FIELDS sırası).
+        weights/threshold: ana süreçteki SignalEngine'in ağırlıkları ve eşiği; verilmezse worker'ın
+        varsayılan ağırlıkları kullanılır (seri yol ile farklı sonuç verebilir).
+        Dönüş: [(sembol, sinyal, puan, sebep), ...] sadece LONG/SHORT olanlar.
+        """
+        if len(symbols) == 0:
+            return []
+
+        data = np.ascontiguousarray(data, dtype=np.float64)
+        settings = dict(settings or {})
+        if threshold is not None:
+            settings['score_thresh'] = threshold
+        weights = dict(weights) if weights is not None else None
+
+        # Bir worker çökerse (OOM, segfault) havuz kalıcı olarak bozulur: yeniden kurup bir kez daha dene
+        for attempt in range(2):
+            try:
+                return self._score_once(symbols, data, settings, weights)
+            except BrokenProcessPool as e:
+                self.log(f"⚠️ Süreç havuzu çöktü ({e}) → havuz yeniden kuruluyor")
+                self.stop()
+        self.log("❌ Süreç havuzu yeniden kurulduktan sonra da çöktü, bu tur puanlama atlandı")
+        return []
+
+    def _score_once(self, symbols, data, settings, weights):
+        """Tek deneme: yeni SharedMemory bloğu + parçalar. Havuz bozulursa BrokenProcessPool yükseltir."""
+        self.start()
+        shm = shared_memory.SharedMemory(create=True, size=data.nbytes)
+        try:
+            np.ndarray(data.shape, dtype=np.float64, buffer=shm.buf)[:] = data
+
+            # Her worker'a birkaç parça (yük dengesi için)
+            bounds = np.linspace(0, len(symbols), min(len(symbols), self.workers * 4) + 1).astype(int)
+            futures = [
+                self._pool.submit(_score_chunk, shm.name, data.shape, int(lo), int(hi), settings, weights)
+                for lo, hi in zip(bounds[:-1], bounds[1:]) if hi > lo
+            ]
+
+            results = []
+            for future in futures:
+                try:
+                    for i, signal, score, reason in future.result():
+                        results.append((symbols[i], signal, score, reason))
+                except BrokenProcessPool:
+                    raise
+                except Exception as e:
+                    self.log(f"❌ Süreç havuzu puanlama hatası: {e}")
+            return results
+        finally:
+            shm.close()
+            shm.unlink()
@@ -0,0 +1,230 @@
+import heapq
+import itertools
+import random
+import threading
+import time
+
+from binance.error import ClientError, ServerError
+from requests.exceptions import ConnectionError as RequestsConnectionError, Timeout
+
+WEIGHT_LIMIT_1M = 2400   # USDⓈ-M Futures IP başına dakikalık ağırlık limiti
+
+# Öncelik sınıfları (küçük olan önce çalışır)
+PRIORITY_ORDER = 0      # Emir / iptal
+PRIORITY_ACCOUNT = 1    # Pozisyon / hesap
+PRIORITY_MARKET = 2     # Mum, ticker, exchange info
+
+_ORDER_METHODS = {
+    'new_order', 'cancel_order', 'cancel_open_orders', 'cancel_batch_order',
+    'futures_cancel_open_orders', 'new_batch_order', 'change_leverage', 'change_margin_type',
+}
+_ACCOUNT_METHODS = {
+    'get_position_risk', 'account', 'balance', 'get_account_trades', 'get_orders', 'get_all_orders',
+}
+
+
+def method_priority(name):
+    if name in _ORDER_METHODS:
+        return PRIORITY_ORDER
+    if name in _ACCOUNT_METHODS:
+        return PRIORITY_ACCOUNT
+    return PRIORITY_MARKET
+
+
+def estimate_weight(name, args, kwargs):
+    """Binance dokümanındaki ağırlık tablosuna göre istek maliyeti tahmini."""
+    if name in ('klines', 'continuous_klines', 'mark_price_klines', 'index_price_klines'):
+        limit = kwargs.get('limit', 500)
+        if limit < 100:
+            return 1
+        if limit < 500:
+            return 2
+        if limit <= 1000:
+            return 5
+        return 10
+    has_symbol = bool(args) or 'symbol' in kwargs
+    if name == 'ticker_24hr_price_change':
+        return 1 if has_symbol else 40
+    if name == 'ticker_price':
+        return 1 if has_symbol else 2
+    if name in ('get_position_risk', 'account', 'get_account_trades', 'balance'):
+        return 5
+    return 1
+
+
+class RequestScheduler:
+    """
+    UMFutures istemcisini saran merkezi istek zamanlayıcısı.
+
+    - Kullanılan ağırlığı yanıt başlıklarından (x-mbx-used-weight-1m) takip eder,
+      dakikalık bütçeyi aşacak istekleri dakika dönene kadar bekletir.
+    - Emir/iptal çağrıları, bekleyen mum isteklerinin önüne geçer.
+    - 429/418 ve sunucu hatalarında jitter'lı üstel geri çekilme ile tekrar dener.
+      Emir/iptal çağrıları sadece 429/418'de (Retry-After'a uyarak) tekrarlanır; 5xx/zaman aşımında
+      emrin akıbeti bilinmediği için hata yukarı iletilir.
+
+    Kullanım: client = RequestScheduler(UMFutures(...)); client.klines(...)  (aynı API)
+    """
+
+    def __init__(self, client, weight_limit=WEIGHT_LIMIT_1M, safety=0.85,
+                 max_concurrency=20, max_retries=5, log_func=None):
+        self.client = client
+        self.weight_limit = weight_limit
+        self.safety = safety
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.log = log_func if log_func else print
+
+        # Yanıtlarda limit kullanım başlıklarını iste
+        try:
+            self.client.show_limit_usage = True
+        except Exception:
+            pass
+
+        self._cond = threading.Condition()
+        self._waiters = []            # (priority, seq) heap
+        self._seq = itertools.count()
+        self._in_flight = 0
+        self._in_flight_weight = 0
+        self._window = int(time.time() // 60)
+        self._used_weight = 0         # Bu dakika sunucunun bildirdiği kullanım
+        self._blocked_until = 0.0     # 429/418 sonrası bekleme
+
+    # --- Vekil erişim ---
+
+    def __getattr__(self, name):
+        if name == 'client':
+            raise AttributeError(name)
+        attr = getattr(self.client, name)
+        if not callable(attr):
+            return attr
+
+        def _call(*args, **kwargs):
+            return self.call(name, attr, *args, **kwargs)
+        return _call
+
+    # --- Bütçe ---
+
+    def _roll_window(self):
+        minute = int(time.time() // 60)
+        if minute != self._window:
+            self._window = minute
+            self._used_weight = 0
+
+    def _budget(self):
+        return int(self.weight_limit * self.safety)
+
+    def _can_run(self, entry, weight):
+        if not self._waiters or self._waiters[0] != entry:
+            return False   # Önde daha öncelikli (veya daha eski) bir istek var
+        if time.time() < self._blocked_until:
+            return False
+        if self._in_flight >= self.max_concurrency:
+            return False
+        return self._used_weight + self._in_flight_weight + weight <= self._budget()
+
+    def _acquire(self, priority, weight):
+        entry = (priority, next(self._seq))
+        with self._cond:
+            heapq.heappush(self._waiters, entry)
+            try:
+                while True:
+                    self._roll_window()
+                    if self._can_run(entry, weight):
+                        break
+                    # Dakika dönümüne veya blok sonuna kadar (ya da bir release'e kadar) bekle
+                    now = time.time()
+                    wake = min((self._window + 1) * 60, max(self._blocked_until, now + 0.05)) - now
+                    self._cond.wait(max(0.05, min(wake, 1.0)))
+            finally:
+                self._remove_waiter(entry)
+                self._cond.notify_all()
+            self._in_flight += 1
+            self._in_flight_weight += weight
+
+    def _remove_waiter(self, entry):
+        if self._waiters and self._waiters[0] == entry:
+            heapq.heappop(self._waiters)
+        else:
+            self._waiters.remove(entry)
+            heapq.heapify(self._waiters)
+
+    def _release(self, weight):
+        with self._cond:
+            self._in_flight -= 1
+            self._in_flight_weight -= weight
+            self._cond.notify_all()
+
+    def _record_usage(self, response, weight):
+        """show_limit_usage yanıtını açar ve kullanılan ağırlığı kaydeder."""
+        if isinstance(response, dict) and 'limit_usage' in response and 'data' in response:
+            usage = response.get('limit_usage') or {}
+            used = None
+            for key, value in usage.items():
+                if key.lower() == 'x-mbx-used-weight-1m':
+                    used = int(value)
+            with self._cond:
+                self._roll_window()
+                if used is not None:
+                    self._used_weight = max(self._used_weight, used)
+                else:
+                    self._used_weight += weight
+            return response['data']
+
+        with self._cond:
+            self._roll_window()
+            self._used_weight += weight
+        return response
+
+    def _backoff(self, attempt, retry_after=None):
+        delay = float(retry_after) if retry_after else min(30.0, 0.5 * (2 ** attempt))
+        delay += random.uniform(0, delay * 0.3)   # jitter
+        with self._cond:
+            self._blocked_until = max(self._blocked_until, time.time() + delay)
+            self._cond.notify_all()
+        return delay
+
+    # --- Çağrı ---
+
+    def call(self, name, func, *args, **kwargs):
+        priority = method_priority(name)
+        weight = estimate_weight(name, args, kwargs)
+
+        for attempt in range(self.max_retries + 1):
+            self._acquire(priority, weight)
+            try:
+                response = func(*args, **kwargs)
+            except ClientError as e:
+                if e.status_code in (429, 418) and attempt < self.max_retries:
+                    retry_after = (getattr(e, 'header', None) or {}).get('Retry-After')
+                    delay = self._backoff(attempt, retry_after)
+                    self.log(f"⏳ Rate limit ({e.status_code}) → {delay:.1f} sn bekleniyor ({name})")
+                    continue
+                raise
+            except (ServerError, RequestsConnectionError, Timeout):
+                # Emir çağrısında 5xx/zaman aşımı sonucu bilinmez (emir borsaya ulaşmış olabilir):
+                # körlemesine tekrar göndermek çift pozisyon açabilir → çağırana bırak
+                if priority != PRIORITY_ORDER and attempt < self.max_retries:
+                    self._backoff(attempt)
+                    continue
+                raise
+            finally:
+                self._release(weight)
+            return self._record_usage(response, weight)
+
+    # --- Durum ---
+
+    def usage(self):
+        """(bu dakika kullanılan ağırlık, limit)"""
+        with self._cond:
+            self._roll_window()
+            return self._used_weight, self.weight_limit
+
+    def recommended_workers(self, per_call_weight=2, floor=2):
+        """
+        Kalan dakikalık bütçeye göre güvenli thread sayısı önerisi
+        (her worker'ın pencere başına ~10 çağrı yapacağı varsayımıyla).
+        """
+        used, _ = self.usage()
+        remaining = max(0, self._budget() - used)
+        return max(floor, min(self.max_concurrency, remaining // max(1, per_call_weight * 10)))
@@ -0,0 +1,127 @@
+import pandas as pd
+import numpy as np
+import ta.volatility
+
+def calculate_atr(df, period=14):
+    """
+    Average True Range (ATR) hesaplar - GÜVENLİ VERSİYON
+    """
+    try:
+        # Veri yeterliliği kontrolü
+        if len(df) < period + 1:
+            current_price = df['Close'].iloc[-1]
+            return current_price * 0.01  # Fallback: fiyatın %1'i
+            
+        atr_indicator = ta.volatility.AverageTrueRange(
+            high=df['High'], low=df['Low'], close=df['Close'], window=period
+        )
+        atr_series = atr_indicator.average_true_range()
+        
+        atr_value = atr_series.iloc[-1] if not atr_series.empty else 0.0
+        
+        # ATR 0 veya NaN ise alternatif hesapla
+        if atr_value == 0 or pd.isna(atr_value):
+            current_price = df['Close'].iloc[-1]
+            atr_value = current_price * 0.01
+            
+        return atr_value
+    except Exception as e:
+        # Hata durumunda fiyatın %1'ini döndür
+        current_price = df['Close'].iloc[-1]
+        return current_price * 0.01
+
+def calculate_dynamic_stops(df, entry_price, direction, sl_multiplier=2.0, tp_multiplier=3.5):
+    atr_value = calculate_atr(df)
+    
+    min_atr = entry_price * 0.005  # %0.5 minimum
+    if atr_value < min_atr:
+        atr_value = min_atr
+    # YENİ: Volatiliteye göre dinamik SL multiplier
+    volatility = df['Close'].pct_change().std() * 100  # Yüzdelik volatilite
+    dynamic_sl_multiplier = max(1.5, min(3.0, 2.0 / (volatility + 0.1)))
+    
+    # TP multiplier sabit kalabilir veya dinamik yapılabilir
+    dynamic_tp_multiplier = tp_multiplier  # Sabit tutuyoruz
+    
+    if atr_value == 0:
+        atr_value = entry_price * 0.01
+
+    min_stop_dist = entry_price * 0.005 
+    stop_distance = max(atr_value * dynamic_sl_multiplier, min_stop_dist)  # DİNAMİK MULTIPLIER
+    
+    stop_loss = 0.0
+    take_profit = 0.0
+
+    if direction == "LONG":
+        stop_loss = entry_price - stop_distance
+        take_profit = entry_price + (atr_value * dynamic_tp_multiplier)  # SABİT MULTIPLIER
+    elif direction == "SHORT":
+        stop_loss = entry_price + stop_distance
+        take_profit = entry_price - (atr_value * dynamic_tp_multiplier)
+        
+    return stop_loss, take_profit, atr_value
+
+def get_trailing_stop_price(current_price, current_stop_loss, direction, atr_value):
+    """
+    İz Süren Stop (Trailing Stop) Hesaplayıcısı.
+    Pozisyon kardaysa stop'u karı kilitleyecek şekilde ilerletir.
+    
+    Kural: Fiyatın ATR * 1.5 kadar gerisinden stop takip eder.
+    """
+    trail_distance = atr_value * 1.5
+    
+    new_stop_loss = current_stop_loss
+    
+    if direction == "LONG":
+        # Fiyat yükseldikçe stopu yukarı çek (Asla aşağı indirme!)
+        potential_new_stop = current_price - trail_distance
+        if potential_new_stop > current_stop_loss:
+            new_stop_loss = potential_new_stop
+            
+    elif direction == "SHORT":
+        # Fiyat düştükçe stopu aşağı it (Asla yukarı çekme!)
+        potential_new_stop = current_price + trail_distance
+        if potential_new_stop < current_stop_loss:
+            new_stop_loss = potential_new_stop
+            
+    return new_stop_loss
+
+def calc_chandelier_exit(df, direction, atr, period=22, multiplier=3):
+    """Chandelier Exit seviyesini hesaplar"""
+    if len(df) < period:
+        return None
+
+    highest_high = df['High'].rolling(period).max().iloc[-1]
+    lowest_low = df['Low'].rolling(period).min().iloc[-1]
+
+    if direction == "LONG":
+        return highest_high - atr * multiplier
+    else:
+        return lowest_low + atr * multiplier
+    
+
+def calc_swing_exit(df, direction, lookback=5):
+    """Swing high/low kırılmasına göre çıkış sinyali üretir"""
+    if len(df) < lookback + 3:
+        return None
+
+    swing_high = df['High'].rolling(lookback).max().iloc[-2]
+    swing_low = df['Low'].rolling(lookback).min().iloc[-2]
+
+    if direction == "LONG":
+        return swing_low
+    else:
+        return swing_high
+
+def calc_msb_exit(df, direction, lookback=20):
+    """Market Structure kırılımına göre çıkış seviyesi"""
+    if len(df) < lookback + 5:
+        return None
+
+    last_high = df['High'].rolling(lookback).max().iloc[-2]
+    last_low = df['Low'].rolling(lookback).min().iloc[-2]
+
+    if direction == "LONG":
+        return last_low   # fiyat bunun altına inerse MSB exit
+    else:
+        return last_high  # fiyat bunun üstüne çıkarsa MSB exit
@@ -3,17 +3,25 @@ import ta.momentum
 import ta.volatility
 import ta.trend
 import numpy as np
+import threading
+import time
 
 # Kendi modüllerimizi dahil ediyoruz
-from strategies.fvg import detect_fvg, check_fvg_signal, detect_fvg_fill
-from strategies.structure import detect_structure, check_trend
+from strategies.fvg import check_fvg_signal
+from strategies.order_blocks import latest_order_blocks
+from strategies.features import FeatureContext
+from strategies.batch_score import score_batch
+from strategies.backtest import backtest_signals, WINDOW
+from ohlcv_store import OHLCVStore
 
 
 class SignalEngine:
-    def __init__(self, settings=None, log_func=None):
+    def __init__(self, settings=None, log_func=None, indicator_book=None, result_cache=None):
         # Log fonksiyonu varsa onu kullan, yoksa boş print yap
         self.settings = settings or {}   # GUI tarafından geçilecek
         self.log = log_func if log_func else print
+        self.indicators = indicator_book  # Akışlı RSI/BB/ATR durumu (yoksa her seferinde ta ile)
+        self.result_cache = result_cache  # Kapanmış mum kimliğine göre önbellek (SignalCache, opsiyonel)
         
         # Puan Ağırlıkları (İstediğin gibi değiştirebilirsin)
         self.weights = {
@@ -30,6 +38,58 @@ class SignalEngine:
             'ml': 2,               # Makine öğrenmesi
             'threshold':20     # Minimum puan (arayüzden)
         }
+        
+        # Modül kayıt defteri: (isim, sebep etiketi, fonksiyon, göreli maliyet, max long/short puanı)
+        # Yeni modül eklemek için register_module yeter; çalışma sırası maliyete göredir.
+        self.modules = []
+        self._stats_lock = threading.Lock()
+        self.module_stats = {}      # isim -> {'calls': n, 'time': toplam sn}
+        self.short_circuits = 0     # Erken HOLD ile kesilen puanlama sayısı
+        
+        w = lambda key, extra=0: (lambda weights: weights[key] + extra)
+        none = lambda weights: 0
+        self.register_module('structure', "Yapı", self._module_structure, cost=5, max_long=w('structure', 1), max_short=w('structure', 1))
+        self.register_module('fvg', "FVG", self._module_fvg, cost=3, max_long=w('fvg'), max_short=w('fvg'))
+        self.register_module('rsi_boll', "İndikatör", self._module_rsi_bollinger, cost=4, max_long=w('rsi_boll'), max_short=w('rsi_boll'))
+        self.register_module('liquidity', "Likidite", self._module_liquidity, cost=2, max_long=w('liquidity', 2), max_short=w('liquidity', 2))
+        self.register_module('volume_profile', "Hacim", self._module_volume_profile, cost=4, max_long=w('volume_profile'), max_short=w('volume_profile'))
+        self.register_module('order_block', "OB", self._module_order_blocks, cost=3, max_long=w('order_block'), max_short=w('order_block'))
+        self.register_module('pd_arrays', "PD", self._module_pd_arrays, cost=1, max_long=w('pd_arrays'), max_short=w('pd_arrays'))
+        self.register_module('ote', "OTE", self._module_ote, cost=3, max_long=w('ote'), max_short=none)
+        self.register_module('killzones', "Zaman", self._module_killzones, cost=0, max_long=w('killzones'), max_short=w('killzones'))
+
+    def register_module(self, name, label, func, cost, max_long, max_short):
+        """
+        Puanlama modülü ekler. func(ctx) → (long, short, sebep).
+        max_long/max_short: weights → modülün verebileceği en yüksek puan (erken HOLD kararı için).
+        """
+        self.modules.append({
+            'name': name, 'label': label, 'func': func, 'cost': cost,
+            'max_long': max_long, 'max_short': max_short,
+        })
+        self._ordered = sorted(self.modules, key=lambda m: m['cost'])
+
+    def _record_module(self, name, elapsed):
+        with self._stats_lock:
+            stat = self.module_stats.setdefault(name, {'calls': 0, 'time': 0.0})
+            stat['calls'] += 1
+            stat['time'] += elapsed
+
+    def _record_short_circuit(self):
+        with self._stats_lock:
+            self.short_circuits += 1
+
+    def format_module_stats(self):
+        """Modül başına çağrı sayısı / toplam süre özeti (log için)."""
+        with self._stats_lock:
+            parts = [
+                f"{name}: {stat['calls']}x {stat['time'] * 1000:.0f} ms"
+                for name, stat in sorted(self.module_stats.items(), key=lambda kv: -kv[1]['time'])
+            ]
+            text = f"⏱️ Modüller ({self.short_circuits} erken HOLD) | " + ", ".join(parts)
+        if self.result_cache is not None:
+            text += " | " + self.result_cache.format_stats()
+        return text
     @property
     def threshold(self):
         # settings içinde yoksa weights'den al
@@ -48,7 +108,7 @@ class SignalEngine:
 
         self.settings = new_settings
     def calculate_indicators(self, df):
-        """Yardımcı indikatörleri hesapla (RSI, Bollinger)"""
+        """Yardımcı indikatörleri hesapla (RSI, Bollinger) - yüksek TF frame'leri için"""
         df['rsi'] = ta.momentum.rsi(df['Close'], window=14)
         bb = ta.volatility.BollingerBands(df['Close'], window=20, window_dev=2)
         df['bb_upper'] = bb.bollinger_hband()
@@ -59,26 +119,19 @@ class SignalEngine:
         """Yüksek timeframe verisi çeker"""
         try:
             klines = client.klines(symbol, interval, limit=limit)
-            df = pd.DataFrame(klines, columns=[
-                'Open time', 'Open', 'High', 'Low', 'Close', 'Volume', 
-                'Close time', 'Quote asset volume', 'Number of trades', 
-                'Taker buy base asset volume', 'Taker buy quote asset volume', 'Ignore'
-            ])
-            cols = ['Open', 'High', 'Low', 'Close', 'Volume']
-            df[cols] = df[cols].astype(float)
+            df = OHLCVStore.from_klines(klines).to_frame()
             return self.calculate_indicators(df)
         except Exception as e:
             self.log(f"Yüksek TF veri hatası ({symbol}): {e}")
             return None
 
     # --- MODÜL 1: Trend Analizi ---
-    def _module_structure(self, df):
+    def _module_structure(self, ctx):
         l_score, s_score = 0, 0
         reason = ""
         
         # Lookback 5 (Senin istediğin gibi)
-        df_struct = detect_structure(df, lookback=5)
-        trend, is_bos = check_trend(df_struct)
+        trend, is_bos = ctx.trend(lookback=5)
         
         if trend == "BULLISH":
             l_score += self.weights['structure']
@@ -99,16 +152,14 @@ class SignalEngine:
         return l_score, s_score, reason
 
     # --- MODÜL 2: FVG (Price Action) ---
-    def _module_fvg(self, df):
+    def _module_fvg(self, ctx):
         l_score, s_score = 0, 0
         reason = ""
         
-        fvg_bull, fvg_bear = detect_fvg(df)
-        fvg_bull = detect_fvg_fill(df, fvg_bull)
-        fvg_bear = detect_fvg_fill(df, fvg_bear)
+        fvg_bull, fvg_bear = ctx.fvgs()
         
         # Sinyal kontrolü
-        raw_signal = check_fvg_signal(df, fvg_bull, fvg_bear)
+        raw_signal = check_fvg_signal(ctx.df, fvg_bull, fvg_bear)
         
         if raw_signal > 0:
             l_score += self.weights['fvg']
@@ -120,14 +171,15 @@ class SignalEngine:
         return l_score, s_score, reason
 
     # --- MODÜL 3: RSI & Bollinger (Filtre) ---
-    def _module_rsi_bollinger(self, df):
+    def _module_rsi_bollinger(self, ctx):
         l_score, s_score = 0, 0
         reason = ""
         
-        current_price = df['Close'].iloc[-1]
-        rsi = df['rsi'].iloc[-1]
-        bb_lower = df['bb_lower'].iloc[-1]
-        bb_upper = df['bb_upper'].iloc[-1]
+        ind = ctx.indicators()
+        current_price = ctx.close
+        rsi = ind['rsi']
+        bb_lower = ind['bb_lower']
+        bb_upper = ind['bb_upper']
         
         # AND Mantığı: Hem RSI düşük olacak HEM Fiyat Bollinger altında olacak
         if rsi < 35 and current_price < bb_lower:
@@ -142,39 +194,33 @@ class SignalEngine:
         return l_score, s_score, reason
     
     # --- YENİ MODÜL 4: Likidite Analizi ---
-    def _module_liquidity(self, df, window=20):
+    def _module_liquidity(self, ctx, window=20):
         l_score, s_score = 0, 0
         reason = ""
         
         try:
-            # 1. Alt/Üst wick oranı analizi
-            df['body'] = abs(df['Close'] - df['Open'])
-            df['range'] = df['High'] - df['Low']
-            df['lower_wick_ratio'] = (df['Open'] - df['Low']) / (df['range'] + 1e-8)
-            df['upper_wick_ratio'] = (df['High'] - df['Open']) / (df['range'] + 1e-8)
+            # 1. Alt/Üst wick oranı analizi (son mum; girdi frame'e kolon eklenmez)
+            current_lower_wick, current_upper_wick = ctx.wick_ratios()
             
             # Son 5 mumda strong lower wick + hacim spike
-            current_lower_wick = df['lower_wick_ratio'].iloc[-1]
-            current_volume = df['Volume'].iloc[-1]
-            avg_volume = df['Volume'].tail(5).mean()
+            current_volume = ctx.column('Volume')[-1]
+            avg_volume = ctx.tail_mean('Volume', 5)
             
             if current_lower_wick > 0.6 and current_volume > avg_volume * 1.8:
                 l_score += self.weights['liquidity']
                 reason += "Lower Wick Hunt | "
             
             # Son 5 mumda strong upper wick + hacim spike  
-            current_upper_wick = df['upper_wick_ratio'].iloc[-1]
             if current_upper_wick > 0.6 and current_volume > avg_volume * 1.8:
                 s_score += self.weights['liquidity']
                 reason += "Upper Wick Hunt | "
                 
             # 2. Eşit düşükler/tepelere yakınlık (likidite bölgeleri)
-            current_low = df['Low'].iloc[-1]
-            current_high = df['High'].iloc[-1]
+            current_low = ctx.column('Low')[-1]
+            current_high = ctx.column('High')[-1]
             
             # Son 50 mumda eşit düşükler
-            recent_lows = df['Low'].tail(50)
-            equal_lows = recent_lows[abs(recent_lows - recent_lows.shift(1)) < recent_lows * 0.001]
+            equal_lows = ctx.equal_levels('Low', 50)
             if len(equal_lows) >= 2:
                 liquidity_zone = equal_lows.min()
                 if abs(current_low - liquidity_zone) / liquidity_zone < 0.002:  # %0.2 yakınsa
@@ -183,8 +229,7 @@ class SignalEngine:
                 return l_score, s_score, reason
             
             # Son 50 mumda eşit yüksekler
-            recent_highs = df['High'].tail(50)
-            equal_highs = recent_highs[abs(recent_highs - recent_highs.shift(1)) < recent_highs * 0.001]
+            equal_highs = ctx.equal_levels('High', 50)
             if len(equal_highs) >= 2:
                 liquidity_zone = equal_highs.max()
                 if abs(current_high - liquidity_zone) / liquidity_zone < 0.002:
@@ -195,38 +240,24 @@ class SignalEngine:
                     
         except Exception as e:
             self.log(f"Likidite modülü hatası: {e}")
+        
+        # Eşit dip/tepe bulunmazsa (veya hata) da 3 değer döndür
+        return l_score, s_score, reason
     
     # --- YENİ MODÜL 5: Hacim Profili ve POC ---
-    def _module_volume_profile(self, df, period=50):
+    def _module_volume_profile(self, ctx, period=50):
         l_score, s_score = 0, 0
         reason = ""
         
         try:
-            if len(df) < period:
+            if len(ctx) < period:
                 return l_score, s_score, "Yetersiz veri"
                 
-            # Basit hacim profili hesaplama
-            recent_df = df.tail(period)
-            price_min, price_max = recent_df['Low'].min(), recent_df['High'].max()
-            
-            # 20 fiyat seviyesine böl
-            bins = np.linspace(price_min, price_max, 20)
-            volume_profile = np.zeros(len(bins)-1)
-            
-            for i in range(len(recent_df)):
-                close_price = recent_df['Close'].iloc[i]
-                volume_val = recent_df['Volume'].iloc[i]
-                
-                # Hangi bine denk geliyor
-                bin_idx = np.digitize(close_price, bins) - 1
-                if 0 <= bin_idx < len(volume_profile):
-                    volume_profile[bin_idx] += volume_val
+            # Hacim profili: her mumun hacmi High–Low aralığına dağıtılır
+            profile = ctx.volume_profile(period, bins=int(self.settings.get('vp_bins', 20)))
+            poc_price = profile['poc']
             
-            # POC (Point of Control) bul
-            poc_idx = np.argmax(volume_profile)
-            poc_price = bins[poc_idx]
-            
-            current_price = df['Close'].iloc[-1]
+            current_price = ctx.close
             
             # POC'a göre bias
             if current_price < poc_price * 0.99:  # POC'un %1 altında
@@ -242,43 +273,24 @@ class SignalEngine:
         return l_score, s_score, reason
 
     # --- YENİ MODÜL 6: Order Block Tespiti ---
-    def _module_order_blocks(self, df, lookback=50):
+    def _module_order_blocks(self, ctx, lookback=50):
         l_score, s_score = 0, 0
         reason = ""
         
         try:
-            current_idx = len(df) - 1
-            current_price = df['Close'].iloc[-1]
-            
-            # Son bearish mumdan önceki güçlü bullish mum (Bullish OB)
-            for i in range(current_idx - 2, max(0, current_idx - lookback), -1):
-                if (df['Close'].iloc[i-2] < df['Open'].iloc[i-2] and  # Önceki mum bearish
-                    df['Close'].iloc[i-1] > df['Open'].iloc[i-1] and  # Şimdiki mum bullish
-                    (df['Close'].iloc[i-1] - df['Open'].iloc[i-1]) > 2 * abs(df['Open'].iloc[i-2] - df['Close'].iloc[i-2])):
-                    
-                    ob_low = df['Low'].iloc[i-1]
-                    ob_high = df['High'].iloc[i-1]
-                    
-                    # Fiyat bu bölgeye yakınsa
-                    if ob_low <= current_price <= ob_high * 1.01:
-                        l_score += self.weights['order_block']
-                        reason += "Bullish OB Zone | "
-                        break
-            
-            # Son bullish mumdan önceki güçlü bearish mum (Bearish OB)  
-            for i in range(current_idx - 2, max(0, current_idx - lookback), -1):
-                if (df['Close'].iloc[i-2] > df['Open'].iloc[i-2] and  # Önceki mum bullish
-                    df['Close'].iloc[i-1] < df['Open'].iloc[i-1] and  # Şimdiki mum bearish
-                    abs(df['Open'].iloc[i-1] - df['Close'].iloc[i-1]) > 2 * (df['Close'].iloc[i-2] - df['Open'].iloc[i-2])):
-                    
-                    ob_low = df['Low'].iloc[i-1]
-                    ob_high = df['High'].iloc[i-1]
-                    
-                    # Fiyat bu bölgeye yakınsa
-                    if ob_low * 0.99 <= current_price <= ob_high:
-                        s_score += self.weights['order_block']
-                        reason += "Bearish OB Zone | "
-                        break
+            current_price = ctx.close
+            
+            # En yeni (fiyatın bölgesinde olan) bullish / bearish blok; tek vektörel geçiş
+            bull_ob, bear_ob = latest_order_blocks(ctx.df, current_price, lookback=lookback,
+                                                   blocks=ctx.order_blocks())
+            
+            if bull_ob is not None:
+                l_score += self.weights['order_block']
+                reason += "Bullish OB Zone | "
+            
+            if bear_ob is not None:
+                s_score += self.weights['order_block']
+                reason += "Bearish OB Zone | "
                         
         except Exception as e:
             self.log(f"Order block modülü hatası: {e}")
@@ -286,23 +298,23 @@ class SignalEngine:
         return l_score, s_score, reason
 
     # --- YENİ MODÜL 7: PD Arrays (Premium/Discount) ---
-    def _module_pd_arrays(self, df):
+    def _module_pd_arrays(self, ctx):
         l_score, s_score = 0, 0
         reason = ""
         
         try:
-            if len(df) < 20:
+            if len(ctx) < 20:
                 return l_score, s_score, "Yetersiz veri"
             
             # Basit PD Arrays implementasyonu
-            weekly_high = df['High'].tail(100).max()
-            weekly_low = df['Low'].tail(100).min()
+            weekly_high = ctx.tail_max('High', 100)
+            weekly_low = ctx.tail_min('Low', 100)
             equilibrium = (weekly_high + weekly_low) / 2
             
             premium = weekly_high - (weekly_high - equilibrium) * 0.25
             discount = weekly_low + (equilibrium - weekly_low) * 0.25
             
-            current_price = df['Close'].iloc[-1]
+            current_price = ctx.close
             
             if current_price < discount:
                 l_score += self.weights['pd_arrays']
@@ -317,34 +329,33 @@ class SignalEngine:
         return l_score, s_score, reason
 
     # --- YENİ MODÜL 8: OTE (Optimal Trade Entry) Fibonacci ---
-    def _module_ote(self, df, swing_period=30):
+    def _module_ote(self, ctx, swing_period=30):
         l_score, s_score = 0, 0
         reason = ""
         
         try:
-            if len(df) < swing_period + 5:
+            if len(ctx) < swing_period + 5:
                 return l_score, s_score, "Yetersiz veri"
             
             # Son swing high/low bul
-            recent_high = df['High'].tail(swing_period).max()
-            recent_low = df['Low'].tail(swing_period).min()
+            recent_high = ctx.tail_max('High', swing_period)
+            recent_low = ctx.tail_min('Low', swing_period)
             
             fib_618 = recent_high - (recent_high - recent_low) * 0.618
             fib_786 = recent_high - (recent_high - recent_low) * 0.786
             
-            current_price = df['Close'].iloc[-1]
+            current_price = ctx.close
             
             # Fiyat OTE bölgesinde mi (fib 0.618-0.786)
             if fib_786 <= current_price <= fib_618:
-                # FVG ile kombine et (basit versiyon)
-                fvg_bullish, fvg_bearish = detect_fvg(df)
-                fvg_bullish = detect_fvg_fill(df, fvg_bullish)
+                # FVG ile kombine et (basit versiyon) - FVG modülüyle aynı diziler
+                fvg_bullish, fvg_bearish = ctx.fvgs()
                 
-                for fvg in fvg_bullish[-3:]:  # Son 3 FVG'yi kontrol et
-                    if not fvg.get('filled', True) and abs(current_price - fvg['avg_price']) / current_price < 0.005:
-                        l_score += self.weights['ote']
-                        reason += "OTE + FVG | "
-                        break
+                last = fvg_bullish[-3:]  # Son 3 FVG'yi kontrol et
+                near = ~last['filled'] & (np.abs(current_price - last['avg_price']) / current_price < 0.005)
+                if near.any():
+                    l_score += self.weights['ote']
+                    reason += "OTE + FVG | "
                         
         except Exception as e:
             self.log(f"OTE modülü hatası: {e}")
@@ -352,7 +363,7 @@ class SignalEngine:
         return l_score, s_score, reason
 
     # --- YENİ MODÜL 9: Kill Zones (Zaman Bazlı) ---
-    def _module_killzones(self):
+    def _module_killzones(self, ctx=None):
         l_score, s_score = 0, 0
         reason = ""
         
@@ -372,8 +383,35 @@ class SignalEngine:
         return l_score, s_score, reason
 
 
+    # --- TOPLU PUANLAMA (tüm evren tek çağrıda) ---
+    def score_batch(self, data, utc_hour=None):
+        """
+        data: (semboller × mumlar × alanlar) dizisi (ohlcv_store.FIELDS sırası).
+        Dönüş: (sinyaller [batch_score.SIGNAL_*], puanlar, sebep bit maskeleri)
+        Sebep metni için batch_score.decode_reasons kullanılır.
+        """
+        return score_batch(
+            data, self.weights, self.threshold,
+            vp_bins=int(self.settings.get('vp_bins', 20)), utc_hour=utc_hour
+        )
+
+    # --- BACKTEST (tüm geçmiş tek geçişte) ---
+    def backtest(self, df, window=WINDOW, interval='15m'):
+        """
+        df'nin her mumu için walk-forward sinyal serisi (t. mum sadece t'de biten `window` mumu görür).
+        Dönüş: (sinyaller [batch_score.SIGNAL_*], puanlar, sebep bit maskeleri)
+        """
+        return backtest_signals(
+            df, self.weights, self.threshold, window=window,
+            vp_bins=int(self.settings.get('vp_bins', 20)), interval=interval
+        )
+
     # --- ANA PUANLAMA FONKSİYONU ---
-    def get_composite_score(self, df, symbol=None, client=None):
+    def feature_context(self, df, symbol=None, interval='15m'):
+        """Bu (sembol, mum) için paylaşılan özellik bağlamı (generate_signal ile ortak kullanılır)."""
+        return FeatureContext(df, symbol=symbol, interval=interval, indicator_book=self.indicators)
+
+    def get_composite_score(self, df, symbol=None, client=None, ctx=None):
         try:
             if len(df) < 50: return "HOLD", 0, "Yetersiz Veri"
             
@@ -388,92 +426,106 @@ class SignalEngine:
 
 
             
-            df = self.calculate_indicators(df)
-        
-            
-            total_long_score = 0
-            total_short_score = 0
-            
-            # Raporlama için detaylar
-            reasons_log = []
-
-            # --- PARALEL MODÜL ÇAĞRILARI ---
-            # Burası tam istediğin modüler yapı. İleride 4. modülü buraya ekle yeter.
-            
-            # 1. Structure
-            l1, s1, r1 = self._module_structure(df)
-            total_long_score += l1
-            total_short_score += s1
-            if r1: reasons_log.append(f"[Yapı: {r1}]")
-            
-            # 2. FVG
-            l2, s2, r2 = self._module_fvg(df)
-            total_long_score += l2
-            total_short_score += s2
-            if r2: reasons_log.append(f"[FVG: {r2}]")
-            
-            # 3. RSI & Bollinger
-            l3, s3, r3 = self._module_rsi_bollinger(df)
-            total_long_score += l3
-            total_short_score += s3
-            if r3: reasons_log.append(f"[İndikatör: {r3}]")
-
-            # YENİ MODÜLLER
-            l4, s4, r4 = self._module_liquidity(df)
-            total_long_score += l4
-            total_short_score += s4
-            if r4: reasons_log.append(f"[Likidite: {r4}]")
-
-            l5, s5, r5 = self._module_volume_profile(df)
-            total_long_score += l5
-            total_short_score += s5
-            if r5: reasons_log.append(f"[Hacim: {r5}]")
-
-            l6, s6, r6 = self._module_order_blocks(df)
-            total_long_score += l6
-            total_short_score += s6
-            if r6: reasons_log.append(f"[OB: {r6}]")
-
-            l7, s7, r7 = self._module_pd_arrays(df)
-            total_long_score += l7
-            total_short_score += s7
-            if r7: reasons_log.append(f"[PD: {r7}]")
-
-            l8, s8, r8 = self._module_ote(df)
-            total_long_score += l8
-            total_short_score += s8
-            if r8: reasons_log.append(f"[OTE: {r8}]")
-
-            l9, s9, r9 = self._module_killzones()
-            total_long_score += l9
-            total_short_score += s9
-            if r9: reasons_log.append(f"[Zaman: {r9}]")
-            
-            # --- KARAR ANI ---
-            threshold = self.threshold
-            final_signal = "HOLD"
-            final_reason = " | ".join(reasons_log)
-            
-            # Sadece bir taraf eşiği geçerse sinyal ver
-            # Eğer ikisi de yüksekse (kararsızlık) HOLD kalır veya puanı çok yüksek olanı seçeriz.
-            if total_long_score >= threshold and total_long_score > total_short_score:
-                final_signal = "LONG"
-                #self.log(f"🧩 LONG Sinyali: Puan {total_long_score} Detay: {final_reason}")
-                
-                # -> DÖNÜŞ EKLENDİ
-                return final_signal, total_long_score, final_reason
-
-            elif total_short_score >= threshold and total_short_score > total_long_score:
-                final_signal = "SHORT"
-                #self.log(f"🧩 SHORT Sinyali: Puan {total_short_score} Detay: {final_reason}")
-                
-                # -> DÖNÜŞ EKLENDİ
-                return final_signal, total_short_score, final_reason
-
-            else:
-                return "HOLD", 0, final_reason
+            # Ortak primitifler bağlamda bir kez hesaplanır; df değiştirilmez
+            if ctx is None:
+                ctx = self.feature_context(df, symbol)
+            
+            # Aynı kapanmış mum: oluşan mum da değişmediyse sonuç hazır, değiştiyse
+            # sadece kapanmış mumlardan türeyen özellikler yeniden kullanılır
+            store = self._closed_store(ctx)
+            if store is not None:
+                live_key = self._live_key(ctx)
+                cached = store.get('result')
+                if store:
+                    self.result_cache.record_hit(full=cached is not None and cached[0] == live_key)
+                if cached is not None and cached[0] == live_key:
+                    return cached[1]
+                if ctx.closed_store is None:
+                    ctx.closed_store = store
+            
+            result = self._score(ctx)
+            if store is not None:
+                store['result'] = (live_key, result)
+            return result
         
         except Exception as e:
             self.log(f"❌ get_composite_score hatası: {e}")
             # HATA DURUMUNDA DA 3 DEĞER DÖNDÜR
             return "HOLD", 0, f"Hata: {str(e)}"
+
+    def _closed_store(self, ctx):
+        """Bu kapanmış mum penceresinin önbellek sözlüğü (önbellek kapalıysa / mum bilinmiyorsa None)."""
+        if self.result_cache is None or not ctx.symbol:
+            return None
+        window = self.result_cache.closed_window(ctx.df)
+        if window is None:
+            return None
+        return self.result_cache.lookup(
+            ctx.symbol, ctx.interval, window, self.result_cache.fingerprint(self.weights, self.settings)
+        )
+
+    @staticmethod
+    def _live_key(ctx):
+        """Oluşan mumun OHLCV değerleri + UTC saat (Kill Zone saate bağlı)."""
+        from datetime import datetime
+        return (tuple(float(ctx.column(name)[-1]) for name in ('Open', 'High', 'Low', 'Close', 'Volume')),
+                datetime.utcnow().hour)
+
+    def _score(self, ctx):
+        """Kayıtlı modüllerle puanlama → (sinyal, puan, sebep)."""
+        total_long_score = 0
+        total_short_score = 0
+        threshold = self.threshold
+        
+        # Raporlama için detaylar
+        reasons = {}
+
+        # --- MODÜL ÇAĞRILARI (kayıt defterinden, en ucuzdan pahalıya) ---
+        # Kalan modüllerin alabileceği en yüksek puan hiçbir tarafı eşiğe taşıyamıyorsa
+        # sonuç kesin HOLD'dur → kalan modüller çalıştırılmaz.
+        modules = self._ordered
+        remaining_long = sum(m['max_long'](self.weights) for m in modules)
+        remaining_short = sum(m['max_short'](self.weights) for m in modules)
+        
+        for module in modules:
+            if (total_long_score + remaining_long < threshold and
+                    total_short_score + remaining_short < threshold):
+                self._record_short_circuit()
+                break
+            
+            t0 = time.perf_counter()
+            l, s, r = module['func'](ctx)
+            self._record_module(module['name'], time.perf_counter() - t0)
+            
+            total_long_score += l
+            total_short_score += s
+            remaining_long -= module['max_long'](self.weights)
+            remaining_short -= module['max_short'](self.weights)
+            if r: reasons[module['name']] = r
+        
+        # Sebepler her zaman kayıt sırasıyla (çalışma sırasından bağımsız)
+        reasons_log = [f"[{m['label']}: {reasons[m['name']]}]" for m in self.modules if m['name'] in reasons]
+        
+        # --- KARAR ANI ---
+        final_signal = "HOLD"
+        final_reason = " | ".join(reasons_log)
+        
+        # Sadece bir taraf eşiği geçerse sinyal ver
+        # Eğer ikisi de yüksekse (kararsızlık) HOLD kalır veya puanı çok yüksek olanı seçeriz.
+        if total_long_score >= threshold and total_long_score > total_short_score:
+            final_signal = "LONG"
+            #self.log(f"🧩 LONG Sinyali: Puan {total_long_score} Detay: {final_reason}")
+            
+            # -> DÖNÜŞ EKLENDİ
+            return final_signal, total_long_score, final_reason
+
+        elif total_short_score >= threshold and total_short_score > total_long_score:
+            final_signal = "SHORT"
+            #self.log(f"🧩 SHORT Sinyali: Puan {total_short_score} Detay: {final_reason}")
+            
+            # -> DÖNÜŞ EKLENDİ
+            return final_signal, total_short_score, final_reason
+
+        else:
+            return "HOLD", 0, final_reason
+
@@ -0,0 +1,72 @@
+import threading
+
+
+class SignalCache:
+    """
+    Kapanmış mum kimliğine göre puanlama önbelleği.
+    Anahtar: (sembol, interval, kapanmış mum penceresi, ayar/ağırlık parmak izi).
+    Pencere = (ilk mumun open time'ı, son kapanmış mumun open time'ı); son satır oluşan mumdur.
+
+    Tarama aralığı (120 sn) mum süresinden (15m) kısa olduğu için aynı kapanmış mum birkaç kez
+    puanlanır. Her pencere için bir sözlük (store) tutulur:
+      - FeatureContext.closed_store: kapanmış mumlardan türeyen swing/FVG/OB dizileri
+      - 'result': oluşan mum (OHLCV) ve saat aynıysa puanlamanın tamamı atlanır
+    Sembol/interval başına yalnızca en son pencere tutulur (yeni mum gelince eskisi düşer).
+
+    Sayaçlar: hits (tam isabet, puanlama yok), partial (kapanmış özellikler hazır, modüller
+    oluşan mumla yeniden çalışır), misses (yeni mum veya değişen ayar).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = {}   # (sembol, interval) -> (pencere, parmak izi, store)
+        self.hits = 0
+        self.partial = 0
+        self.misses = 0
+
+    @staticmethod
+    def closed_window(df):
+        """(ilk open time, son kapanmış mumun open time'ı); 'Open time' yoksa None."""
+        if 'Open time' not in df.columns or len(df) < 2:
+            return None
+        first, last = df['Open time'].iloc[0], df['Open time'].iloc[-2]
+        if first != first or last != last:   # NaN
+            return None
+        return int(first), int(last)
+
+    @staticmethod
+    def fingerprint(weights, settings):
+        """Puanlamayı etkileyen ağırlık ve ayarların özeti (değişince önbellek geçersiz)."""
+        def _items(d):
+            return tuple(sorted((str(k), repr(v)) for k, v in d.items()))
+        return hash((_items(weights), _items(settings if isinstance(settings, dict) else {})))
+
+    def lookup(self, symbol, interval, window, fingerprint):
+        """Bu pencerenin store sözlüğü; ilk kez görülüyorsa boş açılır ve ıska sayılır."""
+        key = (symbol, interval)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == window and entry[1] == fingerprint:
+                return entry[2]
+            self.misses += 1
+            store = {}
+            self._entries[key] = (window, fingerprint, store)
+            return store
+
+    def record_hit(self, full):
+        with self._lock:
+            if full:
+                self.hits += 1
+            else:
+                self.partial += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def format_stats(self):
+        with self._lock:
+            total = self.hits + self.partial + self.misses
+            rate = (self.hits + self.partial) / total * 100 if total else 0.0
+            return (f"💾 Sinyal önbelleği: {self.hits} tam + {self.partial} kısmi isabet / "
+                    f"{self.misses} ıska (%{rate:.0f}), {len(self._entries)} sembol")
@@ -1,19 +1,54 @@
+import numpy as np
 import pandas as pd
-import time
 # Yeni beyin takımını import ediyoruz
 from strategies.score import SignalEngine
+from candle_cache import CandleCache
+from ohlcv_store import FIELDS
+from indicators import IndicatorBook
+from strategies.signal_cache import SignalCache
+
+
+def filter_symbols_by_volume(tickers, min_vol_mn):
+    """24s ticker listesinden USDT çiftlerini hacim eşiğine (milyon USDT) göre süzer."""
+    target_volume = min_vol_mn * 1_000_000
+    final_symbols = []
+    
+    for t in tickers:
+        symbol = t['symbol']
+        if symbol.endswith('USDT') and symbol != 'USDTUSDT':
+            try:
+                vol = float(t['quoteVolume'])
+                
+                # SADECE BİR KOŞUL: target_volume'dan büyük mü?
+                if vol >= target_volume:
+                    
+                    final_symbols.append(symbol)
+                        
+            except Exception as e:
+                continue
+    return final_symbols
+
 
 class StrategyCore:
-    def __init__(self, api_client, settings, log_func):
+    def __init__(self, api_client, settings, log_func, archive=None):
         self.client = api_client
         self.settings = settings
         self.log = log_func
         self.symbols_to_scan = [] 
         
+        # Paylaşımlı mum önbelleği (tarama + trailing stop aynı veriyi kullanır)
+        # archive verilirse sıcak başlangıç + kapanan mumların diske yazılması
+        self.candle_cache = CandleCache(api_client, archive=archive, log_func=log_func)
+        
+        # Sembol başına akışlı RSI/Bollinger/ATR durumu (kapanan mum başına O(1))
+        self.indicators = IndicatorBook()
+        
         # Sinyal motorunu başlatıyoruz
         self.engine = SignalEngine(
             settings=self.settings,  # GUI'den gelen dict'i geçir
-            log_func=log_func
+            log_func=log_func,
+            indicator_book=self.indicators,
+            result_cache=SignalCache()   # Aynı kapanmış mumun tekrar taranmasında kapanmış özellikler/sonuç hazır
         )
 
     def get_symbols_to_scan(self):
@@ -22,27 +57,7 @@ class StrategyCore:
         try:
             tickers = self.client.ticker_24hr_price_change()
             
-            try:
-                min_vol_mn = float(self.settings.get('min_volume', 130))
-            except:
-                min_vol_mn = 130.0
-            
-            target_volume = min_vol_mn * 1_000_000
-            final_symbols = []
-            
-            for t in tickers:
-                symbol = t['symbol']
-                if symbol.endswith('USDT') and symbol != 'USDTUSDT':
-                    try:
-                        vol = float(t['quoteVolume'])
-                        
-                        # SADECE BİR KOŞUL: target_volume'dan büyük mü?
-                        if vol >= target_volume:
-                            
-                            final_symbols.append(symbol)
-                                
-                    except Exception as e:
-                        continue
+            final_symbols = filter_symbols_by_volume(tickers, self.min_volume_mn())
             
             self.symbols_to_scan = final_symbols
             self.log(f"✅ Filtreyi geçen: {len(self.symbols_to_scan)} sembol.")
@@ -53,30 +68,55 @@ class StrategyCore:
             self.symbols_to_scan = []
         return self.symbols_to_scan
 
+    def min_volume_mn(self):
+        try:
+            return float(self.settings.get('min_volume', 130))
+        except:
+            return 130.0
+
     def get_candlesticks(self, symbol, interval, limit=100):
-        """Mum verilerini çeker."""
-        for i in range(3):
-            try:
-                klines = self.client.klines(symbol, interval, limit=limit)
-                df = pd.DataFrame(klines, columns=[
-                    'Open time', 'Open', 'High', 'Low', 'Close', 'Volume', 
-                    'Close time', 'Quote asset volume', 'Number of trades', 
-                    'Taker buy base asset volume', 'Taker buy quote asset volume', 'Ignore'
-                ])
-                if df is None or len(df) < 20:
-                    return None
-                cols = ['Open', 'High', 'Low', 'Close', 'Volume']
-                df[cols] = df[cols].astype(float)
-                
-                # Eksik/bozuk veri kontrolü
-                if df['Close'].isna().any() or (df['High'] < df['Low']).any():
-                    self.log(f"❌ Bozuk veri: {symbol}")
-                    return None
-                return df
+        """Mum verilerini çeker. (Rate limit / ağ hatası tekrarları RequestScheduler'da)"""
+        try:
+            # Kolon bazlı store'dan float DataFrame görünümü (string parse / astype yok)
+            df = self.candle_cache.get_frame(symbol, interval, limit=limit)
+            if df is None or len(df) < 20:
+                return None
             
+            # Eksik/bozuk veri kontrolü
+            if df['Close'].isna().any() or (df['High'] < df['Low']).any():
+                self.log(f"❌ Bozuk veri: {symbol}")
+                return None
+            return df
+        
+        except Exception as e:
+            self.log(f"❌ Mum verisi alınamadı ({symbol}): {e}")
+            return None
+
+    def get_batch(self, symbols, interval='15m', limit=100, executor=None):
+        """
+        Toplu puanlama için (semboller × mumlar × alanlar) dizisi (FIELDS sırası).
+        Tam `limit` mumu olmayan veya bozuk veri içeren semboller atlanır.
+        Dönüş: (kalan semboller, dizi)
+        """
+        def _load(symbol):
+            try:
+                arrs = self.candle_cache.get_arrays(symbol, interval, limit=limit)
             except Exception as e:
-                time.sleep(1)
-        return None
+                self.log(f"❌ Mum verisi alınamadı ({symbol}): {e}")
+                return None
+            if len(arrs['close']) < limit:
+                return None
+            block = np.stack([arrs[name] for name in FIELDS], axis=-1)
+            if np.isnan(block).any() or (arrs['high'] < arrs['low']).any():
+                self.log(f"❌ Bozuk veri: {symbol}")
+                return None
+            return block
+
+        blocks = list(executor.map(_load, symbols)) if executor else [_load(s) for s in symbols]
+        kept = [(s, b) for s, b in zip(symbols, blocks) if b is not None]
+        if not kept:
+            return [], np.empty((0, limit, len(FIELDS)))
+        return [s for s, _ in kept], np.stack([b for _, b in kept])
 
     def calculate_volatility(self, df):
         # SENİN ORİJİNAL KODUN (DOKUNULMADI)
@@ -105,15 +145,13 @@ class StrategyCore:
         """
         client parametresini kaldırıyoruz - gereksiz karmaşıklık
         """
-        # SADECE df parametresini gönder
-        signal, score, reason = self.engine.get_composite_score(df)
+        # Puanlama ve RSI/BB aynı özellik bağlamını paylaşır (indikatörler bir kez hesaplanır)
+        ctx = self.engine.feature_context(df, symbol)
+        signal, score, reason = self.engine.get_composite_score(df, symbol=symbol, ctx=ctx)
         
-        # Mevcut RSI ve BB hesaplaması
-        if 'rsi' not in df.columns:
-            df = self.engine.calculate_indicators(df)
-            
-        rsi = df['rsi'].iloc[-1]
-        bb_upper = df['bb_upper'].iloc[-1]
-        bb_lower = df['bb_lower'].iloc[-1]
+        ind = ctx.indicators()
+        rsi = ind['rsi']
+        bb_upper = ind['bb_upper']
+        bb_lower = ind['bb_lower']
         
         return signal, reason, rsi, bb_upper, bb_lower
@@ -0,0 +1,155 @@
+import pandas as pd
+import numpy as np
+
+def _rolling_extreme(values, lookback, reducer):
+    """
+    Her i (lookback <= i < n - lookback) için sol [i-lookback, i) ve sağ (i, i+lookback]
+    pencerelerinin max/min'i (son eksen boyunca). NaN'ları pandas .max()/.min() gibi atlar (fmax/fmin).
+    """
+    windows = np.lib.stride_tricks.sliding_window_view(values, lookback, axis=-1)
+    m = values.shape[-1] - 2 * lookback
+    left = reducer.reduce(windows[..., :m, :], axis=-1)
+    right = reducer.reduce(windows[..., lookback + 1:lookback + 1 + m, :], axis=-1)
+    return left, right
+
+
+def swing_masks(high, low, lookback=5):
+    """
+    Swing High / Swing Low bayrakları (son eksen boyunca).
+    high/low (n,) veya toplu tarama için (semboller × n) olabilir.
+    """
+    n = high.shape[-1]
+    swing_high = np.zeros(high.shape, dtype=bool)
+    swing_low = np.zeros(low.shape, dtype=bool)
+
+    if lookback >= 1 and n > 2 * lookback:
+        center = (Ellipsis, slice(lookback, n - lookback))
+
+        left_max, right_max = _rolling_extreme(high, lookback, np.fmax)
+        swing_high[center] = (high[center] > left_max) & (high[center] > right_max)
+
+        left_min, right_min = _rolling_extreme(low, lookback, np.fmin)
+        swing_low[center] = (low[center] < left_min) & (low[center] < right_min)
+
+    return swing_high, swing_low
+
+
+def detect_structure(df, lookback=5):
+    """
+    Piyasa Yapısını (Market Structure) Analiz Eder.
+    Swing High ve Swing Low noktalarını belirler.
+    
+    lookback: Bir tepenin tepe olması için sağında ve solunda kaç mumun daha düşük olması gerektiği.
+              (5 mum sağ, 5 mum sol = Fraktal yapı)
+
+    Bayraklar strategies.kernels.swing_flags'tan gelir: numba varsa derlenmiş döngü, yoksa
+    swing_masks (sliding window görünümleriyle vektörel); ikisi de eski döngülü halle birebir
+    aynı bayrakları üretir (tests/test_structure.py, tests/test_kernels.py).
+    """
+    from strategies.kernels import swing_flags   # kernels bu modülü içe aktarıyor (döngüsel import)
+    swing_high, swing_low = swing_flags(
+        df['High'].to_numpy(dtype=np.float64), df['Low'].to_numpy(dtype=np.float64), lookback
+    )
+    return df.assign(swing_high=swing_high, swing_low=swing_low)
+
+def check_trend(df):
+    """
+    Son oluşan Swing noktalarına bakarak trendi belirler.
+    Dönüş: 'BULLISH', 'BEARISH' veya 'SIDEWAYS'
+    """
+    # Sadece Swing High ve Low olan satırları al
+    swings = df[(df['swing_high']) | (df['swing_low'])].copy()
+    
+    if len(swings) < 4:
+        return "SIDEWAYS", None # Yeterli veri yok
+    
+    # Son 2 High ve Son 2 Low'u bul
+    last_highs = swings[swings['swing_high']]['High'].tail(2).values
+    last_lows = swings[swings['swing_low']]['Low'].tail(2).values
+    
+    trend = "SIDEWAYS"
+    structure_break = False # BOS var mı?
+    
+    # Yükseliş Trendi: Yeni tepe > Eski tepe VE Yeni dip > Eski dip
+    if len(last_highs) >= 2 and len(last_lows) >= 2:
+        if last_highs[-1] > last_highs[-2] and last_lows[-1] > last_lows[-2]:
+            trend = "BULLISH"
+            
+            # Anlık Fiyat Kontrolü (BOS - Break of Structure)
+            # Eğer şu anki fiyat, son swing high'ı yukarı kırdıysa trend çok güçlüdür.
+            current_close = df['Close'].iloc[-1]
+            if current_close > last_highs[-1]:
+                structure_break = True # Bullish BOS
+                
+    # Düşüş Trendi: Yeni tepe < Eski tepe VE Yeni dip < Eski dip
+    if len(last_highs) >= 2 and len(last_lows) >= 2:
+        if last_highs[-1] < last_highs[-2] and last_lows[-1] < last_lows[-2]:
+            trend = "BEARISH"
+            
+            # Anlık Fiyat Kontrolü (Bearish BOS)
+            current_close = df['Close'].iloc[-1]
+            if current_close < last_lows[-1]:
+                structure_break = True # Bearish BOS
+
+    return trend, structure_break
+
+def swing_at(high, low, i, lookback=5):
+    """
+    Sadece i. mumun swing bayrakları (sağ penceresi dizinin sonuna dayanan mum için;
+    swing_masks ile aynı NaN kuralları).
+    """
+    n = high.shape[-1]
+    if lookback < 1 or i < lookback or i + lookback >= n:
+        return False, False
+    left, right = slice(i - lookback, i), slice(i + 1, i + lookback + 1)
+    is_high = high[i] > np.fmax.reduce(high[left]) and high[i] > np.fmax.reduce(high[right])
+    is_low = low[i] < np.fmin.reduce(low[left]) and low[i] < np.fmin.reduce(low[right])
+    return bool(is_high), bool(is_low)
+
+
+def trend_from_swings(high, low, close, swing_high_idx, swing_low_idx):
+    """
+    check_trend'in dizi hali: swing indeksleri (artan sırada) ve son kapanışla (trend, bos).
+    """
+    if len(np.union1d(swing_high_idx, swing_low_idx)) < 4:
+        return "SIDEWAYS", None
+
+    last_highs = high[swing_high_idx[-2:]]
+    last_lows = low[swing_low_idx[-2:]]
+
+    trend = "SIDEWAYS"
+    structure_break = False
+    if len(last_highs) >= 2 and len(last_lows) >= 2:
+        if last_highs[-1] > last_highs[-2] and last_lows[-1] > last_lows[-2]:
+            trend = "BULLISH"
+            if close > last_highs[-1]:
+                structure_break = True
+        if last_highs[-1] < last_highs[-2] and last_lows[-1] < last_lows[-2]:
+            trend = "BEARISH"
+            if close < last_lows[-1]:
+                structure_break = True
+    return trend, structure_break
+
+def detect_msb(df, window=20):
+    """
+    Market Structure Break (MSB) / Change of Character (ChoCH)
+    Trendin tersine döndüğü ilk anı yakalar.
+    Senin basit BOS filtrene benziyor ama Swing noktalarına bakar.
+    """
+    trend, _ = check_trend(df)
+    current_close = df['Close'].iloc[-1]
+    
+    # Son swing low ve high'ı bul
+    try:
+        last_swing_high = df[df['swing_high']]['High'].iloc[-1]
+        last_swing_low = df[df['swing_low']]['Low'].iloc[-1]
+    except:
+        return None
+
+    if trend == "BEARISH" and current_close > last_swing_high:
+        return "BULLISH_MSB" # Düşüş trendinde son tepe yukarı kırıldı! (AL Sinyali başlangıcı)
+        
+    if trend == "BULLISH" and current_close < last_swing_low:
+        return "BEARISH_MSB" # Yükseliş trendinde son dip aşağı kırıldı! (SAT Sinyali başlangıcı)
+        
+    return None
@@ -0,0 +1,383 @@
+"""
+Paralel parametre taraması: ağırlıklar, eşik (score_thresh), sl_pct, tp_pct ve trailing çarpanı.
+
+Mumlar bir kez SharedMemory'ye yüklenir (semboller × mumlar × alanlar). İki aşama:
+  1) prepare(): sembol başına parametreden bağımsız özellikler — sebep bit maskeleri (backtest_hits),
+     kaldıraç serisi ve ATR — havuzda hesaplanıp yine SharedMemory'ye yazılır.
+  2) run(configs): konfigürasyon blokları havuza dağıtılır. Worker sadece ağırlık + eşik uygular
+     (sebep kodlarının benzersiz değerleri üzerinden) ve işlemleri simüle eder.
+     Aynı ağırlık/eşikli konfigler yan yana gönderilir, sinyaller worker'da yeniden kullanılır.
+Sonuçlar geldikçe CSV tablosuna eklenir (her satırda flush) ve on_result ile bildirilir.
+
+    sweep = ParameterSweep(workers=8, interval='15m')
+    sweep.load_archive(CandleArchive(CANDLE_ARCHIVE_DIR), symbols)
+    sweep.prepare()
+    configs = random_configs({'fvg': [2, 3, 4, 5], 'threshold': range(12, 25), 'tp_pct': [0.5, 1, 1.5]}, 10000)
+    rows = sweep.run(configs, out_path='sweep.csv')
+    sweep.stop()
+"""
+import argparse
+import csv
+import itertools
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from strategies.backtest import (
+    WINDOW, TRAIL_MULT, SIGNAL_LONG, SIGNAL_SHORT,
+    backtest_hits, leverage_series, atr_series, simulate_trades, summarize, _apply_weights,
+)
+
+CANDLE_COLUMNS = ('Open time', 'Open', 'High', 'Low', 'Close', 'Volume')
+EXIT_KEYS = ('sl_pct', 'tp_pct', 'trail_mult')
+RESULT_KEYS = ('trades', 'wins', 'win_rate', 'pnl_pct', 'avg_pnl_pct', 'max_drawdown_pct', 'profitable_symbols')
+
+_SHM = {}        # Worker: isim → (SharedMemory, ndarray)
+_SIGNALS = {}    # Worker: son ağırlık/eşik anahtarı → sembol başına sinyaller
+_UNIQUE = {}     # Worker: (blok, sembol) → (benzersiz sebep kodları, ters indeks)
+
+
+# --- Konfigürasyon üreticileri ---
+
+def grid_configs(space):
+    """space: {anahtar: değer listesi}. Tüm kombinasyonlar (dict listesi)."""
+    keys = list(space)
+    return [dict(zip(keys, values)) for values in itertools.product(*(list(space[k]) for k in keys))]
+
+
+def random_configs(space, count, seed=0):
+    """space: {anahtar: değer listesi}. Her anahtar için rastgele seçimle `count` konfig (tekrarlar atılır)."""
+    rng = np.random.default_rng(seed)
+    keys = list(space)
+    pools = [list(space[k]) for k in keys]
+    total = int(np.prod([len(p) for p in pools], dtype=np.float64))
+    seen, configs = set(), []
+    while len(configs) < min(count, total):
+        values = tuple(pool[rng.integers(len(pool))] for pool in pools)
+        if values not in seen:
+            seen.add(values)
+            configs.append(dict(zip(keys, values)))
+    return configs
+
+
+# --- Worker tarafı ---
+
+def _attach(spec):
+    """(isim, şekil, dtype) → SharedMemory üzerinde ndarray (worker başına bir kez bağlanır)."""
+    name, shape, dtype = spec
+    entry = _SHM.get(name)
+    if entry is None:
+        # spawn worker'ları ana sürecin resource_tracker'ını paylaşır; unlink ana süreçte yapılır
+        shm = shared_memory.SharedMemory(name=name)
+        entry = _SHM[name] = (shm, np.ndarray(shape, dtype=dtype, buffer=shm.buf))
+    return entry[1]
+
+
+def _features_task(candles_spec, feature_specs, lengths, i, window, interval, vp_bins):
+    """Worker: i. sembolün parametreden bağımsız serileri (sebepler, kaldıraç, ATR)."""
+    n = int(lengths[i])
+    block = _attach(candles_spec)[i, :n]
+    df = pd.DataFrame({name: block[:, j] for j, name in enumerate(CANDLE_COLUMNS)}, copy=True)
+    df['Open time'] = df['Open time'].astype(np.int64)
+
+    reasons_out, leverage_out, atr_out = (_attach(spec) for spec in feature_specs)
+    reasons_out[i, :n] = backtest_hits(df, window=window, vp_bins=vp_bins, interval=interval)
+    leverage_out[i, :n] = leverage_series(df['Close'].to_numpy(dtype=np.float64))[0]
+    atr_out[i, :n] = atr_series(df['High'].to_numpy(), df['Low'].to_numpy(), df['Close'].to_numpy())
+    return i
+
+
+def _signals(reasons, key, weights, threshold):
+    """backtest_signals kuralı, benzersiz sebep kodları üzerinden (her kod için bir kez puanlama)."""
+    cached = _UNIQUE.get(key)
+    if cached is None:
+        cached = _UNIQUE[key] = np.unique(reasons, return_inverse=True)
+    codes, inverse = cached
+    long_, short = _apply_weights(codes, weights)
+    is_long = (long_ >= threshold) & (long_ > short)
+    is_short = ~is_long & (short >= threshold) & (short > long_)
+    per_code = np.where(is_long, SIGNAL_LONG, np.where(is_short, SIGNAL_SHORT, 0)).astype(np.int8)
+    return per_code[inverse]
+
+
+def _config_task(candles_spec, feature_specs, lengths, items, base_weights, fee_pct):
+    """Worker: [(konfig indeksi, konfig), ...] bloğunu tüm sembollerde çalıştırır."""
+    candles = _attach(candles_spec)
+    reasons_all, leverage_all, atr_all = (_attach(spec) for spec in feature_specs)
+    high_col, low_col, close_col = (CANDLE_COLUMNS.index(name) for name in ('High', 'Low', 'Close'))
+
+    block = feature_specs[0][0]
+    out = []
+    for index, config in items:
+        weights = {**base_weights, **{k: v for k, v in config.items() if k in base_weights}}
+        threshold = config.get('threshold', base_weights['threshold'])
+        key = (block, tuple(sorted(weights.items())), threshold)
+        if key not in _SIGNALS:
+            _SIGNALS.clear()
+            _SIGNALS[key] = {}
+        signal_cache = _SIGNALS[key]
+
+        pnl, profitable = [], 0
+        for i, n in enumerate(lengths):
+            n = int(n)
+            signals = signal_cache.get(i)
+            if signals is None:
+                signals = signal_cache[i] = _signals(reasons_all[i, :n], (block, i), weights, threshold)
+            trades = simulate_trades(
+                candles[i, :n, high_col], candles[i, :n, low_col], candles[i, :n, close_col],
+                signals, leverage_all[i, :n],
+                sl_pct=float(config.get('sl_pct', 4.0)), fee_pct=fee_pct,
+                atr=atr_all[i, :n], tp_pct=float(config.get('tp_pct', 1.0)),
+                trail_mult=float(config.get('trail_mult', TRAIL_MULT)),
+            )
+            pnl.append(trades)
+            if len(trades) and trades['pnl_pct'].sum() > 0:
+                profitable += 1
+
+        # Semboller ardışık işlem listesi gibi birleştirilir (tek hesap, sembol sırasıyla)
+        summary = summarize(np.concatenate(pnl) if pnl else np.empty(0))
+        summary['profitable_symbols'] = profitable
+        out.append((index, summary))
+    return out
+
+
+# --- Ana süreç ---
+
+class ParameterSweep:
+    def __init__(self, workers=None, window=WINDOW, interval='15m', vp_bins=20, fee_pct=0.04,
+                 base_weights=None, configs_per_task=16, log_func=None):
+        self.workers = workers or max(1, (os.cpu_count() or 2) - 1)
+        self.window = window
+        self.interval = interval
+        self.vp_bins = vp_bins
+        self.fee_pct = fee_pct
+        self.configs_per_task = configs_per_task
+        self.log = log_func if log_func else print
+        if base_weights is None:
+            from strategies.score import SignalEngine
+            base_weights = SignalEngine(log_func=lambda *args, **kwargs: None).weights
+        self.base_weights = dict(base_weights)
+
+        self.symbols = []
+        self.lengths = None
+        self._blocks = []           # Ana sürecin oluşturduğu SharedMemory blokları (stop'ta unlink)
+        self._candles_spec = None
+        self._feature_specs = None
+        self._pool = None
+        self.out_path = None        # Son run()'ın yazdığı CSV
+
+    # --- Kaynaklar ---
+
+    def start(self):
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=multiprocessing.get_context('spawn')
+            )
+        return self
+
+    def stop(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+        for shm in self._blocks:
+            shm.close()
+            shm.unlink()
+        self._blocks = []
+        self._candles_spec = self._feature_specs = None
+
+    def _block(self, shape, dtype, fill=0):
+        dtype = np.dtype(dtype)
+        shm = shared_memory.SharedMemory(create=True, size=max(1, int(np.prod(shape)) * dtype.itemsize))
+        self._blocks.append(shm)
+        np.ndarray(shape, dtype=dtype, buffer=shm.buf).fill(fill)
+        return shm.name, shape, dtype.str
+
+    def _view(self, spec):
+        name, shape, dtype = spec
+        shm = next(b for b in self._blocks if b.name == name)
+        return np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+
+    # --- Yükleme ---
+
+    def load_frames(self, frames):
+        """frames: {sembol: DataFrame (Open time, Open, High, Low, Close, Volume)}. Bir kez SharedMemory'ye yazılır."""
+        self.stop()
+        self.symbols = list(frames)
+        self.lengths = np.array([len(frames[s]) for s in self.symbols], dtype=np.int64)
+        n_max = int(self.lengths.max()) if len(self.lengths) else 0
+
+        self._candles_spec = self._block((len(self.symbols), n_max, len(CANDLE_COLUMNS)), np.float64, np.nan)
+        candles = self._view(self._candles_spec)
+        for i, symbol in enumerate(self.symbols):
+            df = frames[symbol]
+            candles[i, :len(df)] = df[list(CANDLE_COLUMNS)].to_numpy(dtype=np.float64)
+        mb = candles.nbytes / 1e6
+        self.log(f"📦 Tarama verisi: {len(self.symbols)} sembol, en fazla {n_max} mum ({mb:.0f} MB paylaşımlı bellek)")
+        return self
+
+    def load_archive(self, archive, symbols=None, **read_kwargs):
+        """CandleArchive'dan yükler (start_time/end_time/limit read_frame'e geçer)."""
+        symbols = symbols if symbols is not None else archive.symbols(self.interval)
+        frames = {}
+        for symbol in symbols:
+            df = archive.read_frame(symbol, self.interval, **read_kwargs)
+            if len(df) >= self.window:
+                frames[symbol] = df
+        return self.load_frames(frames)
+
+    # --- Aşama 1: parametreden bağımsız özellikler ---
+
+    def prepare(self):
+        if self._candles_spec is None:
+            raise RuntimeError("Önce load_frames / load_archive çağrılmalı")
+        self.start()
+        shape = self._candles_spec[1][:2]
+        self._feature_specs = (
+            self._block(shape, np.int64),         # Sebep bit maskeleri
+            self._block(shape, np.int8, 1),       # Kaldıraç
+            self._block(shape, np.float64, np.nan),  # ATR
+        )
+        t0 = time.time()
+        futures = [
+            self._pool.submit(_features_task, self._candles_spec, self._feature_specs, self.lengths,
+                              i, self.window, self.interval, self.vp_bins)
+            for i in range(len(self.symbols))
+        ]
+        for future in as_completed(futures):
+            try:
+                future.result()
+            except Exception as e:
+                self.log(f"❌ Tarama özellik hatası: {e}")
+        self.log(f"🧮 Özellikler hazır: {len(self.symbols)} sembol, {time.time() - t0:.1f} sn")
+        return self
+
+    # --- Aşama 2: konfigürasyonlar ---
+
+    def _signal_key(self, config):
+        return tuple(sorted((k, v) for k, v in config.items() if k not in EXIT_KEYS))
+
+    def _open_csv(self, out_path, fieldnames):
+        """
+        Aynı başlıklı dosya varsa sonuna ekler; başlık farklıysa (başka parametre uzayı) satırlar
+        yanlış kolonlara düşmesin diye yeni dosya açılır: sweep.csv → sweep.1.csv, sweep.2.csv...
+        Yazılan yol self.out_path'te.
+        """
+        base, ext = os.path.splitext(out_path)
+        path, k = out_path, 0
+        while os.path.exists(path) and os.path.getsize(path) > 0:
+            with open(path, newline='') as f:
+                header = next(csv.reader(f), None)
+            if header == fieldnames:
+                break
+            k += 1
+            path = f"{base}.{k}{ext}"
+        if path != out_path:
+            self.log(f"⚠️ {out_path} başlığı bu taramanın kolonlarıyla uyuşmuyor → {path} dosyasına yazılıyor")
+
+        new_file = not os.path.exists(path) or os.path.getsize(path) == 0
+        handle = open(path, 'a', newline='')
+        writer = csv.DictWriter(handle, fieldnames=fieldnames, extrasaction='ignore')
+        if new_file:
+            writer.writeheader()
+        self.out_path = path
+        return handle, writer
+
+    def run(self, configs, out_path=None, on_result=None):
+        """
+        configs: [{ağırlık adı | 'threshold' | 'sl_pct' | 'tp_pct' | 'trail_mult': değer}, ...]
+        Eksik anahtarlar base_weights / varsayılanlardan (sl 4.0, tp 1.0, çarpan 1.8) gelir.
+        Dönüş: konfig sırasıyla [{**konfig, **özet}, ...]; out_path verilirse satırlar geldikçe CSV'ye eklenir
+        (başlığı farklı mevcut dosyaya eklenmez, bkz. _open_csv).
+        """
+        if self._feature_specs is None:
+            self.prepare()
+        self.start()
+        configs = list(configs)
+        if not configs:
+            return []
+
+        # Aynı sinyal anahtarlı (ağırlık + eşik) konfigler aynı bloğa düşsün
+        order = sorted(range(len(configs)), key=lambda k: repr(self._signal_key(configs[k])))
+        size = max(1, self.configs_per_task)
+        futures = [
+            self._pool.submit(_config_task, self._candles_spec, self._feature_specs, self.lengths,
+                              [(k, configs[k]) for k in order[lo:lo + size]], self.base_weights, self.fee_pct)
+            for lo in range(0, len(order), size)
+        ]
+
+        columns = sorted({key for config in configs for key in config}) + list(RESULT_KEYS)
+        handle = writer = None
+        if out_path:
+            handle, writer = self._open_csv(out_path, ['index'] + columns)
+
+        rows = [None] * len(configs)
+        done, best, t0 = 0, None, time.time()
+        step = max(1, len(configs) // 20)
+        try:
+            for future in as_completed(futures):
+                try:
+                    results = future.result()
+                except Exception as e:
+                    self.log(f"❌ Tarama konfig hatası: {e}")
+                    continue
+                for index, summary in results:
+                    row = {**configs[index], **summary}
+                    rows[index] = row
+                    if writer is not None:
+                        writer.writerow({'index': index, **row})
+                    if on_result is not None:
+                        on_result(index, row)
+                    if best is None or row['pnl_pct'] > best['pnl_pct']:
+                        best = row
+                    done += 1
+                    if done % step == 0 or done == len(configs):
+                        rate = done / max(time.time() - t0, 1e-9)
+                        self.log(f"🧪 Tarama: {done}/{len(configs)} konfig ({rate:.1f}/sn) | "
+                                 f"En iyi PnL: %{best['pnl_pct']:.1f} ({best['trades']} işlem)")
+                if handle is not None:
+                    handle.flush()
+        finally:
+            if handle is not None:
+                handle.close()
+        return rows
+
+
+def top_results(rows, key='pnl_pct', count=10):
+    """Sonuç satırlarından key'e göre en iyi `count` tanesi."""
+    return sorted((r for r in rows if r is not None), key=lambda r: r[key], reverse=True)[:count]
+
+
+if __name__ == "__main__":
+    from candle_archive import CandleArchive
+
+    parser = argparse.ArgumentParser(description="Ağırlık / eşik / çıkış parametresi taraması")
+    parser.add_argument('archive', help="CandleArchive klasörü")
+    parser.add_argument('--interval', default='15m')
+    parser.add_argument('--symbols', nargs='*')
+    parser.add_argument('--count', type=int, default=1000, help="Rastgele konfig sayısı (0 → tam ızgara)")
+    parser.add_argument('--workers', type=int)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--out', default='sweep.csv')
+    args = parser.parse_args()
+
+    space = {
+        'fvg': [2, 3, 4, 5, 6], 'structure': [1, 2, 3, 4], 'rsi_boll': [0, 1, 2, 3],
+        'liquidity': [1, 2, 3, 4], 'volume_profile': [0, 1, 2, 3], 'order_block': [1, 2, 3, 4],
+        'pd_arrays': [0, 1, 2, 3], 'ote': [1, 2, 3, 4], 'killzones': [0, 1, 2],
+        'threshold': list(range(10, 25)),
+        'sl_pct': [2.0, 3.0, 4.0, 5.0], 'tp_pct': [0.5, 1.0, 1.5, 2.0], 'trail_mult': [1.2, 1.5, 1.8, 2.2, 3.0],
+    }
+    sweep = ParameterSweep(workers=args.workers, interval=args.interval)
+    try:
+        sweep.load_archive(CandleArchive(args.archive), args.symbols)
+        configs = grid_configs(space) if args.count == 0 else random_configs(space, args.count, args.seed)
+        rows = sweep.run(configs, out_path=args.out)
+        for row in top_results(rows, count=5):
+            print(row)
+    finally:
+        sweep.stop()
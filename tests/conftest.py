@@ -0,0 +1,20 @@
+import atexit
+import os
+import shutil
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+# Strateji modülleri depo kökünde duruyor, kod onları `strategies.<modül>` olarak içe aktarıyor.
+# Kurulu bir strategies paketi yoksa kök dizine işaret eden bir `strategies` bağlantısı sys.path'e
+# eklenir; spawn worker'ları (ProcessScorer, sweep) ana sürecin sys.path'ini aldığı için onlar da görür.
+try:
+    import strategies  # noqa: F401
+except ImportError:
+    _link_dir = tempfile.mkdtemp(prefix='strategies-')
+    os.symlink(ROOT, os.path.join(_link_dir, 'strategies'))
+    sys.path.append(_link_dir)
+    atexit.register(shutil.rmtree, _link_dir, True)
@@ -0,0 +1,83 @@
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+pytest.importorskip("aiohttp")
+
+from async_scan import AsyncScanner
+from bench import synthetic_ohlcv
+from local_servers import RecordedHTTPServer
+
+M = 900_000
+VOLUMES = {'AUSDT': 50e6, 'BUSDT': 20e6, 'CUSDT': 5e6, 'SHORTUSDT': 30e6, 'GONEUSDT': 30e6, 'AAABTC': 90e6}
+
+
+def raw_klines(df):
+    """Borsa formatında kline satırları (fiyatlar metin)."""
+    rows = []
+    for ot, o, h, l, c, v, taker in df[['Open time', 'Open', 'High', 'Low', 'Close', 'Volume',
+                                        'Taker buy base asset volume']].itertuples(index=False):
+        rows.append([int(ot), repr(o), repr(h), repr(l), repr(c), repr(v), int(ot) + M - 1,
+                     repr(v * c), 100, repr(taker), repr(taker * c), "0"])
+    return rows
+
+
+@pytest.fixture
+def recorded(tmp_path):
+    (tmp_path / 'klines').mkdir()
+    tickers = [{'symbol': s, 'quoteVolume': str(v)} for s, v in VOLUMES.items()]
+    (tmp_path / 'ticker_24hr.json').write_text(json.dumps(tickers))
+    frames = {}
+    for seed, symbol in enumerate(['AUSDT', 'BUSDT', 'CUSDT', 'AAABTC']):
+        frames[symbol] = synthetic_ohlcv(100, seed=seed)
+        (tmp_path / 'klines' / f'{symbol}.json').write_text(json.dumps(raw_klines(frames[symbol])))
+    # 20'den az mum → frame atlanır; GONEUSDT kaydı yok → 400 (hata sayılır)
+    (tmp_path / 'klines' / 'SHORTUSDT.json').write_text(json.dumps(raw_klines(synthetic_ohlcv(10, seed=9))))
+
+    server = RecordedHTTPServer(str(tmp_path)).start()
+    yield server, frames
+    server.stop()
+
+
+@pytest.mark.parametrize('use_executor', [False, True])
+def test_scan_delivers_frames(recorded, use_executor):
+    server, frames = recorded
+    seen, lock = {}, threading.Lock()
+
+    def on_frame(symbol, df):
+        with lock:
+            seen[symbol] = df
+        return len(df)
+
+    logs = []
+    scanner = AsyncScanner(server.url, concurrency=4, max_retries=0, log_func=logs.append)
+    executor = ThreadPoolExecutor(2) if use_executor else None
+    try:
+        results, stats = scanner.run(10, on_frame=on_frame, executor=executor)
+    finally:
+        if executor:
+            executor.shutdown()
+
+    # Hacim filtresi: CUSDT eşik altı, AAABTC USDT değil
+    assert stats['symbols'] == 4 and stats['frames'] == 2 and stats['errors'] == 1
+    assert results == {'AUSDT': 100, 'BUSDT': 100}
+    assert set(seen) == {'AUSDT', 'BUSDT'}
+    assert any('GONEUSDT' in line for line in logs)
+    for symbol, df in seen.items():
+        ref = frames[symbol]
+        np.testing.assert_array_equal(df['Open time'].to_numpy(), ref['Open time'].to_numpy())
+        for column in ('Open', 'High', 'Low', 'Close', 'Volume', 'Taker buy base asset volume'):
+            np.testing.assert_array_equal(df[column].to_numpy(), ref[column].to_numpy(), err_msg=column)
+    assert scanner.last_used_weight == 1
+
+
+def test_scan_given_symbols_skips_ticker(recorded):
+    server, frames = recorded
+    scanner = AsyncScanner(server.url, concurrency=2, log_func=lambda *args: None)
+    results, stats = scanner.run(0, symbols=['CUSDT'])
+    assert list(results) == ['CUSDT'] and stats['symbols'] == 1
+    assert server.request_count == 1    # Sadece kline isteği
+    np.testing.assert_array_equal(results['CUSDT']['Close'].to_numpy(), frames['CUSDT']['Close'].to_numpy())
@@ -0,0 +1,76 @@
+import numpy as np
+import pytest
+
+from bench import synthetic_ohlcv
+from ohlcv_store import FIELDS, FRAME_COLUMNS
+from strategies.backtest import (
+    EXIT_END, EXIT_OPPOSITE, EXIT_STOP, EXIT_TRAIL, WINDOW, backtest_hits, simulate_trades,
+)
+from strategies.batch_score import (
+    R_RSI_HIGH, R_RSI_LOW, SIGNAL_LONG, SIGNAL_SHORT, rsi_bollinger_hits, score_batch,
+)
+from strategies.score import SignalEngine
+
+M = 900_000
+RSI_BITS = R_RSI_LOW | R_RSI_HIGH
+
+
+@pytest.mark.parametrize('seed', [1, 2, 3])
+def test_hits_match_score_batch_on_live_windows(seed):
+    df = synthetic_ohlcv(700, seed=seed)
+    engine = SignalEngine(log_func=lambda *args: None)
+    hits = backtest_hits(df)
+    assert not hits[:WINDOW - 1].any()
+
+    data = np.column_stack([df[FRAME_COLUMNS[name]].to_numpy(dtype=np.float64) for name in FIELDS])
+    t = np.arange(WINDOW - 1, len(df))
+    windows = np.stack([data[i - WINDOW + 1:i + 1] for i in t])   # Canlıdaki get_candlesticks(limit=100)
+    # Kill Zone: canlı tarama mum kapanışından hemen sonra çalışır → kapanış saati
+    hours = ((df['Open time'].to_numpy()[t] + M) // 3_600_000) % 24
+    ref = np.zeros(len(t), dtype=np.int64)
+    for hour in np.unique(hours):
+        rows = hours == hour
+        ref[rows] = score_batch(windows[rows], engine.weights, engine.threshold, utc_hour=int(hour))[2]
+
+    # RSI tüm geçmişten (akışlı IndicatorBook gibi), pencereden değil: o bitler ayrı karşılaştırılır
+    np.testing.assert_array_equal(hits[t] & ~RSI_BITS, ref & ~RSI_BITS)
+    assert (hits[t] & ~RSI_BITS).any()
+    close = data[:, FIELDS.index('close')]
+    full = np.array([rsi_bollinger_hits(close[None, :i + 1])[0] for i in t])
+    np.testing.assert_array_equal(hits[t] & RSI_BITS, full)
+
+
+def test_simulate_trades_hand_built_exits():
+    n = 17
+    close = np.full(n, 100.0)
+    high = np.full(n, 100.5)
+    low = np.full(n, 99.5)
+    signals = np.zeros(n, dtype=np.int8)
+    leverage = np.full(n, 2, dtype=np.int8)
+
+    signals[1] = SIGNAL_LONG            # Stop: 96, mum 3'te Low 95
+    low[3] = 95.0
+    signals[5] = SIGNAL_SHORT           # Ters sinyal mum 8'de (o mumda yeniden giriş yok)
+    close[8] = 98.0
+    signals[8] = SIGNAL_LONG
+    signals[10] = SIGNAL_LONG           # Trailing: mum 11 zirve 105 → tetik 105 - 1 × 2 = 103
+    high[11] = 105.0
+    high[12], low[12] = 104.0, 102.5
+    signals[14] = SIGNAL_LONG           # Çıkış yok → veri sonu
+
+    trades = simulate_trades(high, low, close, signals, leverage, sl_pct=4.0, fee_pct=0.04,
+                             atr=np.ones(n), tp_pct=1.0, trail_mult=2.0)
+
+    assert trades['entry_idx'].tolist() == [1, 5, 10, 14]
+    assert trades['exit_idx'].tolist() == [3, 8, 12, 16]
+    assert trades['reason'].tolist() == [EXIT_STOP, EXIT_OPPOSITE, EXIT_TRAIL, EXIT_END]
+    assert trades['side'].tolist() == [SIGNAL_LONG, SIGNAL_SHORT, SIGNAL_LONG, SIGNAL_LONG]
+    np.testing.assert_allclose(trades['exit'], [96.0, 98.0, 103.0, 100.0])
+    fee = 2 * 0.04 / 100
+    expected = [(-0.04 - fee) * 200, (0.02 - fee) * 200, (0.03 - fee) * 200, -fee * 200]
+    np.testing.assert_allclose(trades['pnl_pct'], expected)
+
+    # Trailing kapalıyken aynı pozisyon ters sinyal gelmediği için veri sonuna kadar taşınır
+    plain = simulate_trades(high, low, close, signals, leverage, sl_pct=4.0)
+    assert plain['entry_idx'].tolist() == [1, 5, 10]
+    assert plain['reason'].tolist() == [EXIT_STOP, EXIT_OPPOSITE, EXIT_END]
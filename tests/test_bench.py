@@ -0,0 +1,22 @@
+import pandas as pd
+
+from bench import BenchmarkSuite, compare, synthetic_ohlcv
+
+
+def test_synthetic_ohlcv_is_seeded():
+    pd.testing.assert_frame_equal(synthetic_ohlcv(300, seed=5), synthetic_ohlcv(300, seed=5))
+    df = synthetic_ohlcv(300, seed=5)
+    assert (df['High'] >= df[['Open', 'Close']].max(axis=1)).all()
+    assert (df['Low'] <= df[['Open', 'Close']].min(axis=1)).all()
+
+
+def test_risk_group_runs():
+    logs = []
+    suite = BenchmarkSuite(bar_counts=(100,), repeat=1, min_time=0.0, log_func=logs.append)
+    report = suite.run(('risk',))
+    names = {r['name'] for r in report['results']}
+    assert names == {'calculate_atr', 'calculate_dynamic_stops', 'calc_chandelier_exit',
+                     'calc_swing_exit', 'calc_msb_exit'}
+    assert not any(line.startswith("❌") for line in logs)
+    rows, text = compare(report, report)
+    assert len(rows) == 5 and all(ratio == 1 for *_, ratio in rows)
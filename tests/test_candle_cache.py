@@ -0,0 +1,131 @@
+import threading
+
+import numpy as np
+
+from candle_archive import CandleArchive
+from candle_cache import CandleCache
+from ohlcv_store import FIELDS
+
+M = 60_000
+
+
+def kline(open_time, close=1.0):
+    return [open_time, close, close, close, close, 1.0, open_time + M - 1, 1.0, 1, 0.5, 0.5, '0']
+
+
+class FakeClient:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def klines(self, symbol, interval, startTime=None, endTime=None, limit=500, **kwargs):
+        rows = [r for r in self.rows if (startTime is None or r[0] >= startTime) and (endTime is None or r[0] <= endTime)]
+        return rows[-limit:] if startTime is None else rows[:limit]
+
+
+def test_forming_last_row_not_archived_even_if_local_clock_ahead(tmp_path):
+    # Yerel saat ileride: zaman kontrolü son mumu kapanmış sayar, ama akış kapandığını bildirmedi
+    rows = [kline(i * M) for i in range(10)]
+    archive = CandleArchive(str(tmp_path))
+    cache = CandleCache(FakeClient(rows), archive=archive)
+    cache.get_frame('BTCUSDT', '1m', limit=10)
+    assert archive.last_open_time('BTCUSDT', '1m') == 8 * M
+
+    # Akış kapanışı bildirince son mum yazılır
+    cache.set_live('BTCUSDT', '1m', True)
+    assert cache.apply_kline('BTCUSDT', '1m', kline(9 * M, close=2.0), closed=True)
+    rec = archive.read('BTCUSDT', '1m')
+    assert rec['open_time'][-1] == 9 * M and rec['close'][-1] == 2.0
+
+
+def test_concurrent_append_writes_each_bar_once(tmp_path):
+    archive = CandleArchive(str(tmp_path))
+    open_time = np.arange(200, dtype=np.int64) * M
+    values = [np.ones(200)] * len(FIELDS)
+    barrier = threading.Barrier(8)
+
+    def worker():
+        barrier.wait()
+        archive.append('BTCUSDT', '1m', open_time, values)
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    np.testing.assert_array_equal(archive.read('BTCUSDT', '1m')['open_time'], open_time)
+
+
+def test_archive_failure_logged_once_per_key(tmp_path):
+    class BrokenArchive:
+        def read(self, *args, **kwargs):
+            return np.empty(0)
+
+        def last_open_time(self, *args):
+            return None
+
+        def append(self, *args, **kwargs):
+            raise OSError("disk full")
+
+    logs = []
+    cache = CandleCache(FakeClient([kline(i * M) for i in range(10)]), archive=BrokenArchive(), log_func=logs.append)
+    for _ in range(2):
+        cache.get_frame('BTCUSDT', '1m', limit=10)
+        cache.get_frame('ETHUSDT', '1m', limit=10)
+    assert len(logs) == 2 and all("disk full" in line for line in logs)
+    assert "BTCUSDT" in logs[0] and "ETHUSDT" in logs[1]
+
+
+def test_archive_catches_up_after_store_reload(tmp_path):
+    # Sembol bir süre taranmadı (hacim filtresi): store eskidi, boşluk sayfadan büyük → baştan çekilir
+    client = FakeClient([kline(i * M, close=float(i)) for i in range(100)])
+    archive = CandleArchive(str(tmp_path))
+    cache = CandleCache(client, max_bars=50, archive=archive)
+    cache.get_frame('BTCUSDT', '1m', limit=50)
+    assert archive.last_open_time('BTCUSDT', '1m') == 98 * M
+
+    client.rows = [kline(i * M, close=float(i)) for i in range(400)]
+    cache.get_frame('BTCUSDT', '1m', limit=50)
+    rec = archive.read('BTCUSDT', '1m')
+    np.testing.assert_array_equal(rec['open_time'], np.arange(50, 399) * M)
+    np.testing.assert_array_equal(rec['close'], np.arange(50, 399))
+    assert len(archive.gaps('BTCUSDT', '1m')) == 0
+
+    # Sonraki yazımlar da devam eder (arşiv donmaz)
+    client.rows.append(kline(400 * M, close=400.0))
+    cache.get_frame('BTCUSDT', '1m', limit=50)
+    assert archive.last_open_time('BTCUSDT', '1m') == 399 * M
+
+
+def test_stream_gap_is_filled_from_rest_not_appended(tmp_path):
+    # Bağlantı kopukken 10..12 kaçtı; bar 9 akışta close=9.0 ile kalmıştı, gerçek kapanış 99.0
+    client = FakeClient([kline(i * M) for i in range(9)] + [kline(9 * M, close=9.0)])
+    archive = CandleArchive(str(tmp_path))
+    cache = CandleCache(client, archive=archive)
+    cache.refresh('BTCUSDT', '1m', limit=10)
+    cache.set_live('BTCUSDT', '1m', True)
+
+    client.rows = [kline(i * M) for i in range(9)] + [kline(9 * M, close=99.0)] + \
+                  [kline(i * M, close=float(i)) for i in range(10, 14)]
+    assert cache.apply_kline('BTCUSDT', '1m', kline(13 * M, close=13.5))
+
+    arrs = cache.get_arrays('BTCUSDT', '1m', limit=14)
+    np.testing.assert_array_equal(arrs['open_time'], np.arange(14) * M)
+    assert arrs['close'][9] == 99.0 and arrs['close'][-1] == 13.5
+    rec = archive.read('BTCUSDT', '1m')
+    np.testing.assert_array_equal(rec['open_time'], np.arange(13) * M)
+    assert rec['close'][9] == 99.0
+
+
+def test_rows_for_non_live_key_wait_for_backfill(tmp_path):
+    client = FakeClient([kline(i * M) for i in range(10)])
+    cache = CandleCache(client, archive=CandleArchive(str(tmp_path)))
+    cache.refresh('BTCUSDT', '1m', limit=10)
+
+    # Backfill bitmeden: oluşan mum atılır, kapanmış mum saklanır
+    assert not cache.apply_kline('BTCUSDT', '1m', kline(9 * M, close=5.0))
+    assert not cache.apply_kline('BTCUSDT', '1m', kline(9 * M, close=7.0), closed=True)
+    assert cache.get_arrays('BTCUSDT', '1m', limit=10)['close'][-1] == 1.0
+
+    cache.set_live('BTCUSDT', '1m', True)
+    assert cache.get_arrays('BTCUSDT', '1m', limit=10)['close'][-1] == 7.0
+    assert cache.archive.read('BTCUSDT', '1m')['close'][-1] == 7.0
@@ -0,0 +1,85 @@
+import time
+import types
+from datetime import datetime, timezone
+
+import pytest
+
+import candle_clock
+from candle_clock import CandleClock
+
+M = 900_000
+BAR = 1_720_000_000_000 // M * M     # Mum sınırı (sunucu ms)
+DELAY = 300
+
+
+class ServerTime:
+    """Sunucu saati = yerel saat (offset 0); yerel saat testte elle ilerletilir."""
+
+    def __init__(self, now_ms):
+        self.now_ms = now_ms
+
+    def time(self):
+        return self.now_ms / 1000
+
+
+@pytest.fixture
+def now(monkeypatch):
+    clock = ServerTime(BAR)
+    monkeypatch.setattr(candle_clock, 'time', types.SimpleNamespace(time=clock.time, sleep=time.sleep))
+    return clock
+
+
+def make(mid_bar_seconds=None, interval='15m'):
+    return CandleClock(client=None, interval=interval, close_delay_ms=DELAY,
+                       mid_bar_seconds=mid_bar_seconds, log_func=lambda *args: None)
+
+
+@pytest.mark.parametrize('now_ms, expected', [
+    (BAR + 100_000, (BAR + M + DELAY, BAR + M, True)),
+    (BAR + DELAY - 1, (BAR + DELAY, BAR, True)),       # Kapanış gecikmesi içinde: önceki kapanış henüz tetiklenmedi
+    (BAR + DELAY, (BAR + M + DELAY, BAR + M, True)),   # Tam tetikleme anı: sıradaki mum
+    (BAR + M - 1, (BAR + M + DELAY, BAR + M, True)),
+])
+def test_next_fire_close_only(now_ms, expected):
+    assert make().next_fire(now_ms) == expected
+
+
+@pytest.mark.parametrize('now_ms, expected', [
+    (BAR + 100_000, (BAR + 300_000 + DELAY, BAR, False)),    # İlk ara tik; kapanış zamanı yerine mum açılışı
+    (BAR + 300_000 + DELAY, (BAR + 600_000 + DELAY, BAR, False)),
+    (BAR + 650_000, (BAR + M + DELAY, BAR + M, True)),        # Son ara tik kapanışla çakışır → kapanış
+    (BAR + DELAY - 1, (BAR + DELAY, BAR, True)),
+])
+def test_next_fire_with_mid_bar(now_ms, expected):
+    assert make(mid_bar_seconds=300).next_fire(now_ms) == expected
+
+
+def test_next_fire_weekly_bars_open_on_monday():
+    clock = make(interval='1w')
+    wednesday = int(datetime(2024, 7, 3, 12, tzinfo=timezone.utc).timestamp() * 1000)
+    monday = int(datetime(2024, 7, 8, tzinfo=timezone.utc).timestamp() * 1000)
+    assert clock.next_fire(wednesday) == (monday + DELAY, monday, True)
+
+
+def test_mark_tick_uses_given_close_time(now):
+    clock = make()
+    now.now_ms = BAR + 1_500
+    tick = clock.mark_tick(BAR, is_close=True)
+    assert tick == {'close_time': BAR, 'is_close': True, 'skew_ms': 1_500}
+
+    # Mesaj bir sonraki mum sınırından sonra işlendi: gerçek kapanış BAR, yerel sınır BAR + M
+    now.now_ms = BAR + M + 2_000
+    assert clock.mark_tick(BAR)['skew_ms'] == M + 2_000
+    assert clock.mark_tick()['close_time'] == BAR + M
+
+    now.now_ms = BAR + M + 2_500
+    assert clock.record_signal() == 2_500          # Son tik (varsayılan) BAR + M
+    assert clock.scan_skews == [1_500, M + 2_000, 2_000]
+
+
+def test_mid_bar_tick_is_not_a_close_skew(now):
+    clock = make(mid_bar_seconds=300)
+    now.now_ms = BAR + 300_000 + DELAY + 50
+    tick = clock.mark_tick(BAR, is_close=False)
+    assert tick['skew_ms'] == 300_000 + DELAY + 50
+    assert clock.scan_skews == []
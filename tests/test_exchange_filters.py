@@ -0,0 +1,52 @@
+from decimal import Decimal
+
+from exchange_filters import ExchangeFilterIndex, format_decimal, quantize_down
+
+INFO = {'symbols': [{
+    'symbol': 'BTCUSDT',
+    'filters': [
+        {'filterType': 'LOT_SIZE', 'stepSize': '0.001', 'minQty': '0.001', 'maxQty': '1000'},
+        {'filterType': 'PRICE_FILTER', 'tickSize': '0.10'},
+        {'filterType': 'MIN_NOTIONAL', 'notional': '5'},
+    ],
+}]}
+
+
+class FlakyClient:
+    def __init__(self, failures):
+        self.failures = failures
+        self.calls = 0
+
+    def exchange_info(self):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise ConnectionError("offline")
+        return INFO
+
+
+def test_format_decimal_never_scientific():
+    assert str(Decimal('1E-7')) == '1E-7'
+    assert format_decimal(Decimal('1E-7')) == '0.0000001'
+    assert format_decimal(quantize_down(Decimal('0.00000012'), Decimal('1E-8'))) == '0.00000012'
+    assert format_decimal(Decimal('1E+1')) == '10'
+
+
+def test_failed_first_load_recovers_on_get():
+    index = ExchangeFilterIndex(FlakyClient(failures=1), retry_seconds=0, log_func=lambda *args: None)
+    index.start()
+    try:
+        f = index.get('BTCUSDT')
+        assert f is not None and f['tick_size'] == Decimal('0.10')
+    finally:
+        index.stop()
+
+
+def test_refresh_thread_retries_after_failed_start():
+    client = FlakyClient(failures=1)
+    index = ExchangeFilterIndex(client, retry_seconds=0.01, log_func=lambda *args: None)
+    index.start()
+    try:
+        index._thread.join(timeout=0.5)   # Dolana kadar kısa aralıkla dener, sonra refresh_seconds bekler
+        assert index._filters and client.calls >= 2
+    finally:
+        index.stop()
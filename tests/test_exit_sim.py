@@ -0,0 +1,96 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from bench import synthetic_ohlcv
+from strategies.backtest import (
+    ATR_FLOOR_PCT, EXIT_CHANDELIER, EXIT_END, EXIT_MSB, EXIT_STOP, EXIT_SWING, EXIT_TRAIL,
+    SIGNAL_LONG, SIGNAL_SHORT, atr_series,
+)
+from strategies.exit_sim import build_ticks, simulate_exits
+from strategies.risk import calc_chandelier_exit, calc_msb_exit, calc_swing_exit
+
+POSITIONS = 120
+LIVE_LIMIT = 100   # update_trailing_stop: get_candlesticks(limit=100)
+
+
+def replay_live(bars, ticks, entry_bar, side, atr, sl_pct, tp_pct, multiplier):
+    """
+    update_trailing_stop'u tik tik çalıştırır (calc_* strategies.risk'ten).
+    Dönüş: (çıkış mumu, o tikte tetiklenen kurallar) — exit_sim ilk tetikleyen kuralı seçer,
+    aynı tikte birden fazla kural olabilir.
+    """
+    direction = "LONG" if side == SIGNAL_LONG else "SHORT"
+    entry = bars['Close'].iloc[entry_bar]
+    stop = entry * (1 - sl_pct / 100) if side == SIGNAL_LONG else entry * (1 + sl_pct / 100)
+    peak = entry
+    high, low = bars['High'].to_numpy(), bars['Low'].to_numpy()
+    price, bar = ticks['price'], ticks['bar']
+    current, run_high, run_low = -1, None, None
+
+    for k in range(ticks['start'][entry_bar + 1], len(price)):
+        p, b = price[k], bar[k]
+        if b != current:
+            current, run_high, run_low = b, p, p
+        run_high, run_low = max(run_high, p), min(run_low, p)
+
+        # Sabit STOP_MARKET
+        if (side == SIGNAL_LONG and p <= stop) or (side == SIGNAL_SHORT and p >= stop):
+            return b, {EXIT_STOP}
+        profit_pct = (p - entry) / entry * 100 * side
+        if profit_pct < tp_pct:
+            continue
+
+        hits = set()
+        if side == SIGNAL_LONG:
+            peak = max(peak, p)
+            if p <= peak - atr * multiplier:
+                hits.add(EXIT_TRAIL)
+        else:
+            peak = min(peak, p)
+            if p >= peak + atr * multiplier:
+                hits.add(EXIT_TRAIL)
+
+        # df_recent: son 99 kapanmış mum + o ana kadarki oluşan mum
+        first = max(0, b - (LIVE_LIMIT - 1))
+        df_recent = pd.DataFrame({'High': np.append(high[first:b], run_high),
+                                  'Low': np.append(low[first:b], run_low)})
+        for reason, level, crossed in (
+            (EXIT_CHANDELIER, calc_chandelier_exit(df_recent, direction, atr), lambda lv: p <= lv if side == SIGNAL_LONG else p >= lv),
+            (EXIT_SWING, calc_swing_exit(df_recent, direction), lambda lv: p < lv if side == SIGNAL_LONG else p > lv),
+            (EXIT_MSB, calc_msb_exit(df_recent, direction), lambda lv: p < lv if side == SIGNAL_LONG else p > lv),
+        ):
+            if level and crossed(level):
+                hits.add(reason)
+        if hits:
+            return b, hits
+    return len(bars) - 1, {EXIT_END}
+
+
+@pytest.fixture(scope='module')
+def market():
+    bars = synthetic_ohlcv(1200, seed=11)
+    atr = atr_series(bars['High'].to_numpy(), bars['Low'].to_numpy(), bars['Close'].to_numpy())
+    return bars, build_ticks(bars), atr
+
+
+@pytest.mark.parametrize('sl_pct, tp_pct, multiplier', [(4.0, 1.0, 1.8), (1.5, 0.3, 1.2)])
+def test_simulate_exits_matches_live_replay(market, sl_pct, tp_pct, multiplier):
+    bars, ticks, atr = market
+    rng = np.random.default_rng(0)
+    entry_bar = rng.integers(30, len(bars) - 50, POSITIONS)
+    side = rng.choice([SIGNAL_LONG, SIGNAL_SHORT], POSITIONS)
+    close = bars['Close'].to_numpy()
+
+    trades = simulate_exits(ticks, entry_bar, side, atr[entry_bar], sl_pct=sl_pct, tp_pct=tp_pct,
+                            trail_mult=multiplier)
+    live_atr = np.fmax(np.nan_to_num(atr[entry_bar]), close[entry_bar] * ATR_FLOOR_PCT / 100)
+
+    reasons = set()
+    for i in range(POSITIONS):
+        exit_bar, hits = replay_live(bars, ticks, entry_bar[i], side[i], live_atr[i], sl_pct, tp_pct, multiplier)
+        assert trades['exit_idx'][i] == exit_bar, i
+        assert int(trades['reason'][i]) in hits, i
+        reasons |= hits
+    # Örneklem her kural yolunu denesin
+    assert {EXIT_STOP, EXIT_TRAIL} <= reasons and reasons & {EXIT_CHANDELIER, EXIT_SWING, EXIT_MSB}
@@ -0,0 +1,86 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from strategies.fvg import (
+    check_fvg_signal, detect_breaker, detect_fvg, detect_fvg_fill, detect_mitigation, find_fvg_arrays,
+    fvg_to_dicts, update_fvg_state,
+)
+
+
+def detect_fvg_loop(df):
+    """detect_fvg'nin eski döngülü hali; vektörel versiyon bununla karşılaştırılır."""
+    fvg_bullish, fvg_bearish = [], []
+    for i in range(2, len(df)):
+        curr_low, curr_high = df['Low'].iloc[i], df['High'].iloc[i]
+        first_low, first_high = df['Low'].iloc[i-2], df['High'].iloc[i-2]
+        if first_high < curr_low and curr_low - first_high > 0:
+            fvg_bullish.append({'index': i, 'top': curr_low, 'bottom': first_high,
+                                'avg_price': (curr_low + first_high) / 2, 'filled': False})
+        if first_low > curr_high and first_low - curr_high > 0:
+            fvg_bearish.append({'index': i, 'top': first_low, 'bottom': curr_high,
+                                'avg_price': (first_low + curr_high) / 2, 'filled': False})
+    return fvg_bullish, fvg_bearish
+
+
+def random_frame(n, seed, nan_ratio=0.0):
+    rng = np.random.default_rng(seed)
+    # Dalga: fiyat gap'lerin hem üstünde hem altında kapansın (iki yönde breaker)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.006, n)) + 0.05 * np.sin(np.arange(n) / 25))
+    open_ = np.concatenate(([close[0]], close[:-1]))
+    high = np.maximum(open_, close) * (1 + rng.random(n) * 0.003)
+    low = np.minimum(open_, close) * (1 - rng.random(n) * 0.003)
+    if nan_ratio:
+        high[rng.random(n) < nan_ratio] = np.nan
+        low[rng.random(n) < nan_ratio] = np.nan
+    return pd.DataFrame({'Open': open_, 'High': high, 'Low': low, 'Close': close},
+                        index=pd.RangeIndex(500, 500 + n))
+
+
+@pytest.mark.parametrize('nan_ratio', [0.0, 0.05])
+@pytest.mark.parametrize('seed', [1, 2, 3])
+def test_detect_fvg_matches_loop(seed, nan_ratio):
+    df = random_frame(400, seed, nan_ratio)
+    bull, bear = detect_fvg(df)
+    ref_bull, ref_bear = detect_fvg_loop(df)
+    assert ref_bull and ref_bear
+    assert bull == ref_bull
+    assert bear == ref_bear
+
+
+@pytest.mark.parametrize('n', [1, 2, 3])
+def test_short_frames(n):
+    df = random_frame(n, 0)
+    assert detect_fvg(df) == detect_fvg_loop(df)
+
+
+@pytest.mark.parametrize('seed', [4, 5])
+def test_state_updates_match_dict_versions(seed):
+    df = random_frame(300, seed)
+    start = 120
+    head = df.iloc[:start]
+    arrays = find_fvg_arrays(head)
+    combined = tuple(a.copy() for a in arrays)
+    dicts = detect_fvg_loop(head)
+    breakers = set()
+
+    # Her yeni mumda fill → mitigation → breaker (canlıdaki sıra); diziler yerinde güncellenir
+    for t in range(start, len(df)):
+        frame = df.iloc[:t + 1]
+        for arr, both, lst in zip(arrays, combined, dicts):
+            detect_fvg_fill(frame, arr)
+            detect_mitigation(frame, arr)
+            detect_breaker(frame, arr)
+            update_fvg_state(frame, both)
+            detect_fvg_fill(frame, lst)
+            detect_mitigation(frame, lst)
+            detect_breaker(frame, lst)
+            assert fvg_to_dicts(arr) == lst, t
+            np.testing.assert_array_equal(both, arr)
+        assert check_fvg_signal(frame, *arrays) == check_fvg_signal(frame, *dicts), t
+        breakers |= {fvg.get('breaker') for lst in dicts for fvg in lst}
+
+    flat = [fvg for lst in dicts for fvg in lst]
+    # Örneklem her durumu içersin
+    assert any(f.get('mitigated') for f in flat) and any(f['filled'] and not f.get('mitigated') for f in flat)
+    assert breakers >= {'bullish', 'bearish'}
@@ -0,0 +1,101 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from strategies import kernels
+from strategies.order_blocks import MIN_AGE, order_block_masks_from_arrays
+from strategies.structure import detect_structure
+
+SEEDS = (3, 7, 11)
+
+
+@pytest.fixture(params=['numpy', 'numba'])
+def backend(request):
+    if request.param == 'numba' and not kernels.numba_available():
+        pytest.skip("numba kurulu değil")
+    previous = kernels._backend
+    kernels.set_backend(request.param)
+    yield request.param
+    kernels.set_backend(previous)
+
+
+def synthetic(n, seed):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.004, n)))
+    open_ = np.concatenate(([close[0]], close[:-1]))
+    high = np.maximum(open_, close) * (1 + rng.random(n) * 0.003)
+    low = np.minimum(open_, close) * (1 - rng.random(n) * 0.003)
+    high[rng.random(n) < 0.01] = np.nan   # Eksik veri
+    low[rng.random(n) < 0.01] = np.nan
+    return open_, high, low, close
+
+
+def first_hit(start, hit):
+    """Referans: start'tan itibaren hit(j) doğru olan ilk j (yoksa -1)."""
+    for j in range(max(int(start), 0), len(hit)):
+        if hit[j]:
+            return j
+    return -1
+
+
+@pytest.mark.parametrize('seed', SEEDS)
+@pytest.mark.parametrize('lookback', [1, 2, 5])
+def test_swing_flags(backend, seed, lookback):
+    _, high, low, _ = synthetic(3000, seed)
+    got = kernels.swing_flags(high, low, lookback)
+    ref = kernels._swing_flags_loop(high, low, lookback)
+    for a, b in zip(got, ref):
+        np.testing.assert_array_equal(a, b)
+
+
+@pytest.mark.parametrize('seed', SEEDS)
+def test_first_overlap(backend, seed):
+    open_, high, low, close = synthetic(3000, seed)
+    rng = np.random.default_rng(seed)
+    start = rng.integers(-5, 3000, 200)
+    level_lo = close[np.clip(start, 0, 2999)] * (1 + rng.normal(0, 0.02, 200))
+    level_hi = level_lo * (1 + rng.random(200) * 0.005)
+    got = kernels.first_overlap(start, level_lo, level_hi, low, high)
+    ref = kernels._first_overlap_loop(start, level_lo, level_hi, low, high)
+    np.testing.assert_array_equal(got, ref)
+
+
+@pytest.mark.parametrize('seed', SEEDS)
+@pytest.mark.parametrize('direction', ['LONG', 'SHORT'])
+def test_first_overlap_stop_scan(backend, seed, direction):
+    # simulate_trades'in kullanımı: tek uç (LONG → Low, SHORT → High), karşı uçtaki NaN etkilemez
+    open_, high, low, close = synthetic(3000, seed)
+    rng = np.random.default_rng(seed)
+    start = rng.integers(0, 3000, 150)
+    sign = 1 if direction == 'LONG' else -1
+    stop = close[start] * (1 - sign * rng.uniform(0.002, 0.03, 150))
+    edge = low if direction == 'LONG' else high
+    inf = np.full(150, np.inf)
+    lo, hi = (-inf, stop) if direction == 'LONG' else (stop, inf)
+
+    got = kernels.first_overlap(start, lo, hi, edge, edge)
+    for k in range(len(start)):
+        hit = edge <= stop[k] if direction == 'LONG' else edge >= stop[k]
+        assert got[k] == first_hit(start[k], hit)
+
+
+@pytest.mark.parametrize('lookback', [2, 5])
+def test_detect_structure_follows_backend(backend, lookback):
+    _, high, low, close = synthetic(2000, 5)
+    df = pd.DataFrame({'Open': close, 'High': high, 'Low': low, 'Close': close})
+    out = detect_structure(df, lookback)
+    ref = kernels._swing_flags_loop(high, low, lookback)
+    np.testing.assert_array_equal(out['swing_high'].to_numpy(), ref[0])
+    np.testing.assert_array_equal(out['swing_low'].to_numpy(), ref[1])
+
+
+@pytest.mark.parametrize('seed', SEEDS)
+@pytest.mark.parametrize('side', ['bull', 'bear'])
+def test_latest_block(backend, seed, side):
+    open_, high, low, close = synthetic(3000, seed)
+    bullish, bearish = order_block_masks_from_arrays(open_, close)
+    mask, lo_mult, hi_mult = (bullish, 1.0, 1.01) if side == 'bull' else (bearish, 0.99, 1.0)
+    got = kernels.latest_block(mask, low, high, close, 50, MIN_AGE, lo_mult, hi_mult)
+    ref = kernels._latest_block_loop(mask, low, high, close, 50, MIN_AGE, lo_mult, hi_mult)
+    assert (ref >= 0).any()
+    np.testing.assert_array_equal(got, ref)
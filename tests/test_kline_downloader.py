@@ -0,0 +1,140 @@
+import numpy as np
+import pytest
+from binance.um_futures import UMFutures
+
+from candle_archive import CandleArchive
+from kline_downloader import KlineDownloader
+from local_servers import SyntheticKlineHTTPServer
+from ohlcv_store import FIELDS
+from request_scheduler import RequestScheduler
+
+M = 900_000
+NOW = 1_720_000_000_000 // M * M + 400_000   # Son mum oluşmakta (kapanmamış)
+START = NOW // M * M - 2000 * M
+LISTED = NOW // M * M - 700 * M
+SYMBOLS = ['BTCUSDT', 'ETHUSDT', 'NEWUSDT']
+
+
+def quiet(*args):
+    pass
+
+
+class Interrupted(Exception):
+    pass
+
+
+class CutAfter:
+    """n klines isteğinden sonra bağlantı kopmuş gibi davranır."""
+
+    def __init__(self, client, n):
+        self.client = client
+        self.n = n
+
+    def time(self):
+        return self.client.time()
+
+    def klines(self, **kwargs):
+        self.n -= 1
+        if self.n < 0:
+            raise Interrupted("kesinti")
+        return self.client.klines(**kwargs)
+
+
+@pytest.fixture
+def server():
+    srv = SyntheticKlineHTTPServer(listings={'NEWUSDT': LISTED}, now_ms=NOW, fail_every=5).start()
+    yield srv
+    srv.stop()
+
+
+def assert_archive_matches(srv, archive, symbol, first):
+    expected = np.arange(first, NOW // M * M, M)   # Sadece kapanmış mumlar
+    rec = archive.read(symbol, '15m')
+    np.testing.assert_array_equal(rec['open_time'], expected)
+    ref = np.array(srv.bars(symbol, expected), dtype=object)
+    np.testing.assert_allclose(rec['close'], ref[:, 4].astype(float))
+    np.testing.assert_allclose(rec['taker_buy_volume'], ref[:, 9].astype(float))
+
+
+def test_paginated_download_resumes_after_interruption(server, tmp_path):
+    client = RequestScheduler(UMFutures(base_url=server.url), log_func=quiet)
+    archive = CandleArchive(str(tmp_path))
+
+    first = KlineDownloader(CutAfter(client, 4), archive, page_limit=300, workers=3, log_func=quiet)
+    first.download(SYMBOLS, START)
+    partial = {symbol: archive.count(symbol, '15m') for symbol in SYMBOLS}
+    assert 0 < sum(partial.values()) < 2000 * 2 + 700
+
+    # Aynı komut checkpoint'ten sürer; 503'ler (fail_every) planlayıcı tarafından yeniden denenir
+    second = KlineDownloader(client, CandleArchive(str(tmp_path)), page_limit=300, workers=3, log_func=quiet)
+    second.download(SYMBOLS, START)
+    full_pages = -(-2000 // 300) * 2 + -(-700 // 300)
+    assert 0 < first.pages and first.pages + second.pages <= full_pages + len(SYMBOLS)   # Baştan indirilmedi
+    time_requests = 2   # download() başına bir sunucu saati isteği
+    assert server.request_count - time_requests > len(server.kline_requests)   # 503'ler yeniden denendi
+
+    for symbol in ('BTCUSDT', 'ETHUSDT'):
+        assert_archive_matches(server, archive, symbol, START)
+    assert_archive_matches(server, archive, 'NEWUSDT', LISTED)
+
+    # Tekrar çalıştırma hiçbir şey yazmaz (çakışan sayfalar tekilleştirilir)
+    third = KlineDownloader(client, CandleArchive(str(tmp_path)), page_limit=300, workers=3, log_func=quiet)
+    assert sum(third.download(SYMBOLS, START - 100 * M).values()) == 0
+    assert_archive_matches(server, archive, 'BTCUSDT', START)
+
+
+def test_later_start_continues_from_archive_end(server, tmp_path):
+    client = RequestScheduler(UMFutures(base_url=server.url), log_func=quiet)
+    archive = CandleArchive(str(tmp_path))
+    KlineDownloader(client, archive, page_limit=500, workers=1, log_func=quiet).download(
+        ['BTCUSDT'], START, end_time=START + 100 * M)
+
+    logs = []
+    KlineDownloader(client, archive, page_limit=500, workers=1, log_func=logs.append).download(
+        ['BTCUSDT'], START + 400 * M)
+    assert_archive_matches(server, archive, 'BTCUSDT', START)
+    assert any('boşluk' in line for line in logs)
+
+
+def test_append_rejects_gaps(tmp_path):
+    archive = CandleArchive(str(tmp_path))
+    values = [np.ones(3)] * len(FIELDS)
+    assert archive.append('BTCUSDT', '15m', np.array([0, M, 2 * M]), values) == 3
+    with pytest.raises(ValueError):
+        archive.append('BTCUSDT', '15m', np.array([4 * M, 5 * M, 6 * M]), values)
+    with pytest.raises(ValueError):
+        archive.append('BTCUSDT', '15m', np.array([3 * M, 4 * M, 6 * M]), values)
+    assert archive.count('BTCUSDT', '15m') == 3
+
+
+def test_source_gaps_are_recorded_not_fatal(tmp_path):
+    # Borsada hiç olmayan aralık (bakım / delist-relist): indirme durmaz, boşluk kaydedilir
+    gap = (START + 300 * M, START + 450 * M)
+    srv = SyntheticKlineHTTPServer(now_ms=NOW, gaps={'BTCUSDT': [gap]}).start()
+    try:
+        client = RequestScheduler(UMFutures(base_url=srv.url), log_func=quiet)
+        archive = CandleArchive(str(tmp_path))
+        downloader = KlineDownloader(client, archive, page_limit=100, workers=1, log_func=quiet)
+        assert downloader.download(['BTCUSDT'], START, end_time=START + 600 * M) == {'BTCUSDT': 450}
+
+        expected = np.arange(START, START + 600 * M, M)
+        expected = expected[(expected < gap[0]) | (expected >= gap[1])]
+        np.testing.assert_array_equal(archive.read('BTCUSDT', '15m')['open_time'], expected)
+        np.testing.assert_array_equal(archive.gaps('BTCUSDT', '15m'), [[gap[0] - M, gap[1]]])
+
+        # Devam eden indirme aynı boşlukta takılmaz
+        again = KlineDownloader(client, CandleArchive(str(tmp_path)), page_limit=100, workers=1, log_func=quiet)
+        assert again.download(['BTCUSDT'], START)['BTCUSDT'] == (NOW // M * M - START) // M - 600
+        assert len(archive.gaps('BTCUSDT', '15m')) == 1
+    finally:
+        srv.stop()
+
+
+def test_append_records_gaps_only_when_allowed(tmp_path):
+    archive = CandleArchive(str(tmp_path))
+    values = [np.ones(3)] * len(FIELDS)
+    archive.append('BTCUSDT', '15m', np.array([0, M, 2 * M]), values)
+    assert archive.append('BTCUSDT', '15m', np.array([5 * M, 6 * M, 9 * M]), values, allow_gap=True) == 3
+    np.testing.assert_array_equal(archive.gaps('BTCUSDT', '15m'), [[2 * M, 5 * M], [6 * M, 9 * M]])
+    with pytest.raises(ValueError):
+        archive.append('BTCUSDT', '15m', np.array([12 * M, 11 * M, 13 * M]), values, allow_gap=True)
@@ -0,0 +1,143 @@
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from candle_cache import CandleCache
+from kline_stream import KlineStream
+from local_servers import FakeKlineWebsocketServer
+
+
+class FakeCache:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.live = {}
+        self.refreshed = []
+        self.klines = []
+
+    def set_live(self, symbol, interval, live=True):
+        with self.lock:
+            self.live[symbol] = live
+
+    def refresh(self, symbol, interval, limit=100):
+        with self.lock:
+            self.refreshed.append(symbol)
+
+    def apply_kline(self, symbol, interval, row, closed=False):
+        with self.lock:
+            self.klines.append((symbol, closed))
+        return True
+
+
+def wait_until(predicate, timeout=5.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+@pytest.fixture
+def server():
+    srv = FakeKlineWebsocketServer().start()
+    yield srv
+    srv.stop()
+
+
+@pytest.fixture
+def stream(server):
+    cache = FakeCache()
+    s = KlineStream(cache, stream_url=server.url, reconnect_delay=0.05, log_func=lambda *args: None)
+    yield s
+    s.stop()
+
+
+def test_update_symbols_only_touches_the_difference(server, stream):
+    cache = stream.cache
+    stream.start(['AUSDT', 'BUSDT'])
+    assert wait_until(lambda: cache.live == {'AUSDT': True, 'BUSDT': True})
+
+    stream.update_symbols(['AUSDT', 'CUSDT'])
+    assert wait_until(lambda: cache.live.get('CUSDT') is True)
+    assert wait_until(lambda: len(server.requests) == 2)
+
+    methods = {r['method']: r['params'] for r in server.requests}
+    assert methods == {'UNSUBSCRIBE': ['busdt@kline_15m'], 'SUBSCRIBE': ['cusdt@kline_15m']}
+    assert len(server.paths) == 1                 # Yeniden bağlanılmadı
+    assert sorted(cache.refreshed) == ['AUSDT', 'BUSDT', 'CUSDT']   # Sadece yeni sembol backfill edildi
+    assert cache.live == {'AUSDT': True, 'BUSDT': False, 'CUSDT': True}
+    assert stream.symbols == ['AUSDT', 'CUSDT']
+
+    # Yeniden bağlanınca URL güncel sembolleri içerir
+    server.drop_clients()
+    assert wait_until(lambda: len(server.paths) == 2)
+    assert 'busdt' not in server.paths[1] and 'cusdt@kline_15m' in server.paths[1]
+
+
+def test_stale_generation_cannot_flip_live(server, stream):
+    cache = stream.cache
+    stream.start(['AUSDT'])
+    assert wait_until(lambda: cache.live.get('AUSDT') is True)
+    old_generation = stream._connections[0].generation
+
+    server.drop_clients()
+    assert wait_until(lambda: len(server.paths) == 2 and stream._connections[0].generation != old_generation)
+    assert wait_until(lambda: cache.live.get('AUSDT') is True)
+
+    # Eski soketin geç kalan çağrıları yok sayılır
+    assert not stream._set_live('AUSDT', old_generation, False)
+    stream._backfill(stream._connections[0], old_generation, ['AUSDT'])
+    assert cache.live['AUSDT'] is True
+
+    # Durdurulan akıştan sonra hiçbir nesil canlı işaretleyemez
+    generation = stream._connections[0].generation
+    stream.stop()
+    assert not stream._set_live('AUSDT', generation, True)
+    assert cache.live['AUSDT'] is False
+
+
+def test_messages_reach_cache(server, stream):
+    stream.start(['AUSDT'])
+    assert wait_until(lambda: stream.cache.live.get('AUSDT') is True)
+    result = []
+    waiter = threading.Thread(target=lambda: result.append(stream.wait_for_close(timeout=5, settle=0)))
+    waiter.start()
+    time.sleep(0.1)
+    server.push_kline('AUSDT', 0, 1, 2, 0.5, 1.5, 10, closed=True)
+    waiter.join()
+    assert result == [{'AUSDT'}]
+    assert stream.cache.klines == [('AUSDT', True)]
+    assert stream.last_close_time == 900_000   # k['T'] + 1
+
+
+def test_real_cache_fills_stream_gap(server):
+    M = 900_000
+
+    def row(i, close):
+        return [i * M, close, close, close, close, 1.0, i * M + M - 1, 1.0, 1, 0.5, 0.5, '0']
+
+    class Client:
+        rows = [row(i, 1.0) for i in range(10)]
+
+        def klines(self, symbol, interval, startTime=None, limit=500, **kwargs):
+            rows = [r for r in self.rows if startTime is None or r[0] >= startTime]
+            return rows[-limit:] if startTime is None else rows[:limit]
+
+    client = Client()
+    cache = CandleCache(client, log_func=lambda *args: None)
+    stream = KlineStream(cache, stream_url=server.url, backfill_limit=10, reconnect_delay=0.05,
+                         log_func=lambda *args: None)
+    stream.start(['AUSDT'])
+    try:
+        assert wait_until(lambda: ('AUSDT', '15m') in cache._live)
+        # Akıştaki mesajlar arasında 10..12 kaçtı
+        client.rows = [row(i, float(i)) for i in range(14)]
+        server.push_kline('AUSDT', 13 * M, 13, 13, 13, 13.5, 1)
+        assert wait_until(lambda: cache._stores[('AUSDT', '15m')].last_open_time() == 13 * M)
+        arrs = cache.get_arrays('AUSDT', '15m', limit=14)
+        np.testing.assert_array_equal(arrs['open_time'], np.arange(14) * M)
+        assert arrs['close'][12] == 12.0 and arrs['close'][13] == 13.5
+    finally:
+        stream.stop()
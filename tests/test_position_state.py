@@ -0,0 +1,121 @@
+import threading
+import types
+
+import pytest
+
+import position_state
+from position_state import PositionBook
+
+
+class FakeClient:
+    def __init__(self):
+        self.positions = []
+
+    def get_position_risk(self):
+        return [dict(p) for p in self.positions]
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1_000.0
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    c = Clock()
+    monkeypatch.setattr(position_state, 'time', types.SimpleNamespace(time=c.time))
+    return c
+
+
+@pytest.fixture
+def book(clock):
+    return PositionBook(FakeClient(), reservation_ttl=60.0, max_age=30.0)
+
+
+def position(symbol, amount='0.5'):
+    return {'symbol': symbol, 'positionAmt': amount}
+
+
+def test_never_refreshed_book_fails_closed(book):
+    assert book.is_stale()
+    assert book.has_open('BTCUSDT')
+    assert not book.try_reserve('BTCUSDT')
+    book.refresh()
+    assert not book.is_stale() and not book.has_open('BTCUSDT')
+
+
+def test_reserve_and_release(book):
+    book.client.positions = [position('ETHUSDT'), position('XRPUSDT', '0')]
+    book.refresh()
+    assert book.has_open('ETHUSDT') and not book.has_open('XRPUSDT')
+    assert not book.try_reserve('ETHUSDT')
+
+    assert book.try_reserve('BTCUSDT')
+    assert book.has_open('BTCUSDT')
+    assert not book.try_reserve('BTCUSDT')      # Bekleyen açılış
+    book.release('BTCUSDT')
+    assert not book.has_open('BTCUSDT')
+    assert book.try_reserve('BTCUSDT')
+
+
+def test_only_one_thread_reserves(book):
+    book.refresh()
+    barrier = threading.Barrier(8)
+    wins = []
+
+    def worker():
+        barrier.wait()
+        wins.append(book.try_reserve('BTCUSDT'))
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert wins.count(True) == 1
+
+
+def test_reservation_cleared_by_snapshot_or_ttl(book, clock):
+    book.refresh()
+    assert book.try_reserve('BTCUSDT') and book.try_reserve('ETHUSDT')
+
+    # Emir gitti, pozisyon snapshot'ta göründü → rezervasyon düşer, pozisyon açık kalır
+    book.client.positions = [position('BTCUSDT')]
+    clock.now += 10
+    book.refresh()
+    assert book._pending == {'ETHUSDT': 1_000.0}
+    assert book.has_open('BTCUSDT')
+
+    # Hiç görünmeyen rezervasyon TTL dolunca düşer (TTL içinde kalır)
+    clock.now += 45
+    book.refresh()
+    assert book.has_open('ETHUSDT')
+    clock.now += 10
+    book.refresh()
+    assert not book.has_open('ETHUSDT')
+
+
+def test_stale_snapshot_fails_closed(book, clock):
+    book.refresh()
+    clock.now += 29
+    assert book.try_reserve('BTCUSDT')
+    book.release('BTCUSDT')
+
+    clock.now += 2    # Monitor döngüsü takıldı
+    assert book.is_stale()
+    assert book.has_open('BTCUSDT') and not book.try_reserve('BTCUSDT')
+
+    book.refresh()
+    assert book.try_reserve('BTCUSDT')
+
+
+def test_mark_closed(book):
+    book.client.positions = [position('BTCUSDT')]
+    version = book.refresh().version
+    book.mark_closed('BTCUSDT')
+    snapshot = book.snapshot()
+    assert snapshot.version == version + 1 and snapshot.get('BTCUSDT') is None
+    assert not book.has_open('BTCUSDT')
@@ -0,0 +1,75 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from bench import synthetic_universe
+from ohlcv_store import FIELDS, FRAME_COLUMNS
+from process_scoring import ProcessScorer
+from strategies.score import SignalEngine
+
+
+def quiet(*args, **kwargs):
+    pass
+
+
+@pytest.fixture(scope='module')
+def universe():
+    frames = synthetic_universe(12, 100, seed=5)
+    symbols = list(frames)
+    data = np.stack([np.column_stack([frames[s][FRAME_COLUMNS[name]].to_numpy(dtype=float) for name in FIELDS])
+                     for s in symbols])
+    return symbols, data
+
+
+@pytest.fixture(scope='module')
+def scorer():
+    s = ProcessScorer(workers=2, log_func=quiet).start()
+    yield s
+    s.stop()
+
+
+def serial(engine, symbols, data):
+    out = []
+    for i, symbol in enumerate(symbols):
+        df = pd.DataFrame({FRAME_COLUMNS[name]: data[i][:, j] for j, name in enumerate(FIELDS)})
+        signal, score, reason = engine.get_composite_score(df)
+        if signal != "HOLD":
+            out.append((symbol, signal, score, reason))
+    return out
+
+
+def test_pool_matches_parent_engine(universe, scorer):
+    symbols, data = universe
+    engine = SignalEngine(settings={'vp_bins': 20}, log_func=quiet)
+    # Varsayılandan farklı ağırlık ve eşik: worker'lar bunları görmezse sonuç seri yoldan ayrılır
+    engine.weights.update({'fvg': 9, 'structure': 1, 'order_block': 6})
+    engine.settings['score_thresh'] = 8
+
+    expected = serial(engine, symbols, data)
+    got = scorer.score(symbols, data, engine.settings, engine.weights, engine.threshold)
+    assert expected and sorted(got) == sorted(expected)
+
+    default = serial(SignalEngine(log_func=quiet), symbols, data)
+    assert default != expected   # Ağırlıklar gerçekten sonucu değiştiriyor
+
+
+def test_pool_rebuilt_after_worker_crash(universe):
+    symbols, data = universe
+    logs = []
+    scorer = ProcessScorer(workers=2, log_func=logs.append).start()
+    try:
+        engine = SignalEngine(log_func=quiet)
+        # Worker ölümü (OOM/segfault gibi) havuzu BrokenProcessPool durumuna sokar
+        with pytest.raises(Exception):
+            scorer._pool.submit(os._exit, 1).result()
+
+        got = scorer.score(symbols, data, engine.settings, engine.weights, engine.threshold)
+        assert sorted(got) == sorted(serial(engine, symbols, data))
+        assert any('yeniden kuruluyor' in line for line in logs)
+
+        # Sonraki çağrılar da yeni havuzla çalışır
+        assert sorted(scorer.score(symbols, data, engine.settings, engine.weights)) == sorted(got)
+    finally:
+        scorer.stop()
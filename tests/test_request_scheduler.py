@@ -0,0 +1,45 @@
+import pytest
+from binance.error import ClientError, ServerError
+
+from request_scheduler import RequestScheduler
+
+
+class FakeClient:
+    def __init__(self, failures):
+        self.failures = list(failures)   # Sırayla fırlatılacak hatalar
+        self.calls = []
+
+    def _respond(self, name):
+        self.calls.append(name)
+        if self.failures:
+            raise self.failures.pop(0)
+        return {'ok': name}
+
+    def new_order(self, **kwargs):
+        return self._respond('new_order')
+
+    def klines(self, *args, **kwargs):
+        return self._respond('klines')
+
+
+def _scheduler(client):
+    return RequestScheduler(client, max_retries=2, log_func=lambda *args: None)
+
+
+def test_market_call_retried_on_server_error():
+    client = FakeClient([ServerError(503, "busy")])
+    assert _scheduler(client).klines('BTCUSDT', '15m', limit=100) == {'ok': 'klines'}
+    assert client.calls == ['klines', 'klines']
+
+
+def test_order_not_resent_on_server_error():
+    client = FakeClient([ServerError(503, "busy")])
+    with pytest.raises(ServerError):
+        _scheduler(client).new_order(symbol='BTCUSDT', side='BUY', type='MARKET', quantity='1')
+    assert client.calls == ['new_order']
+
+
+def test_order_retried_on_rate_limit():
+    client = FakeClient([ClientError(429, -1003, "Too many requests", {'Retry-After': '0'})])
+    assert _scheduler(client).new_order(symbol='BTCUSDT', side='BUY', type='MARKET', quantity='1') == {'ok': 'new_order'}
+    assert client.calls == ['new_order', 'new_order']
@@ -0,0 +1,80 @@
+import numpy as np
+import pytest
+
+from bench import synthetic_ohlcv
+from signal_cache import SignalCache
+from strategies.score import SignalEngine
+
+LIMIT = 100
+
+
+def quiet(*args, **kwargs):
+    pass
+
+
+@pytest.fixture(scope='module')
+def bars():
+    return synthetic_ohlcv(260, seed=9)
+
+
+def forming(df, t, close):
+    """t'de biten 100 mumluk pencere; son (oluşan) mumun fiyatı close'a çekilir."""
+    window = df.iloc[t - LIMIT + 1:t + 1].reset_index(drop=True)
+    window.loc[LIMIT - 1, 'Close'] = close
+    window.loc[LIMIT - 1, 'High'] = max(window.loc[LIMIT - 1, 'High'], close)
+    window.loc[LIMIT - 1, 'Low'] = min(window.loc[LIMIT - 1, 'Low'], close)
+    return window
+
+
+def counting(engine):
+    calls = []
+    score = engine._score
+    engine._score = lambda ctx: calls.append(ctx) or score(ctx)
+    return calls
+
+
+def test_hit_partial_and_miss_match_uncached(bars):
+    cache = SignalCache()
+    cached = SignalEngine(settings={'score_thresh': 6}, log_func=quiet, result_cache=cache)
+    plain = SignalEngine(settings={'score_thresh': 6}, log_func=quiet)
+    calls = counting(cached)
+
+    windows = range(LIMIT - 1, len(bars), 5)
+    for t in windows:
+        base = bars['Close'].iloc[t]
+        for k, close in enumerate((base, base * 0.99, base * 1.012, base * 1.012)):
+            df = forming(bars, t, close)
+            assert cached.get_composite_score(df, symbol='AUSDT') == plain.get_composite_score(df, symbol='AUSDT'), (t, k)
+
+    # Pencere başına: 1 ıska (yeni kapanmış mum), 2 kısmi (oluşan mum değişti), 1 tam isabet (aynı mum)
+    assert (cache.misses, cache.partial, cache.hits) == (len(windows), 2 * len(windows), len(windows))
+    assert len(calls) == 3 * len(windows)
+    # Kısmi isabetlerde kapanmış mum özellikleri paylaşılan store'dan geldi
+    assert all(ctx.closed_store is calls[0].closed_store for ctx in calls[:3])
+    assert calls[3].closed_store is not calls[0].closed_store
+
+
+def test_fingerprint_invalidates_on_weights_and_settings(bars):
+    cache = SignalCache()
+    engine = SignalEngine(settings={'score_thresh': 6}, log_func=quiet, result_cache=cache)
+    df = forming(bars, 150, bars['Close'].iloc[150])
+    first = engine.get_composite_score(df, symbol='AUSDT')
+    assert engine.get_composite_score(df, symbol='AUSDT') == first
+    assert (cache.misses, cache.hits) == (1, 1)
+
+    engine.weights['fvg'] = 12
+    engine.settings = {'score_thresh': 3}
+    changed = engine.get_composite_score(df, symbol='AUSDT')
+    assert cache.misses == 2 and cache.hits == 1 and changed != first
+    fresh = SignalEngine(settings={'score_thresh': 3}, log_func=quiet)
+    fresh.weights['fvg'] = 12
+    assert changed == fresh.get_composite_score(df, symbol='AUSDT')
+
+
+def test_no_symbol_or_open_time_bypasses_cache(bars):
+    cache = SignalCache()
+    engine = SignalEngine(log_func=quiet, result_cache=cache)
+    df = forming(bars, 150, bars['Close'].iloc[150])
+    engine.get_composite_score(df)                                          # Sembol yok
+    engine.get_composite_score(df.drop(columns=['Open time']), symbol='AUSDT')
+    assert (cache.misses, cache.partial, cache.hits) == (0, 0, 0)
@@ -0,0 +1,75 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from strategies.structure import detect_structure, swing_masks
+
+
+def detect_structure_loop(df, lookback=5):
+    """detect_structure'ın eski döngülü hali; vektörel versiyon bununla karşılaştırılır."""
+    df = df.copy()
+    df['swing_high'] = False
+    df['swing_low'] = False
+
+    for i in range(lookback, len(df) - lookback):
+        current_high = df['High'].iloc[i]
+        left_side = df['High'].iloc[i-lookback:i].max()
+        right_side = df['High'].iloc[i+1:i+lookback+1].max()
+
+        if current_high > left_side and current_high > right_side:
+            df.at[df.index[i], 'swing_high'] = True
+
+        current_low = df['Low'].iloc[i]
+        left_side_low = df['Low'].iloc[i-lookback:i].min()
+        right_side_low = df['Low'].iloc[i+1:i+lookback+1].min()
+
+        if current_low < left_side_low and current_low < right_side_low:
+            df.at[df.index[i], 'swing_low'] = True
+
+    return df
+
+
+def random_frame(n, seed, nan_ratio=0.0):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.005, n)))
+    high = close * (1 + rng.random(n) * 0.004)
+    low = close * (1 - rng.random(n) * 0.004)
+    # Eşit tepeler/dipler de olsun (yuvarlama): > / < katı karşılaştırması denensin
+    high, low = np.round(high, 1), np.round(low, 1)
+    if nan_ratio:
+        high[rng.random(n) < nan_ratio] = np.nan
+        low[rng.random(n) < nan_ratio] = np.nan
+    return pd.DataFrame({'Open': close, 'High': high, 'Low': low, 'Close': close},
+                        index=pd.RangeIndex(1000, 1000 + n))
+
+
+@pytest.mark.parametrize('lookback', [1, 2, 5])
+@pytest.mark.parametrize('nan_ratio', [0.0, 0.05, 0.3])
+@pytest.mark.parametrize('seed', [1, 2])
+def test_detect_structure_matches_loop(lookback, nan_ratio, seed):
+    df = random_frame(400, seed, nan_ratio)
+    got = detect_structure(df, lookback)
+    ref = detect_structure_loop(df, lookback)
+    pd.testing.assert_series_equal(got['swing_high'], ref['swing_high'].astype(bool))
+    pd.testing.assert_series_equal(got['swing_low'], ref['swing_low'].astype(bool))
+
+
+@pytest.mark.parametrize('lookback', [1, 2, 5])
+def test_swing_masks_batched_rows(lookback):
+    frames = [random_frame(200, seed, 0.05) for seed in range(4)]
+    high = np.vstack([f['High'].to_numpy() for f in frames])
+    low = np.vstack([f['Low'].to_numpy() for f in frames])
+    swing_high, swing_low = swing_masks(high, low, lookback)
+    for row, f in enumerate(frames):
+        ref = detect_structure_loop(f, lookback)
+        np.testing.assert_array_equal(swing_high[row], ref['swing_high'].to_numpy(dtype=bool))
+        np.testing.assert_array_equal(swing_low[row], ref['swing_low'].to_numpy(dtype=bool))
+
+
+@pytest.mark.parametrize('n', [0, 3, 10, 11])
+def test_short_frames(n):
+    df = random_frame(n, 0)
+    got = detect_structure(df, 5)
+    ref = detect_structure_loop(df, 5)
+    np.testing.assert_array_equal(got['swing_high'].to_numpy(), ref['swing_high'].to_numpy(dtype=bool))
+    np.testing.assert_array_equal(got['swing_low'].to_numpy(), ref['swing_low'].to_numpy(dtype=bool))
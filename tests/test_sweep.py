@@ -0,0 +1,82 @@
+import csv
+
+import numpy as np
+import pytest
+
+from bench import synthetic_universe
+from strategies.backtest import (
+    atr_series, backtest_signals, leverage_series, simulate_trades, summarize,
+)
+from sweep import RESULT_KEYS, ParameterSweep
+
+CONFIGS = [
+    {'fvg': 6, 'threshold': 6, 'sl_pct': 2.0, 'tp_pct': 0.5, 'trail_mult': 1.2},
+    {'fvg': 6, 'threshold': 6, 'sl_pct': 4.0, 'tp_pct': 1.5, 'trail_mult': 2.2},
+    {'fvg': 2, 'threshold': 8, 'sl_pct': 3.0, 'tp_pct': 1.0, 'trail_mult': 1.8},
+]
+
+
+def quiet(*args, **kwargs):
+    pass
+
+
+@pytest.fixture(scope='module')
+def frames():
+    return synthetic_universe(3, 500, seed=21)
+
+
+@pytest.fixture(scope='module')
+def sweep(frames):
+    s = ParameterSweep(workers=2, configs_per_task=1, log_func=quiet)
+    s.load_frames(frames).prepare()
+    yield s
+    s.stop()
+
+
+def serial_row(sweep, frames, config):
+    """Aynı konfig, havuz olmadan: backtest_signals + simulate_trades, semboller sırayla."""
+    weights = {**sweep.base_weights, **{k: v for k, v in config.items() if k in sweep.base_weights}}
+    trades, profitable = [], 0
+    for df in frames.values():
+        signals, _, _ = backtest_signals(df, weights, config['threshold'])
+        high, low, close = (df[name].to_numpy(dtype=np.float64) for name in ('High', 'Low', 'Close'))
+        t = simulate_trades(high, low, close, signals, leverage_series(close)[0], sl_pct=config['sl_pct'],
+                            fee_pct=sweep.fee_pct, atr=atr_series(high, low, close),
+                            tp_pct=config['tp_pct'], trail_mult=config['trail_mult'])
+        trades.append(t)
+        profitable += int(len(t) > 0 and t['pnl_pct'].sum() > 0)
+    summary = summarize(np.concatenate(trades))
+    summary['profitable_symbols'] = profitable
+    return summary
+
+
+def test_pool_rows_match_serial_simulation(sweep, frames):
+    rows = sweep.run(CONFIGS)
+    for config, row in zip(CONFIGS, rows):
+        expected = serial_row(sweep, frames, config)
+        assert expected['trades'] > 0
+        for key in RESULT_KEYS:
+            assert row[key] == pytest.approx(expected[key]), (config, key)
+
+
+def test_csv_appends_only_to_matching_header(sweep, tmp_path):
+    out = str(tmp_path / 'sweep.csv')
+    sweep.run(CONFIGS[:2], out_path=out)
+    sweep.run(CONFIGS[2:], out_path=out)
+    assert sweep.out_path == out
+    with open(out, newline='') as f:
+        rows = list(csv.DictReader(f))
+    # Satırlar bitiş sırasıyla yazılır; ikinci tarama ilkinin arkasına eklendi
+    sl = [float(r['sl_pct']) for r in rows]
+    assert sorted(sl[:2]) == [2.0, 4.0] and sl[2:] == [3.0]
+
+    # Farklı parametre uzayı: eski dosyaya yanlış kolonlarla eklenmez
+    other = [{'structure': 1, 'threshold': 6}]
+    sweep.run(other, out_path=out)
+    assert sweep.out_path == str(tmp_path / 'sweep.1.csv')
+    with open(out, newline='') as f:
+        assert len(list(csv.DictReader(f))) == 3
+    with open(sweep.out_path, newline='') as f:
+        reader = csv.DictReader(f)
+        assert reader.fieldnames == ['index', 'structure', 'threshold'] + list(RESULT_KEYS)
+        assert len(list(reader)) == 1
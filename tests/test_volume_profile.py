@@ -0,0 +1,42 @@
+import numpy as np
+import pytest
+
+from strategies.volume_profile import batch_poc, rolling_poc, volume_profile
+
+
+def series(n, seed):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+    high = close * (1 + rng.random(n) * 0.01)
+    low = close * (1 - rng.random(n) * 0.01)
+    volume = rng.lognormal(5, 1, n)
+    return high, low, volume
+
+
+def test_rolling_poc_uses_only_the_trailing_window():
+    high, low, volume = series(300, 1)
+    out = rolling_poc(high, low, volume, window=40, bins=24)
+    assert np.isnan(out[:, :39]).all()
+    for i in (39, 120, 299):
+        ref = volume_profile(high[i - 39:i + 1], low[i - 39:i + 1], volume[i - 39:i + 1], bins=24)
+        np.testing.assert_allclose(out[:, i], (ref['poc'], ref['val'], ref['vah']))
+    poc = batch_poc(high[None, 260:300], low[None, 260:300], volume[None, 260:300], bins=24)
+    np.testing.assert_allclose(out[0, 299], poc[0])
+
+
+def test_rolling_poc_has_no_lookahead():
+    high, low, volume = series(300, 2)
+    before = rolling_poc(high, low, volume, window=40)
+    # Gelecekteki aşırı bir mum geçmiş değerleri değiştirmemeli
+    high[250], low[250], volume[250] = high[250] * 3, low[250] * 0.3, volume[250] * 100
+    after = rolling_poc(high, low, volume, window=40)
+    np.testing.assert_array_equal(before[:, :250], after[:, :250])
+
+
+def test_rolling_poc_fixed_grid():
+    high, low, volume = series(200, 3)
+    out = rolling_poc(high, low, volume, window=30, bins=16, price_min=80.0, price_max=120.0)
+    ref = volume_profile(high[170:], low[170:], volume[170:], bins=16, price_min=80.0, price_max=120.0)
+    np.testing.assert_allclose(out[:, -1], (ref['poc'], ref['val'], ref['vah']))
+    with pytest.raises(ValueError):
+        rolling_poc(high, low, volume, price_min=80.0)
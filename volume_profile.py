@@ -0,0 +1,206 @@
+import numpy as np
+
+VALUE_AREA_PCT = 0.70   # Value area: toplam hacmin %70'i
+ROLLING_BLOCK_ELEMENTS = 1 << 22   # rolling_poc: pencere × mum × bin katkı matrisi başına eleman sınırı
+
+
+def spread_volume(high, low, volume, edges):
+    """
+    Her mumun hacmini High–Low aralığına eşit dağıtarak fiyat seviyelerine (bin) böler.
+    high/low/volume (..., n), edges (..., bins + 1) → (..., n, bins) katkı matrisi
+    (toplu tarama için baştaki eksen semboller olabilir).
+    High == Low olan mumların hacmi tek bir bine yazılır.
+    """
+    high = np.asarray(high, dtype=np.float64)[..., :, None]
+    low = np.asarray(low, dtype=np.float64)[..., :, None]
+    volume = np.asarray(volume, dtype=np.float64)[..., :, None]
+    edges = np.asarray(edges, dtype=np.float64)[..., None, :]
+    lower, upper = edges[..., :-1], edges[..., 1:]
+
+    rng = high - low
+    wide = rng > 0
+    with np.errstate(divide='ignore', invalid='ignore'):
+        density = np.where(wide, volume / rng, 0.0)
+
+    # Yerinde işlemler: (…, n, bins) boyutunda tek geçici dizi (backtest'te pencere sayısı büyük)
+    contrib = np.minimum(high, upper)
+    contrib -= np.maximum(low, lower)
+    np.maximum(contrib, 0.0, out=contrib)
+    contrib *= density
+
+    # High == Low: fiyatın düştüğü bin (son kenar son bine dahil, aralık dışı yok sayılır)
+    flat = ~wide
+    if flat.any():
+        in_bin = (lower <= low) & (low < upper)
+        in_bin[..., -1] |= low[..., 0] == edges[..., 0, -1:]
+        contrib = np.where(flat & in_bin, volume, contrib)
+    return np.nan_to_num(contrib, copy=False)
+
+
+def value_area(profile, pct=VALUE_AREA_PCT):
+    """
+    POC'tan başlayarak komşu binlerden büyük olanı ekleyerek hacmin `pct` kadarını kapsayan
+    aralığı bulur. Dönüş: (poc_idx, val_idx, vah_idx)
+    """
+    poc = int(np.argmax(profile))
+    total = profile.sum()
+    if total <= 0:
+        return poc, poc, poc
+
+    lo = hi = poc
+    acc = profile[poc]
+    target = total * pct
+    while acc < target and (lo > 0 or hi < len(profile) - 1):
+        down = profile[lo - 1] if lo > 0 else -1.0
+        up = profile[hi + 1] if hi < len(profile) - 1 else -1.0
+        if up >= down:
+            hi += 1
+            acc += up
+        else:
+            lo -= 1
+            acc += down
+    return poc, lo, hi
+
+
+def _summary(edges, profile, pct):
+    poc, val, vah = value_area(profile, pct)
+    centers = (edges[:-1] + edges[1:]) / 2
+    return {
+        'edges': edges,
+        'volume': profile,
+        'poc': centers[poc],       # En çok hacmin işlendiği seviye (bin ortası)
+        'val': edges[val],         # Value area alt sınırı
+        'vah': edges[vah + 1],     # Value area üst sınırı
+    }
+
+
+def volume_profile(high, low, volume, bins=20, price_min=None, price_max=None, pct=VALUE_AREA_PCT):
+    """
+    Vektörel hacim profili.
+    bins: fiyat seviyesi sayısı; price_min/price_max verilmezse aralığın Low/High uçları kullanılır.
+    Dönüş: {'edges', 'volume', 'poc', 'val', 'vah'}
+    """
+    high = np.asarray(high, dtype=np.float64)
+    low = np.asarray(low, dtype=np.float64)
+    if price_min is None:
+        price_min = np.nanmin(low)
+    if price_max is None:
+        price_max = np.nanmax(high)
+    if not price_max > price_min:
+        price_max = price_min + max(abs(price_min) * 1e-9, 1e-12)
+
+    edges = np.linspace(price_min, price_max, bins + 1)
+    profile = spread_volume(high, low, volume, edges).sum(axis=0)
+    return _summary(edges, profile, pct)
+
+
+def _own_range_edges(high, low, bins):
+    """Son eksendeki her seri için kendi Low/High aralığından ızgara (volume_profile ile aynı kural)."""
+    price_min = np.nanmin(low, axis=-1)
+    price_max = np.nanmax(high, axis=-1)
+    flat = ~(price_max > price_min)
+    price_max = np.where(flat, price_min + np.maximum(np.abs(price_min) * 1e-9, 1e-12), price_max)
+    return np.linspace(price_min, price_max, bins + 1, axis=-1)
+
+
+def batch_poc(high, low, volume, bins=20):
+    """
+    Toplu tarama: (semboller × n) dizilerinden her sembolün POC'u (bin ortası).
+    Izgara her sembol için volume_profile ile aynı şekilde kendi Low/High aralığından kurulur.
+    """
+    high = np.asarray(high, dtype=np.float64)
+    low = np.asarray(low, dtype=np.float64)
+    edges = _own_range_edges(high, low, bins)
+    profile = spread_volume(high, low, volume, edges).sum(axis=-2)
+    poc = np.argmax(profile, axis=-1)
+    centers = (edges[..., :-1] + edges[..., 1:]) / 2
+    return np.take_along_axis(centers, poc[..., None], axis=-1)[..., 0]
+
+
+class RollingVolumeProfile:
+    """
+    Sabit fiyat ızgarasında kayan pencereli hacim profili (backtest için).
+    Her push(): giren mumun katkısı eklenir, pencereden çıkanınki çıkarılır → mum başına O(bins).
+    Birikmiş float hatası için her `window` mumda toplam ring buffer'dan yeniden hesaplanır.
+
+        rvp = RollingVolumeProfile(price_min, price_max, bins=50, window=50)
+        for h, l, v in zip(highs, lows, volumes):
+            rvp.push(h, l, v)
+            poc = rvp.profile()['poc']
+    """
+
+    def __init__(self, price_min, price_max, bins=20, window=50, pct=VALUE_AREA_PCT):
+        self.edges = np.linspace(price_min, price_max, bins + 1)
+        self.window = window
+        self.pct = pct
+
+        self._rows = np.zeros((window, bins), dtype=np.float64)   # Penceredeki katkılar (ring buffer)
+        self._total = np.zeros(bins, dtype=np.float64)
+        self._pos = 0
+        self._count = 0
+        self._pushes = 0
+
+    def __len__(self):
+        return self._count
+
+    def push(self, high, low, volume):
+        row = spread_volume([high], [low], [volume], self.edges)[0]
+        self._total += row - self._rows[self._pos]
+        self._rows[self._pos] = row
+        self._pos = (self._pos + 1) % self.window
+        self._count = min(self._count + 1, self.window)
+
+        self._pushes += 1
+        if self._pushes % self.window == 0:
+            self._total = self._rows.sum(axis=0)
+        return self
+
+    def volumes(self):
+        return np.clip(self._total, 0.0, None)
+
+    def profile(self):
+        return _summary(self.edges, self.volumes(), self.pct)
+
+
+def rolling_poc(high, low, volume, window=50, bins=20, price_min=None, price_max=None, pct=VALUE_AREA_PCT):
+    """
+    Tüm geçmiş için mum başına (poc, val, vah) dizileri (ilk window-1 mum NaN).
+    price_min/price_max verilirse sabit ızgarada RollingVolumeProfile kullanılır (mum başına O(bins)).
+    Verilmezse her pencerenin ızgarası batch_poc gibi sadece o pencerenin Low/High aralığından kurulur;
+    tüm serinin aralığı kullanılmaz, yoksa mum i'nin değeri gelecekteki fiyatlara bağlı olur.
+    """
+    if (price_min is None) != (price_max is None):
+        raise ValueError("price_min ve price_max birlikte verilmeli (veya ikisi de None)")
+    high = np.asarray(high, dtype=np.float64)
+    low = np.asarray(low, dtype=np.float64)
+    volume = np.asarray(volume, dtype=np.float64)
+    n = len(high)
+    out = np.full((3, n), np.nan)
+    if n < window:
+        return out
+
+    if price_min is None:
+        return _trailing_window_poc(high, low, volume, window, bins, pct, out)
+
+    rvp = RollingVolumeProfile(price_min, price_max, bins=bins, window=window, pct=pct)
+    for i in range(n):
+        rvp.push(high[i], low[i], volume[i])
+        if len(rvp) == window:
+            p = rvp.profile()
+            out[:, i] = p['poc'], p['val'], p['vah']
+    return out
+
+
+def _trailing_window_poc(high, low, volume, window, bins, pct, out):
+    """Her pencere kendi ızgarasıyla; pencereler bloklar halinde (bellek sınırlı) vektörel işlenir."""
+    views = [np.lib.stride_tricks.sliding_window_view(a, window) for a in (high, low, volume)]
+    count = len(views[0])
+    block = max(1, ROLLING_BLOCK_ELEMENTS // (window * bins))
+    for s in range(0, count, block):
+        h, l, v = (view[s:s + block] for view in views)
+        edges = _own_range_edges(h, l, bins)
+        profiles = spread_volume(h, l, v, edges).sum(axis=-2)
+        for k in range(len(profiles)):
+            p = _summary(edges[k], profiles[k], pct)
+            out[:, window - 1 + s + k] = p['poc'], p['val'], p['vah']
+    return out